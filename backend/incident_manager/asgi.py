@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'incident_manager.settings')
+# Read-heavy incident endpoints are served by async views under ASGI
+os.environ.setdefault('INCIDENT_ASYNC_READS', 'true')
 
 application = get_asgi_application() 
\ No newline at end of file
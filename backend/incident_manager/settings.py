@@ -33,6 +33,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'incidents.instrumentation.RequestMetricsMiddleware',
+    'incidents.config.SharedConfigMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -142,4 +144,56 @@ CORS_ALLOWED_ORIGINS = [
 CORS_ALLOW_CREDENTIALS = True
 
 # CORS headers for development
-CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=True, cast=bool) 
\ No newline at end of file
+CORS_ALLOW_ALL_ORIGINS = config('CORS_ALLOW_ALL_ORIGINS', default=True, cast=bool)
+
+# Live incident event streams (Server-Sent Events)
+INCIDENT_EVENTS_POLL_INTERVAL = config('INCIDENT_EVENTS_POLL_INTERVAL', default=1.0, cast=float)
+
+# Email delivery for incident notifications (sent by the send_incident_notifications worker)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = config('EMAIL_HOST', default='localhost')
+EMAIL_PORT = config('EMAIL_PORT', default=25, cast=int)
+EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
+EMAIL_HOST_PASSWORD = config('EMAIL_HOST_PASSWORD', default='')
+EMAIL_USE_TLS = config('EMAIL_USE_TLS', default=False, cast=bool)
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
+DEFAULT_FROM_EMAIL = config('DEFAULT_FROM_EMAIL', default='incidents@localhost')
+# Seconds a notification waits so rapid-fire changes are mailed as one digest
+INCIDENT_NOTIFICATIONS_DIGEST_WINDOW = config('INCIDENT_NOTIFICATIONS_DIGEST_WINDOW', default=60, cast=int)
+
+# Shared cache (response cache, keyset counts). Use a shared backend such as
+# django.core.cache.backends.redis.RedisCache so all workers see invalidations.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='incident-manager'),
+    }
+}
+# Seconds a cached incident read response is kept (entries are also invalidated on writes)
+INCIDENT_CACHE_TIMEOUT = config('INCIDENT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Maximum SQL queries per request, by "<basename>.<action>". Exceeding a budget
+# logs a warning, or raises QueryBudgetExceeded when strict (enable in tests).
+INCIDENT_QUERY_BUDGETS = {
+    'incident.list': 5,
+    'incident.retrieve': 6,
+    'incident.statistics': 3,
+    'incident.critical': 3,
+    'incident.board': 1,
+    'incident.timeline': 6,
+    'incident.updates': 5,
+    'incident.transitions': 3,
+    'incident.duplicate_candidates': 4,
+    'incident.search': 5,
+}
+INCIDENT_QUERY_BUDGETS_STRICT = config('INCIDENT_QUERY_BUDGETS_STRICT', default=False, cast=bool)
+
+# Serve GETs of the list, detail, updates, statistics, critical and board endpoints with
+# async views. asgi.py turns this on, so WSGI and management commands keep the sync views.
+INCIDENT_ASYNC_READS = config('INCIDENT_ASYNC_READS', default=False, cast=bool)
+
+# Duplicate detection compares incidents that started at most this many hours apart
+INCIDENT_CORRELATION_WINDOW_HOURS = config('INCIDENT_CORRELATION_WINDOW_HOURS', default=24, cast=int)
+
+# Seconds between checks of src/shared-config.json for changes (hot reload)
+SHARED_CONFIG_RELOAD_INTERVAL = config('SHARED_CONFIG_RELOAD_INTERVAL', default=2.0, cast=float)
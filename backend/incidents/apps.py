@@ -7,4 +7,8 @@ from django.apps import AppConfig
 class IncidentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'incidents'
-    verbose_name = 'Incident Management' 
\ No newline at end of file
+    verbose_name = 'Incident Management'
+    
+    def ready(self):
+        """Register signal handlers."""
+        from . import signals  # noqa: F401
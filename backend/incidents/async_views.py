@@ -0,0 +1,216 @@
+"""
+Async read path for the high fan-out incident endpoints.
+
+Under ASGI (uvicorn, daphne) GET requests to the incident list, detail,
+updates feed, statistics, critical and board endpoints are served by coroutines
+using the async ORM and cache APIs, while every other method on the same
+URLs is dispatched to the sync IncidentViewSet. Each view is an unbound
+IncidentViewSet instance, so filtering, sparse fieldsets, serializers,
+pagination, response caching, conditional GET and error responses are the
+same as on the sync path; only the database and cache I/O is awaited.
+
+A request waiting for the database, or for another request filling a hot
+response cache key, gives its worker back to the event loop instead of
+holding a thread, and cache hits and 304s never leave the event loop for
+the ORM. Authentication and permission checks still run as one short sync
+call, since sessions and users are loaded synchronously.
+"""
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from django.urls import path
+from rest_framework import status
+from rest_framework.response import Response
+
+from .board import aactive_board
+from .caching import acached_response, aresponse_key
+from .conditional import aconditional_response
+from .models import Incident, IncidentUpdate
+from .pagination import UpdateFeedPagination
+from .statistics import acompute_statistics, exclude_duplicates, parse_dimensions
+from .views import CHANGE_VALIDATORS, IncidentViewSet, detail_validators
+
+
+def method_dispatch(async_view, sync_view):
+    """Serve GET and HEAD with async_view and every other method with the sync_view."""
+    sync_view = sync_to_async(sync_view)
+
+    async def view(request, *args, **kwargs):
+        if request.method in ('GET', 'HEAD'):
+            return await async_view(request, *args, **kwargs)
+        return await sync_view(request, *args, **kwargs)
+
+    # DRF views handle CSRF through SessionAuthentication
+    view.csrf_exempt = True
+    return view
+
+
+def read_view(action, detail=False):
+    """
+    Turn a coroutine ``handler(view, request)`` into an async Django view.
+
+    The handler runs with an IncidentViewSet instance set up for ``action``
+    as DRF's dispatch would, and its response (or exception) is finalized by
+    that viewset.
+    """
+    def decorator(handler):
+        async def view(request, *args, **kwargs):
+            viewset = IncidentViewSet(
+                action_map={'get': action, 'head': action}, basename='incident', detail=detail
+            )
+            viewset.args = args
+            viewset.kwargs = kwargs
+            request = viewset.initialize_request(request, *args, **kwargs)
+            viewset.request = request
+            viewset.headers = viewset.default_response_headers
+            try:
+                await sync_to_async(viewset.initial)(request, *args, **kwargs)
+                response = await handler(viewset, request)
+            except Exception as exc:
+                response = viewset.handle_exception(exc)
+            return viewset.finalize_response(request, response, *args, **kwargs)
+        return view
+    return decorator
+
+
+async def aget_object(view):
+    """Async variant of GenericAPIView.get_object."""
+    queryset = view.filter_queryset(view.get_queryset())
+    lookup_url_kwarg = view.lookup_url_kwarg or view.lookup_field
+    try:
+        obj = await queryset.aget(**{view.lookup_field: view.kwargs[lookup_url_kwarg]})
+    except (Incident.DoesNotExist, TypeError, ValueError, ValidationError):
+        raise Http404('No Incident matches the given query.')
+    view.check_object_permissions(view.request, obj)
+    return obj
+
+
+@read_view('list')
+async def incident_list(view, request):
+    key = await aresponse_key(request, 'list')
+    return await acached_response(request, key, lambda: _list(view, request))
+
+
+async def _list(view, request):
+    validators = await view.filter_queryset(Incident.objects.all()).order_by().aaggregate(**CHANGE_VALIDATORS)
+
+    async def build():
+        queryset = view.filter_queryset(view.get_queryset())
+        page = await view.paginator.apaginate_queryset(queryset, request, view)
+        serializer = view.get_serializer(page, many=True)
+        return view.paginator.get_paginated_response(serializer.data)
+
+    return await aconditional_response(
+        request, build, [validators['last_modified'], validators['total']],
+        validators['last_modified']
+    )
+
+
+@read_view('retrieve', detail=True)
+async def incident_detail(view, request):
+    key = await aresponse_key(request, 'retrieve', view.kwargs[view.lookup_field])
+    return await acached_response(request, key, lambda: _retrieve(view, request))
+
+
+async def _retrieve(view, request):
+    last_modified, etag_parts = detail_validators(await view.get_detail_validators_queryset().afirst())
+
+    async def build():
+        return Response(view.get_serializer(await aget_object(view)).data)
+
+    if etag_parts is None:
+        return await build()
+    return await aconditional_response(
+        request, build, etag_parts, max(filter(None, etag_parts[:2])), version=etag_parts[-1]
+    )
+
+
+@read_view('updates', detail=True)
+async def incident_updates(view, request):
+    validators = await IncidentUpdate.objects.filter(
+        incident_id=view.kwargs['pk']
+    ).order_by().aaggregate(**CHANGE_VALIDATORS)
+
+    async def build():
+        incident = await aget_object(view)
+        try:
+            queryset, serializer = view.get_updates_feed(incident)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        paginator = UpdateFeedPagination()
+        serializer.instance = await paginator.apaginate_queryset(queryset, request, view)
+        return paginator.get_paginated_response(serializer.data)
+
+    if not validators['total']:
+        return await build()
+    return await aconditional_response(
+        request, build, [validators['last_modified'], validators['total']],
+        validators['last_modified']
+    )
+
+
+@read_view('statistics')
+async def incident_statistics(view, request):
+    key = await aresponse_key(request, 'statistics')
+    return await acached_response(request, key, lambda: _statistics(view, request))
+
+
+async def _statistics(view, request):
+    try:
+        dimensions = parse_dimensions(request.query_params.getlist('group_by'))
+    except ValueError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    queryset = exclude_duplicates(view.filter_queryset(view.get_queryset()), request.query_params)
+    return Response(await acompute_statistics(queryset, dimensions))
+
+
+@read_view('critical')
+async def incident_critical(view, request):
+    key = await aresponse_key(request, 'critical')
+    return await acached_response(request, key, lambda: _critical(view, request))
+
+
+async def _critical(view, request):
+    incidents = [incident async for incident in view.get_critical_queryset()]
+    return Response(view.get_serializer(incidents, many=True).data)
+
+
+@read_view('board')
+async def incident_board(view, request):
+    key = await aresponse_key(request, 'board')
+    return await acached_response(request, key, _board)
+
+
+async def _board():
+    return Response(await aactive_board())
+
+
+# Registered ahead of the router, which keeps serving these URLs under WSGI
+urlpatterns = [
+    path('incidents/', method_dispatch(
+        incident_list, IncidentViewSet.as_view({'get': 'list', 'post': 'create'}, basename='incident', detail=False)
+    ), name='incident-list'),
+    path('incidents/statistics/', method_dispatch(
+        incident_statistics, IncidentViewSet.as_view({'get': 'statistics'}, basename='incident', detail=False)
+    ), name='incident-statistics'),
+    path('incidents/critical/', method_dispatch(
+        incident_critical, IncidentViewSet.as_view({'get': 'critical'}, basename='incident', detail=False)
+    ), name='incident-critical'),
+    path('incidents/board/', method_dispatch(
+        incident_board, IncidentViewSet.as_view({'get': 'board'}, basename='incident', detail=False)
+    ), name='incident-board'),
+    path('incidents/<int:pk>/', method_dispatch(
+        incident_detail, IncidentViewSet.as_view({
+            'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'
+        }, basename='incident', detail=True)
+    ), name='incident-detail'),
+    path('incidents/<int:pk>/updates/', method_dispatch(
+        incident_updates, IncidentViewSet.as_view({'get': 'updates', 'post': 'updates'}, basename='incident', detail=True)
+    ), name='incident-updates'),
+]
@@ -0,0 +1,156 @@
+"""
+Repeatable API benchmark scenarios.
+
+Each scenario issues the same kind of request many times through the Django
+test client (no network), recording latency and query count per request.
+Results are summarized as p50/p95 and compared against a stored baseline so
+a change to IncidentFilter, the serializers or the statistics code shows up
+as a regression or improvement.
+"""
+import json
+import math
+import random
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .models import Incident, IncidentUpdate
+
+BENCHMARK_AUTHOR = 'benchmark@example.com'
+
+# Percent change in p95 latency (or any increase in queries) reported as a regression
+DEFAULT_THRESHOLD = 20.0
+
+
+def sample_parameters(seed=0, size=100):
+    """Pick incident ids and filter values that exist in the database."""
+    rng = random.Random(seed)
+    ids = list(Incident.objects.order_by('-id').values_list('id', flat=True)[:size * 10])
+    if not ids:
+        return None
+    orgs = list(Incident.objects.order_by().values_list('reporting_org', flat=True).distinct()[:20])
+    return {'ids': rng.sample(ids, min(size, len(ids))), 'org': rng.choice(orgs)}
+
+
+def build_scenarios(params):
+    """
+    Return the benchmark scenarios.
+
+    Returns:
+        dict mapping scenario name to a callable(client, iteration) issuing one request
+    """
+    ids = params['ids']
+    org = params['org']
+
+    def get(path):
+        return lambda client, i: client.get(path)
+
+    def detail(client, i):
+        return client.get(f'/api/v1/incidents/{ids[i % len(ids)]}/')
+
+    def updates_feed(client, i):
+        return client.get(f'/api/v1/incidents/{ids[i % len(ids)]}/updates/?page_size=20')
+
+    def post_update(client, i):
+        return client.post(
+            f'/api/v1/incidents/{ids[i % len(ids)]}/updates/',
+            {'content': f'Benchmark update {i}', 'author': BENCHMARK_AUTHOR},
+            format='json'
+        )
+
+    return {
+        'list': get('/api/v1/incidents/'),
+        'list_cursor': get('/api/v1/incidents/?pagination=cursor'),
+        'filter_level_scope': get('/api/v1/incidents/?level=L5&scope=High&scope=Medium'),
+        'filter_status_org': get(f'/api/v1/incidents/?status=mitigating&status=resolved&reporting_org={org}'),
+        'filter_impact': get('/api/v1/incidents/?impacted_locations=Europe&impacted_parties=Riders'),
+        'filter_ordered': get('/api/v1/incidents/?level=L4&incident_type=Outage&ordering=-started_at'),
+        'list_search': get('/api/v1/incidents/?search=latency'),
+        'search': get('/api/v1/incidents/search/?q=replication+lag'),
+        'detail': detail,
+        'statistics': get('/api/v1/incidents/statistics/'),
+        'statistics_grouped': get('/api/v1/incidents/statistics/?group_by=reporting_org,incident_type'),
+        'critical': get('/api/v1/incidents/critical/'),
+        'board': get('/api/v1/incidents/board/'),
+        'updates_feed': updates_feed,
+        'post_update': post_update,
+    }
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(len(ordered) * pct / 100) - 1)]
+
+
+def run_scenario(client, request, iterations, warmup):
+    """
+    Time one scenario.
+
+    Returns:
+        dict with p50/p95/mean latency in milliseconds, mean and max query count
+        and the number of non-2xx responses
+    """
+    for i in range(warmup):
+        request(client, i)
+
+    timings = []
+    queries = []
+    errors = 0
+    for i in range(warmup, warmup + iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = request(client, i)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured))
+        if response.status_code >= 300:
+            errors += 1
+
+    return {
+        'p50_ms': round(percentile(timings, 50), 2),
+        'p95_ms': round(percentile(timings, 95), 2),
+        'mean_ms': round(sum(timings) / len(timings), 2),
+        'queries': round(sum(queries) / len(queries), 1),
+        'max_queries': max(queries),
+        'errors': errors,
+    }
+
+
+def compare(result, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare a scenario result with its baseline.
+
+    Returns:
+        tuple: (p95 change in percent or None, verdict string)
+    """
+    if not baseline:
+        return None, 'new'
+    change = None
+    if baseline.get('p95_ms'):
+        change = (result['p95_ms'] - baseline['p95_ms']) / baseline['p95_ms'] * 100
+    if result['max_queries'] > baseline.get('max_queries', result['max_queries']):
+        return change, 'REGRESSION (queries)'
+    if change is not None and change > threshold:
+        return change, 'REGRESSION'
+    if change is not None and change < -threshold:
+        return change, 'improved'
+    return change, 'ok'
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(path, results, meta):
+    with open(path, 'w') as f:
+        json.dump({'meta': meta, 'scenarios': results}, f, indent=2, sort_keys=True)
+
+
+def cleanup():
+    """Delete the updates posted by the post_update scenario."""
+    IncidentUpdate.objects.filter(author=BENCHMARK_AUTHOR).delete()
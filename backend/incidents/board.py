@@ -0,0 +1,147 @@
+"""
+Materialized board of the incidents that are not closed.
+
+ActiveIncident keeps one denormalized row per open incident. Rows are
+upserted whenever an incident is saved or transitioned (signals for single
+saves, explicit calls from the bulk paths) and removed when it closes, so the
+board is one query on a table sized by the open incidents, whatever the size
+of the incident history. Per-status and per-level counts are folded from the
+same rows, and the response cache keeps the result in memory between writes.
+"""
+from django.db import connection
+from django.db.models import Max, OuterRef, Subquery
+
+from .config import get_values_for_field
+from .models import ActiveIncident, Incident, IncidentStatusTransition
+
+CLOSED_STATUS = 'closed'
+
+# Incident columns copied onto the board row
+BOARD_FIELDS = (
+    'title', 'level', 'scope', 'status', 'incident_type', 'incident_commander',
+    'reporting_org', 'started_at', 'updated_at',
+)
+
+# Incident fields whose change requires a board re-sync. updated_at is only
+# copied along: it changes on every save and would never let a save skip.
+BOARD_SOURCE_FIELDS = set(BOARD_FIELDS) - {'updated_at'}
+
+
+def board_entry(incident, status_since):
+    return ActiveIncident(
+        incident_id=incident.pk, status_since=status_since,
+        **{field: getattr(incident, field) for field in BOARD_FIELDS}
+    )
+
+
+def _upsert(entries, update_fields):
+    unique_fields = ['incident'] if connection.features.supports_update_conflicts_with_target else None
+    ActiveIncident.objects.bulk_create(
+        entries, update_conflicts=True, unique_fields=unique_fields, update_fields=update_fields
+    )
+
+
+def sync_board(incidents, transitions=None, transitioned_at=None):
+    """
+    Upsert the board rows of saved incidents, removing the closed ones.
+
+    Args:
+        incidents: Saved Incident instances
+        transitions: Optional {incident id: new status} of incidents whose
+            status just changed; their status_since is reset
+        transitioned_at: Time of those transitions (default: the incident's updated_at)
+    """
+    transitions = transitions or {}
+    closed = []
+    moved = []
+    kept = []
+    for incident in incidents:
+        if incident.status == CLOSED_STATUS:
+            closed.append(incident.pk)
+        elif incident.pk in transitions:
+            moved.append(board_entry(incident, transitioned_at or incident.updated_at))
+        else:
+            # status_since only applies when the row is inserted
+            kept.append(board_entry(incident, incident.created_at or incident.updated_at))
+
+    if closed:
+        ActiveIncident.objects.filter(incident_id__in=closed).delete()
+    if moved:
+        _upsert(moved, [*BOARD_FIELDS, 'status_since'])
+    if kept:
+        _upsert(kept, list(BOARD_FIELDS))
+
+
+def rebuild_board(batch_size=1000):
+    """
+    Recreate the board from the incidents table.
+
+    status_since is taken from the latest entry into the current status in
+    the transition log, falling back to the creation time.
+
+    Returns:
+        int: Number of active incidents
+    """
+    entered = (
+        IncidentStatusTransition.objects.filter(incident=OuterRef('pk'), to_status=OuterRef('status'))
+        .order_by().values('incident').annotate(m=Max('transitioned_at')).values('m')
+    )
+    incidents = (
+        Incident.objects.exclude(status=CLOSED_STATUS)
+        .annotate(entered_at=Subquery(entered))
+        .only('id', 'created_at', *BOARD_FIELDS)
+    )
+    ActiveIncident.objects.all().delete()
+    entries = [
+        board_entry(incident, incident.entered_at or incident.created_at)
+        for incident in incidents.iterator(chunk_size=2000)
+    ]
+    ActiveIncident.objects.bulk_create(entries, batch_size=batch_size)
+    return len(entries)
+
+
+def board_rows():
+    """Return the board query: every active incident, most recently started first."""
+    return ActiveIncident.objects.values('incident_id', 'status_since', *BOARD_FIELDS)
+
+
+def summarize_board(rows):
+    """
+    Build the board response from board rows.
+
+    Returns:
+        dict with total, by_status, by_level, by_status_level ({status: {level: count}})
+        and the incidents
+    """
+    statuses = [value for value in get_values_for_field('statuses') if value != CLOSED_STATUS]
+    levels = list(get_values_for_field('levels'))
+    by_status = dict.fromkeys(statuses, 0)
+    by_level = dict.fromkeys(levels, 0)
+    by_status_level = {status: dict.fromkeys(levels, 0) for status in statuses}
+
+    incidents = []
+    for row in rows:
+        status, level = row['status'], row['level']
+        by_status[status] = by_status.get(status, 0) + 1
+        by_level[level] = by_level.get(level, 0) + 1
+        cell = by_status_level.setdefault(status, dict.fromkeys(levels, 0))
+        cell[level] = cell.get(level, 0) + 1
+        incidents.append({'id': row.pop('incident_id'), **row})
+
+    return {
+        'total': len(incidents),
+        'by_status': by_status,
+        'by_level': by_level,
+        'by_status_level': by_status_level,
+        'incidents': incidents,
+    }
+
+
+def active_board():
+    """Return the active incidents board with one query."""
+    return summarize_board(board_rows())
+
+
+async def aactive_board():
+    """Async variant of active_board."""
+    return summarize_board([row async for row in board_rows()])
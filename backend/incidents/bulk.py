@@ -0,0 +1,343 @@
+"""
+Batched write paths for incidents.
+
+These helpers write many incidents with bulk_create/bulk_update in a single
+transaction. Bulk writes bypass model signals, so they keep the tag and
+correlation indexes, the duration metrics, the active board, the response
+cache and the live event feed in sync themselves.
+"""
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .board import BOARD_SOURCE_FIELDS, sync_board
+from .caching import invalidate_incidents
+from .correlation import CORRELATION_SOURCE_FIELDS, rebuild_correlation_terms
+from .events import record_events
+from .metrics import METRIC_SOURCE_FIELDS, sync_metrics
+from .models import Incident
+from .serializers import IncidentListSerializer
+from .tags import TAG_DIMENSIONS, rebuild_tags
+from .transitions import InvalidTransition, check_transition, transition_incidents
+
+BULK_MAX_ITEMS = 500
+BULK_BATCH_SIZE = 200
+
+
+@contextmanager
+def keep_created_at(model, instances):
+    """
+    Keep the created_at values set on instances across a bulk insert.
+
+    auto_now_add stamps every inserted row with the insert time. Instances that
+    carried their own created_at (historical imports, synthetic data) get it
+    back after the block in one bulk UPDATE; the field itself is not touched.
+
+    Args:
+        model: Model class of the instances
+        instances: Unsaved instances written inside the block
+    """
+    preset = [instance.created_at for instance in instances]
+    yield
+    restored = []
+    for instance, created_at in zip(instances, preset):
+        if created_at is not None and instance.created_at != created_at:
+            instance.created_at = created_at
+            restored.append(instance)
+    model.objects.bulk_update(restored, ['created_at'], batch_size=BULK_BATCH_SIZE)
+
+
+def insert_incidents(incidents, notify=True):
+    """
+    Insert new incidents in batches and index them.
+
+    Backends that cannot return primary keys from a bulk INSERT (MySQL) read
+    them back per batch instead, see _bulk_create_reading_insert_ids. A
+    created_at set on an instance is kept, see keep_created_at.
+
+    Args:
+        incidents: List of unsaved Incident instances
+        notify: Record incident_created feed events, which also queue email
+            notifications. Historical imports pass False.
+
+    Returns:
+        The same instances with primary keys set
+    """
+    if not incidents:
+        return incidents
+
+    with keep_created_at(Incident, incidents):
+        if connection.features.can_return_rows_from_bulk_insert:
+            Incident.objects.bulk_create(incidents, batch_size=BULK_BATCH_SIZE)
+        else:
+            _bulk_create_reading_insert_ids(incidents)
+
+    rebuild_tags(incidents)
+    rebuild_correlation_terms(incidents)
+    sync_metrics(incidents)
+    sync_board(incidents)
+    invalidate_incidents([incident.pk for incident in incidents])
+    if notify:
+        record_events(
+            (incident.pk, 'incident_created', IncidentListSerializer(incident).data)
+            for incident in incidents
+        )
+    for incident in incidents:
+        incident.snapshot_loaded_values()
+    return incidents
+
+
+def _bulk_create_reading_insert_ids(incidents):
+    """
+    Bulk insert incidents and derive their ids from the first id of each INSERT.
+
+    InnoDB hands the rows of one multi-row INSERT consecutive auto-increment
+    values (lock modes 1 and 2), spaced by auto_increment_increment, and
+    LAST_INSERT_ID() returns the first of them. SQLite builds without
+    RETURNING serialize writers, so the ids end at last_insert_rowid().
+    """
+    with connection.cursor() as cursor:
+        step = 1
+        if connection.vendor == 'mysql':
+            cursor.execute('SELECT @@auto_increment_increment')
+            step = cursor.fetchone()[0]
+        for start in range(0, len(incidents), BULK_BATCH_SIZE):
+            batch = incidents[start:start + BULK_BATCH_SIZE]
+            Incident.objects.bulk_create(batch, batch_size=len(batch))
+            if connection.vendor == 'mysql':
+                cursor.execute('SELECT LAST_INSERT_ID()')
+                first_id = cursor.fetchone()[0]
+            else:
+                cursor.execute('SELECT last_insert_rowid()')
+                first_id = cursor.fetchone()[0] - len(batch) + 1
+            for offset, incident in enumerate(batch):
+                incident.pk = first_id + offset * step
+
+
+def save_changed_incidents(incidents):
+    """
+    Write field changes of loaded incidents with one bulk UPDATE per batch.
+
+    Only the columns that changed on at least one incident are written.
+    Tags are rebuilt when a list field changed and feed events are recorded.
+
+    Args:
+        incidents: List of Incident instances loaded from the database and modified
+    """
+    changes = {incident.pk: incident.get_changed_fields() or {} for incident in incidents}
+    changed_incidents = [incident for incident in incidents if changes[incident.pk]]
+    if not changed_incidents:
+        return
+
+    now = timezone.now()
+    fields = {'updated_at', 'version'}
+    for incident in changed_incidents:
+        incident.updated_at = now
+        incident.version += 1
+        fields.update(changes[incident.pk])
+
+    Incident.objects.bulk_update(changed_incidents, sorted(fields), batch_size=BULK_BATCH_SIZE)
+
+    if fields & set(TAG_DIMENSIONS):
+        rebuild_tags(changed_incidents)
+    
+    correlated = [incident for incident in changed_incidents if set(changes[incident.pk]) & CORRELATION_SOURCE_FIELDS]
+    if correlated:
+        rebuild_correlation_terms(correlated)
+    
+    metric_incidents = [incident for incident in changed_incidents if set(changes[incident.pk]) & METRIC_SOURCE_FIELDS]
+    if metric_incidents:
+        transitions = {
+            incident.pk: changes[incident.pk]['status'][1]
+            for incident in metric_incidents if 'status' in changes[incident.pk]
+        }
+        sync_metrics(metric_incidents, transitions=transitions, transitioned_at=now)
+    
+    board_incidents = [incident for incident in changed_incidents if set(changes[incident.pk]) & BOARD_SOURCE_FIELDS]
+    if board_incidents:
+        transitions = {
+            incident.pk: changes[incident.pk]['status'][1]
+            for incident in board_incidents if 'status' in changes[incident.pk]
+        }
+        sync_board(board_incidents, transitions=transitions, transitioned_at=now)
+    invalidate_incidents([incident.pk for incident in changed_incidents])
+
+    events = []
+    for incident in changed_incidents:
+        changed = dict(changes[incident.pk])
+        changed.pop('updated_at', None)
+        status_change = changed.pop('status', None)
+        if status_change:
+            events.append((incident.pk, 'status_changed', {
+                'from': status_change[0], 'to': status_change[1], 'updated_at': now,
+            }))
+        if changed:
+            events.append((incident.pk, 'incident_updated', {
+                'fields': {name: new for name, (old, new) in changed.items()}, 'updated_at': now,
+            }))
+        incident.snapshot_loaded_values()
+    record_events(events)
+
+
+def bulk_create_incidents(items, serializer_class, context, created_by=None):
+    """
+    Validate and create many incidents with partial-failure semantics.
+
+    Args:
+        items: List of creation payloads
+        serializer_class: Serializer used to validate each payload
+        context: Serializer context
+        created_by: User recorded as creator, or None
+
+    Returns:
+        List of per-item result dicts in input order
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item, context=context)
+        if serializer.is_valid():
+            data = dict(serializer.validated_data)
+            data.setdefault('status', 'reported')
+            valid.append((index, Incident(created_by=created_by, **data)))
+        else:
+            results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+
+    with transaction.atomic():
+        insert_incidents([incident for _, incident in valid])
+
+    for index, incident in valid:
+        results[index] = {'index': index, 'status': 'created', 'id': incident.pk}
+    return results
+
+
+def bulk_update_incidents(items, serializer_class, context):
+    """
+    Validate and apply partial updates to many incidents.
+
+    Each item must carry the incident ``id`` plus the fields to change, and
+    may carry the ``version`` it was read at; rows are locked for the
+    transaction so a stale version is rejected instead of overwritten.
+    Status changes are applied through the status state machine. An item
+    whose fields were written but whose status change lost a race is
+    reported as ``partial``.
+
+    Returns:
+        List of per-item result dicts in input order
+    """
+    results = [None] * len(items)
+    with transaction.atomic():
+        incidents = Incident.objects.select_for_update().in_bulk(_item_ids(items))
+        duplicates = _duplicate_ids(items)
+        updated = []
+        targets = []
+        for index, item in enumerate(items):
+            incident = _lookup(item, incidents, index, results, duplicates)
+            if incident is None:
+                continue
+            if 'version' in item and item['version'] != incident.version:
+                results[index] = {'index': index, 'status': 'error', 'errors': {
+                    'version': f'Incident was modified concurrently (current version {incident.version})'
+                }}
+                continue
+            data = {key: value for key, value in item.items() if key not in ('id', 'version')}
+            serializer = serializer_class(incident, data=data, partial=True, context=context)
+            if not serializer.is_valid():
+                results[index] = {'index': index, 'status': 'error', 'errors': serializer.errors}
+                continue
+            validated_data = dict(serializer.validated_data)
+            new_status = validated_data.pop('status', incident.status)
+            for attr, value in validated_data.items():
+                setattr(incident, attr, value)
+            if new_status != incident.status:
+                targets.append((incident, new_status))
+            updated.append((index, incident))
+
+        save_changed_incidents([incident for _, incident in updated])
+        _, conflicts = transition_incidents(targets, user=_context_user(context))
+
+    conflicted = {incident.pk for incident in conflicts}
+    for index, incident in updated:
+        if incident.pk in conflicted:
+            results[index] = {
+                'index': index, 'status': 'partial', 'id': incident.pk, 'version': incident.version,
+                'errors': {'status': 'Incident status changed concurrently; the other fields were updated'},
+            }
+        else:
+            results[index] = {'index': index, 'status': 'updated', 'id': incident.pk, 'version': incident.version}
+    return results
+
+
+def bulk_transition_incidents(items, user=None):
+    """
+    Apply status transitions to many incidents.
+
+    Each item is ``{"id": <incident id>, "status": <new status>}``; the new
+    status must be the next one in the incident flow.
+
+    Returns:
+        List of per-item result dicts in input order
+    """
+    results = [None] * len(items)
+    incidents = Incident.objects.in_bulk(_item_ids(items))
+    duplicates = _duplicate_ids(items)
+    targets = []
+    for index, item in enumerate(items):
+        incident = _lookup(item, incidents, index, results, duplicates)
+        if incident is None:
+            continue
+        new_status = item.get('status')
+        try:
+            check_transition(incident.status, new_status)
+        except InvalidTransition as e:
+            results[index] = {'index': index, 'status': 'error', 'errors': {'status': str(e)}}
+            continue
+        targets.append((index, incident, new_status))
+
+    _, conflicts = transition_incidents([(incident, new_status) for _, incident, new_status in targets], user=user)
+
+    conflicted = {incident.pk for incident in conflicts}
+    for index, incident, _ in targets:
+        if incident.pk in conflicted:
+            results[index] = {'index': index, 'status': 'error', 'errors': {'status': 'Incident status changed concurrently'}}
+        else:
+            results[index] = {'index': index, 'status': 'updated', 'id': incident.pk, 'incident_status': incident.status}
+    return results
+
+
+def _context_user(context):
+    request = context.get('request')
+    if request is not None and request.user.is_authenticated:
+        return request.user
+    return None
+
+
+def _item_ids(items):
+    ids = []
+    for item in items:
+        try:
+            ids.append(int(item.get('id')))
+        except (AttributeError, TypeError, ValueError):
+            pass
+    return ids
+
+
+def _duplicate_ids(items):
+    return {pk for pk, count in Counter(_item_ids(items)).items() if count > 1}
+
+
+def _lookup(item, incidents, index, results, duplicates=()):
+    """Resolve the incident an item refers to, recording an error result if missing or repeated."""
+    try:
+        incident = incidents.get(int(item.get('id')))
+    except (AttributeError, TypeError, ValueError):
+        results[index] = {'index': index, 'status': 'error', 'errors': {'id': 'A valid incident id is required'}}
+        return None
+    if int(item.get('id')) in duplicates:
+        results[index] = {'index': index, 'status': 'error', 'errors': {'id': 'Incident appears more than once in the request'}}
+        return None
+    if incident is None:
+        results[index] = {'index': index, 'status': 'error', 'errors': {'id': 'Incident not found'}}
+    return incident
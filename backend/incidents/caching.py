@@ -0,0 +1,225 @@
+"""
+Read-through response cache for the incident read endpoints.
+
+Cached responses live in Django's cache (locmem, file, Redis...) under keys
+that embed a generation token: one per incident for detail responses and one
+shared by all list-shaped responses (list, statistics, critical). A write
+replaces the affected tokens after commit, so stale entries are never read
+again and simply expire. A miss on a hot key is computed by one request while
+concurrent ones wait for its result instead of all hitting the database.
+The a-prefixed variants serve the async read views through the async cache
+API, waiting on a hot key with asyncio.sleep instead of blocking a thread.
+"""
+import asyncio
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+LIST_GENERATION_KEY = 'incidents:cache-gen:list'
+INCIDENT_GENERATION_KEY = 'incidents:cache-gen:incident:{}'
+
+# A recomputation holding the lock longer than this is assumed dead
+LOCK_TIMEOUT = 10
+# How long a request waits for another one to fill the key before computing itself
+LOCK_WAIT = 5
+LOCK_POLL_INTERVAL = 0.05
+
+CACHED_HEADERS = ('ETag', 'Last-Modified')
+
+
+def cache_timeout():
+    return getattr(settings, 'INCIDENT_CACHE_TIMEOUT', 300)
+
+
+def _generations(keys):
+    """Return the current token of each generation key, creating missing ones."""
+    tokens = cache.get_many(keys)
+    for key in keys:
+        if key not in tokens:
+            cache.add(key, uuid.uuid4().hex, None)
+            tokens[key] = cache.get(key)
+    return [tokens[key] for key in keys]
+
+
+async def _agenerations(keys):
+    tokens = await cache.aget_many(keys)
+    for key in keys:
+        if key not in tokens:
+            await cache.aadd(key, uuid.uuid4().hex, None)
+            tokens[key] = await cache.aget(key)
+    return [tokens[key] for key in keys]
+
+
+def _generation_key(incident_id):
+    return LIST_GENERATION_KEY if incident_id is None else INCIDENT_GENERATION_KEY.format(incident_id)
+
+
+def _response_key(request, scope, generation):
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f'incidents:response:{scope}:{generation}:{digest}'
+
+
+def response_key(request, scope, incident_id=None):
+    """
+    Build the cache key of a GET response.
+
+    Args:
+        request: Incoming request; its full path carries the filter params
+        scope: Action name
+        incident_id: Incident of a detail response, or None for list-shaped ones
+    """
+    generation, = _generations([_generation_key(incident_id)])
+    return _response_key(request, scope, generation)
+
+
+async def aresponse_key(request, scope, incident_id=None):
+    """Async variant of response_key."""
+    generation, = await _agenerations([_generation_key(incident_id)])
+    return _response_key(request, scope, generation)
+
+
+def invalidate_incidents(incident_ids=(), lists=True):
+    """
+    Replace the generation tokens of changed incidents once the transaction commits.
+
+    Args:
+        incident_ids: Incidents whose detail responses changed
+        lists: Whether list-shaped responses changed too
+    """
+    keys = [INCIDENT_GENERATION_KEY.format(incident_id) for incident_id in incident_ids]
+    if lists:
+        keys.append(LIST_GENERATION_KEY)
+    if keys:
+        transaction.on_commit(lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, None))
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Return the cached value for key, computing it at most once at a time.
+
+    The first request to miss takes a short lock (``cache.add``) and computes
+    the value; others poll for the result for up to LOCK_WAIT seconds before
+    computing it themselves.
+
+    Args:
+        key: Cache key
+        compute: Callable returning (value, cacheable)
+        timeout: Cache timeout in seconds (default: INCIDENT_CACHE_TIMEOUT)
+
+    Returns:
+        The cached or computed value
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    if not locked:
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key)
+            if value is not None:
+                return value
+    try:
+        value, cacheable = compute()
+        if cacheable:
+            cache.set(key, value, cache_timeout() if timeout is None else timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
+
+
+async def aget_or_compute(key, compute, timeout=None):
+    """Async variant of get_or_compute; compute is a coroutine function."""
+    value = await cache.aget(key)
+    if value is not None:
+        return value
+
+    lock_key = f'{key}:lock'
+    locked = await cache.aadd(lock_key, 1, LOCK_TIMEOUT)
+    if not locked:
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            value = await cache.aget(key)
+            if value is not None:
+                return value
+    try:
+        value, cacheable = await compute()
+        if cacheable:
+            await cache.aset(key, value, cache_timeout() if timeout is None else timeout)
+    finally:
+        if locked:
+            await cache.adelete(lock_key)
+    return value
+
+
+def _cache_entry(response):
+    """Return (cache entry, cacheable) for a built response."""
+    if response.status_code != 200:
+        return response, False
+    headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+    return {'data': response.data, 'headers': headers}, True
+
+
+def _cached_hit(request, entry):
+    """Answer a request from a cache entry, with 304 when the client copy is current."""
+    headers = entry['headers']
+    last_modified = parse_http_date_safe(headers['Last-Modified']) if 'Last-Modified' in headers else None
+    not_modified = get_conditional_response(request, etag=headers.get('ETag'), last_modified=last_modified)
+    if not_modified is not None:
+        patch_cache_control(not_modified, no_cache=True)
+        return not_modified
+    response = Response(entry['data'], headers=headers)
+    patch_cache_control(response, no_cache=True)
+    return response
+
+
+def cached_response(request, key, build_response):
+    """
+    Serve a GET response from the cache, building it on a miss.
+
+    Only 200 responses are stored, together with their ETag and Last-Modified
+    validators so a cached hit still answers 304 to a current client.
+
+    Args:
+        request: Incoming request
+        key: Key from response_key
+        build_response: Callable producing the full (possibly conditional) response
+    """
+    built = None
+
+    def compute():
+        nonlocal built
+        built = build_response()
+        return _cache_entry(built)
+
+    entry = get_or_compute(key, compute)
+    if built is not None:
+        return built
+    return _cached_hit(request, entry)
+
+
+async def acached_response(request, key, build_response):
+    """Async variant of cached_response; build_response is a coroutine function."""
+    built = None
+
+    async def compute():
+        nonlocal built
+        built = await build_response()
+        return _cache_entry(built)
+
+    entry = await aget_or_compute(key, compute)
+    if built is not None:
+        return built
+    return _cached_hit(request, entry)
@@ -0,0 +1,73 @@
+"""
+Optimistic concurrency control for incident writes.
+
+Every incident row carries a ``version`` that is incremented on each update.
+Clients send the version they last read, or the detail ETag which starts with
+it, in ``If-Match``; the write is then a conditional
+``UPDATE ... SET version = version + 1 WHERE version = <expected>`` touching
+only the changed columns, and a lost race is reported instead of
+overwriting. Writes without If-Match still bump the version in SQL, so no two
+writes ever share a version.
+"""
+from .models import Incident
+
+
+class VersionConflict(Exception):
+    """Raised when the stored incident version differs from the expected one."""
+
+    def __init__(self, current_version):
+        super().__init__(f'Incident was modified concurrently (current version {current_version})')
+        self.current_version = current_version
+
+
+def parse_if_match(request):
+    """
+    Return the incident version from the If-Match header.
+
+    Accepts ``"3"``, ``W/"3"`` or ``3`` as well as the detail ETag
+    ``W/"3.<digest>"``; ``*`` or a missing header means the write is
+    unconditional.
+
+    Returns:
+        int version, or None
+
+    Raises:
+        ValueError: If the header does not carry a version number
+    """
+    value = request.headers.get('If-Match', '').strip()
+    if not value or value == '*':
+        return None
+    if value.startswith('W/'):
+        value = value[2:]
+    return int(value.strip('"').split('.', 1)[0])
+
+
+def current_version(incident_id):
+    return Incident.objects.filter(pk=incident_id).values_list('version', flat=True).first()
+
+
+def save_incident(incident, fields=None, expected_version=None):
+    """
+    Write an incident's changed columns, optionally conditioned on its version.
+
+    Args:
+        incident: Incident loaded from the database and modified
+        fields: Names of the changed fields, or None to write every column
+        expected_version: Version the client last read, or None to skip the check
+
+    Returns:
+        bool: Whether a row was written (False when nothing changed)
+
+    Raises:
+        VersionConflict: If the stored version differs from expected_version
+    """
+    if fields is not None and not fields:
+        if expected_version is not None and expected_version != incident.version:
+            raise VersionConflict(incident.version)
+        return False
+
+    update_fields = None if fields is None else {*fields, 'updated_at'}
+    conditions = {} if expected_version is None else {'version': expected_version}
+    if not incident.write_update(update_fields, **conditions):
+        raise VersionConflict(current_version(incident.pk))
+    return True
@@ -0,0 +1,77 @@
+"""
+Conditional GET support (ETag / Last-Modified) for incident resources.
+
+Validators are computed from cheap aggregates such as max(updated_at) and row
+counts, so a matching If-None-Match / If-Modified-Since request is answered
+with 304 before any serializer runs. Incident detail ETags start with the
+incident version, so they can be sent back in If-Match on writes.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def make_etag(request, *parts, version=None):
+    """
+    Build a weak ETag from validator parts and the request query string.
+
+    The query string is included because filters, ordering, pagination and
+    sparse fieldsets all change the representation. With a version the tag
+    reads ``W/"<version>.<digest>"``.
+    """
+    raw = '|'.join([request.get_full_path()] + [str(part) for part in parts])
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    if version is not None:
+        digest = f'{version}.{digest}'
+    return 'W/"%s"' % digest
+
+
+def _check_validators(request, etag_parts, last_modified, version=None):
+    """Return (etag, timestamp, 304 response or None) for the current validators."""
+    etag = make_etag(request, *etag_parts, version=version)
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if not_modified is not None:
+        patch_cache_control(not_modified, no_cache=True)
+    return etag, timestamp, not_modified
+
+
+def _attach_validators(response, etag, timestamp):
+    if response.status_code == 200:
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        # Let clients store the response but always revalidate it
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_response(request, build_response, etag_parts, last_modified=None, version=None):
+    """
+    Return 304 when the client's validators match, otherwise build the response.
+
+    Args:
+        request: Incoming request
+        build_response: Callable producing the full response
+        etag_parts: Values identifying the current state of the resource
+        last_modified: Optional datetime of the last change
+        version: Optional resource version to lead the ETag with
+
+    Returns:
+        HttpResponseNotModified or the built response with validators attached
+    """
+    etag, timestamp, not_modified = _check_validators(request, etag_parts, last_modified, version)
+    if not_modified is not None:
+        return not_modified
+    return _attach_validators(build_response(), etag, timestamp)
+
+
+async def aconditional_response(request, build_response, etag_parts, last_modified=None, version=None):
+    """Async variant of conditional_response; build_response is a coroutine function."""
+    etag, timestamp, not_modified = _check_validators(request, etag_parts, last_modified, version)
+    if not_modified is not None:
+        return not_modified
+    return _attach_validators(await build_response(), etag, timestamp)
@@ -1,67 +1,262 @@
 """
 Shared configuration loader for incident management.
 Loads configuration from shared-config.json to ensure consistency between frontend and backend.
+
+The file is parsed once into a ConfigSnapshot with precomputed value tuples,
+frozensets and label maps. The registry re-stats the file at most every
+SHARED_CONFIG_RELOAD_INTERVAL seconds and swaps in a new snapshot when its
+modification time or size changed, so every worker process picks up an
+edited file on its own without a restart or any coordination. Reload
+listeners (model choices, response cache) are notified of each new snapshot.
+
+The module-level *_CHOICES constants are the values at import time, used by
+model definitions and migrations (the config-backed model fields read their
+choices from the current snapshot through ConfigChoices); everything else
+calls the functions below or shared_config(), and SharedConfigMiddleware
+checks the file once per request, so writes validate against the current
+values even when no read has triggered a reload.
 """
 import json
+import logging
 import os
+import threading
+import time
+from collections.abc import Sequence
 from pathlib import Path
 
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+logger = logging.getLogger(__name__)
+
 # Path to the shared config file (in src directory)
 CONFIG_FILE = Path(__file__).parent.parent.parent / 'src' / 'shared-config.json'
 
-def load_shared_config():
+DEFAULT_RELOAD_INTERVAL = 2.0
+
+
+def load_shared_config(path=CONFIG_FILE):
     """Load the shared configuration from JSON file."""
     try:
-        with open(CONFIG_FILE, 'r') as f:
+        with open(path, 'r') as f:
             return json.load(f)
     except FileNotFoundError:
-        raise FileNotFoundError(f"Shared config file not found: {CONFIG_FILE}")
+        raise FileNotFoundError(f"Shared config file not found: {path}")
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON in shared config file: {e}")
 
-# Load the config once at module import
-_config = load_shared_config()
-INCIDENT_CONFIG = _config['incident']
+
+class ConfigSnapshot:
+    """Immutable parsed configuration with precomputed lookups."""
+
+    def __init__(self, raw, version):
+        self.raw = raw
+        self.incident = raw['incident']
+        self.version = version
+        self.values = {}
+        self.value_sets = {}
+        self.labels = {}
+        self.choices = {}
+        for name, items in self.incident.items():
+            if not isinstance(items, list) or not all(isinstance(item, dict) and 'value' in item for item in items):
+                continue
+            self.values[name] = tuple(item['value'] for item in items)
+            self.value_sets[name] = frozenset(self.values[name])
+            self.labels[name] = {item['value']: item.get('label', item['value']) for item in items}
+            self.choices[name] = tuple((item['value'], item.get('label', item['value'])) for item in items)
+
+
+class ConfigRegistry:
+    """
+    Lazily loaded, hot reloading holder of the current ConfigSnapshot.
+
+    Reading the snapshot costs one clock read; at most once per interval it
+    also costs an os.stat of the file. A reload that fails to parse keeps the
+    previous snapshot and logs the error.
+    """
+
+    def __init__(self, path=CONFIG_FILE, reload_interval=None):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.lock = threading.Lock()
+        self.listeners = []
+        self.current = None
+        self.stamp = None
+        self.checked_at = 0.0
+
+    def get_reload_interval(self):
+        if self.reload_interval is not None:
+            return self.reload_interval
+        from django.conf import settings
+        return getattr(settings, 'SHARED_CONFIG_RELOAD_INTERVAL', DEFAULT_RELOAD_INTERVAL)
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def snapshot(self):
+        """Return the current snapshot, reloading it if the file changed."""
+        if self.current is None:
+            with self.lock:
+                if self.current is None:
+                    self.stamp = self._file_stamp()
+                    self.current = ConfigSnapshot(load_shared_config(self.path), self.stamp)
+                    self.checked_at = time.monotonic()
+            return self.current
+
+        now = time.monotonic()
+        if now - self.checked_at >= self.get_reload_interval():
+            self.checked_at = now
+            self.reload()
+        return self.current
+
+    def check_due(self):
+        """Whether the next snapshot() call loads or re-stats the file."""
+        return self.current is None or time.monotonic() - self.checked_at >= self.get_reload_interval()
+
+    def reload(self, force=False):
+        """
+        Re-read the file if its modification time or size changed.
+
+        Returns:
+            bool: Whether a new snapshot was installed
+        """
+        with self.lock:
+            try:
+                stamp = self._file_stamp()
+                if stamp == self.stamp and not force:
+                    return False
+                snapshot = ConfigSnapshot(load_shared_config(self.path), stamp)
+            except (OSError, ValueError, KeyError):
+                logger.exception('Could not reload shared config from %s; keeping the previous version', self.path)
+                return False
+            self.current = snapshot
+            self.stamp = stamp
+
+        logger.info('Reloaded shared config from %s', self.path)
+        for listener in list(self.listeners):
+            try:
+                listener(snapshot)
+            except Exception:
+                logger.exception('Shared config reload listener failed')
+        return True
+
+    def subscribe(self, listener):
+        """Call listener(snapshot) after every reload."""
+        self.listeners.append(listener)
+        return listener
+
+
+registry = ConfigRegistry()
+
+
+def shared_config():
+    """Return the current ConfigSnapshot."""
+    return registry.snapshot()
+
 
 def get_choices_for_field(field_name):
     """
     Convert config array to Django choices format.
-    
+
     Args:
         field_name: Name of the field in the config
-        
+
     Returns:
         List of tuples in Django choices format: [(value, label), ...]
     """
-    field_config = INCIDENT_CONFIG.get(field_name, [])
-    return [(item['value'], item['label']) for item in field_config]
+    return list(shared_config().choices.get(field_name, ()))
+
 
 def get_values_for_field(field_name):
     """
     Get just the values for a field.
-    
+
     Args:
         field_name: Name of the field in the config
-        
+
     Returns:
-        List of values: [value1, value2, ...]
+        Tuple of values: (value1, value2, ...), shared between callers
     """
-    field_config = INCIDENT_CONFIG.get(field_name, [])
-    return [item['value'] for item in field_config]
+    return shared_config().values.get(field_name, ())
+
+
+def get_label(field_name, value):
+    """Return the display label of a config value, or the value itself if unknown."""
+    return shared_config().labels.get(field_name, {}).get(value, value)
+
 
 def validate_field_value(field_name, value):
     """
     Validate that a value is allowed for a given field.
-    
+
     Args:
         field_name: Name of the field in the config
         value: Value to validate
-        
+
     Returns:
         bool: True if valid, False otherwise
     """
-    valid_values = get_values_for_field(field_name)
-    return value in valid_values
+    return value in shared_config().value_sets.get(field_name, frozenset())
+
+
+class ConfigChoices(Sequence):
+    """
+    Model field choices backed by the current shared config snapshot.
+
+    Installed once on a config-backed field, so a reload swaps its choices in
+    whole along with the snapshot; the shared field objects are never mutated
+    afterwards. Reading never touches the file: requests and the other
+    readers keep the snapshot current.
+    """
+
+    def __init__(self, config_key):
+        self.config_key = config_key
+
+    def _choices(self):
+        snapshot = registry.current or registry.snapshot()
+        return snapshot.choices.get(self.config_key, ())
+
+    def __getitem__(self, index):
+        return self._choices()[index]
+
+    def __len__(self):
+        return len(self._choices())
+
+    def __iter__(self):
+        return iter(self._choices())
+
+    def __repr__(self):
+        return f'ConfigChoices({self.config_key!r})'
+
+
+class SharedConfigMiddleware:
+    """
+    Pick up shared config changes before the request is handled.
+
+    At most one os.stat per reload interval, plus the reload listeners when
+    the file changed. Under ASGI that work runs in a worker thread, never on
+    the event loop.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        registry.snapshot()
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        if registry.check_due():
+            await sync_to_async(registry.snapshot, thread_sensitive=False)()
+        return await self.get_response(request)
+
 
 # Pre-computed choices for Django models
 LEVEL_CHOICES = get_choices_for_field('levels')
@@ -71,11 +266,3 @@ STATUS_CHOICES = get_choices_for_field('statuses')
 IMPACT_CHOICES = get_choices_for_field('impactOptions')
 TIME_FORMAT_CHOICES = get_choices_for_field('timeFormats')
 DETECTION_SOURCE_CHOICES = get_choices_for_field('detectionSources')
-
-# Lists for validation
-VALID_LEVELS = get_values_for_field('levels')
-VALID_SCOPES = get_values_for_field('scopes')
-VALID_TYPES = get_values_for_field('types')
-VALID_STATUSES = get_values_for_field('statuses')
-VALID_IMPACTED_LOCATIONS = get_values_for_field('impactedLocations')
-VALID_IMPACTED_PARTIES = get_values_for_field('impactedParties') 
\ No newline at end of file
@@ -0,0 +1,314 @@
+"""
+Duplicate detection for incidents.
+
+Every incident is indexed into CorrelationTerm rows: its normalized title and
+description tokens plus its impacted_* values, each stamped with the
+incident's started_at. Candidates for an incident are read from the posting
+lists of its own terms, restricted by the (kind, term, started_at) index to
+incidents that started within the correlation window, and counted per
+incident in one grouped query. So the work grows with the number of incidents
+sharing a term in that window, never with the size of the incident history.
+
+Candidates are ranked by a weighted Jaccard similarity of the text tokens and
+of the impacted_* values. Linked duplicates point at their parent through
+Incident.duplicate_of, always one level deep.
+"""
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import CorrelationTerm, Incident
+from .tags import TAG_DIMENSIONS, normalize_tag_values
+
+TEXT_KIND = CorrelationTerm.TEXT_KIND
+TERM_MAX_LENGTH = CorrelationTerm._meta.get_field('term').max_length
+TERM_MIN_LENGTH = 3
+MAX_TEXT_TERMS = 64
+
+# Words carrying no signal for telling incidents apart
+STOPWORDS = frozenset('''
+    about after all also and any are been before being but can could did does due during for from
+    had has have incident incidents into issue issues its not now our out over per some than that
+    the their them then there these they this those under was were when where which while will
+    with would you your
+'''.split())
+
+# Incident fields the correlation terms are derived from
+CORRELATION_SOURCE_FIELDS = {'title', 'description', 'started_at', *TAG_DIMENSIONS}
+
+TEXT_WEIGHT = 0.6
+TAG_WEIGHT = 0.4
+
+# Candidates scoring lower are not proposed by the API
+DEFAULT_MIN_SCORE = 0.2
+
+# Incidents sharing the most terms that are scored per lookup
+CANDIDATE_POOL = 200
+
+
+class DuplicateLinkError(ValueError):
+    """Raised when an incident cannot be linked as a duplicate of another."""
+
+
+def correlation_window():
+    """Return the default time window around started_at candidates are searched in."""
+    return timedelta(hours=settings.INCIDENT_CORRELATION_WINDOW_HOURS)
+
+
+def text_terms(*texts):
+    """
+    Normalize free text into correlation tokens.
+
+    Returns:
+        List of unique lower-cased word tokens in text order, without
+        stopwords and short tokens, at most MAX_TEXT_TERMS long
+    """
+    terms = []
+    seen = set()
+    for text in texts:
+        for term in re.findall(r'\w+', (text or '').lower()):
+            if len(term) < TERM_MIN_LENGTH or term in STOPWORDS or term in seen:
+                continue
+            seen.add(term)
+            terms.append(term[:TERM_MAX_LENGTH])
+            if len(terms) == MAX_TEXT_TERMS:
+                return terms
+    return terms
+
+
+def terms_for_incident(incident):
+    """Return the set of (kind, term) pairs an incident is indexed under."""
+    terms = {(TEXT_KIND, term) for term in text_terms(incident.title, incident.description)}
+    terms.update(
+        (dimension, value)
+        for dimension in TAG_DIMENSIONS
+        for value in normalize_tag_values(getattr(incident, dimension))
+    )
+    return terms
+
+
+def sync_correlation_terms(incident, created=False):
+    """
+    Bring the correlation terms of an incident in line with its fields.
+
+    Args:
+        incident: Saved Incident instance
+        created: True when the incident was just inserted and has no terms yet
+    """
+    wanted = terms_for_incident(incident)
+
+    with transaction.atomic():
+        if created:
+            existing = set()
+        else:
+            existing = set(
+                CorrelationTerm.objects.filter(incident_id=incident.pk).values_list('kind', 'term')
+            )
+            CorrelationTerm.objects.filter(incident_id=incident.pk).exclude(
+                started_at=incident.started_at
+            ).update(started_at=incident.started_at)
+
+        stale = existing - wanted
+        for kind in {kind for kind, _ in stale}:
+            CorrelationTerm.objects.filter(
+                incident_id=incident.pk, kind=kind,
+                term__in=[term for k, term in stale if k == kind]
+            ).delete()
+
+        missing = wanted - existing
+        if missing:
+            CorrelationTerm.objects.bulk_create([
+                CorrelationTerm(incident_id=incident.pk, kind=kind, term=term, started_at=incident.started_at)
+                for kind, term in missing
+            ])
+
+
+def rebuild_correlation_terms(incidents):
+    """
+    Replace the correlation terms for a batch of incidents.
+
+    Used by the backfill command and by bulk write paths that bypass signals.
+
+    Args:
+        incidents: Iterable of saved Incident instances with the source fields loaded
+    """
+    incidents = list(incidents)
+    if not incidents:
+        return
+
+    with transaction.atomic():
+        CorrelationTerm.objects.filter(incident_id__in=[i.pk for i in incidents]).delete()
+        CorrelationTerm.objects.bulk_create([
+            CorrelationTerm(incident_id=incident.pk, kind=kind, term=term, started_at=incident.started_at)
+            for incident in incidents
+            for kind, term in terms_for_incident(incident)
+        ], batch_size=1000)
+
+
+def _jaccard(shared, own, other):
+    union = own + other - shared
+    return shared / union if union else 0.0
+
+
+def find_duplicate_candidates(incident, window=None, limit=10, min_score=0.0):
+    """
+    Rank the incidents most likely to describe the same problem as incident.
+
+    Args:
+        incident: Saved Incident instance
+        window: Maximum started_at distance (default: correlation_window())
+        limit: Maximum number of candidates returned
+        min_score: Minimum similarity score, between 0 and 1
+
+    Returns:
+        List of dicts with the candidate's id, title, status, level, scope,
+        started_at and duplicate_of, its score, text_similarity and
+        tag_similarity, and the number of shared tokens and tags, best first.
+        Incidents already linked to this one are left out.
+    """
+    terms = terms_for_incident(incident)
+    if not terms:
+        return []
+    window = correlation_window() if window is None else window
+
+    by_kind = {}
+    for kind, term in terms:
+        by_kind.setdefault(kind, []).append(term)
+    lookup = Q()
+    for kind, values in by_kind.items():
+        lookup |= Q(kind=kind, term__in=values)
+
+    hits = (
+        CorrelationTerm.objects.filter(
+            lookup, started_at__range=(incident.started_at - window, incident.started_at + window)
+        )
+        .exclude(incident_id=incident.pk)
+        .values('incident_id', 'kind').annotate(n=Count('id')).order_by()
+    )
+    shared = {}
+    for row in hits:
+        counts = shared.setdefault(row['incident_id'], [0, 0])
+        counts[row['kind'] != TEXT_KIND] += row['n']
+    if not shared:
+        return []
+    pool = sorted(shared, key=lambda pk: sum(shared[pk]), reverse=True)[:CANDIDATE_POOL]
+
+    sizes = {pk: [0, 0] for pk in pool}
+    for row in (
+        CorrelationTerm.objects.filter(incident_id__in=pool)
+        .values('incident_id', 'kind').annotate(n=Count('id')).order_by()
+    ):
+        sizes[row['incident_id']][row['kind'] != TEXT_KIND] += row['n']
+
+    own_text = len(by_kind.get(TEXT_KIND, ()))
+    own_tags = len(terms) - own_text
+    scored = {}
+    for pk in pool:
+        (shared_text, shared_tags), (text_size, tag_size) = shared[pk], sizes[pk]
+        parts = []
+        if own_text or text_size:
+            parts.append((TEXT_WEIGHT, _jaccard(shared_text, own_text, text_size)))
+        if own_tags or tag_size:
+            parts.append((TAG_WEIGHT, _jaccard(shared_tags, own_tags, tag_size)))
+        score = sum(weight * value for weight, value in parts) / sum(weight for weight, _ in parts)
+        if score >= min_score:
+            scored[pk] = (score, parts)
+
+    rows = (
+        Incident.objects.filter(pk__in=list(scored))
+        .exclude(duplicate_of=incident.pk)
+        .values('id', 'title', 'status', 'level', 'scope', 'started_at', 'duplicate_of')
+    )
+    candidates = []
+    for row in rows:
+        pk = row['id']
+        score, _ = scored[pk]
+        text_size, tag_size = sizes[pk]
+        candidates.append({
+            **row,
+            'score': round(score, 3),
+            'text_similarity': round(_jaccard(shared[pk][0], own_text, text_size), 3),
+            'tag_similarity': round(_jaccard(shared[pk][1], own_tags, tag_size), 3),
+            'shared_tokens': shared[pk][0],
+            'shared_tags': shared[pk][1],
+        })
+    candidates.sort(key=lambda c: (-c['score'], c['started_at'], c['id']))
+    return candidates[:limit]
+
+
+def duplicate_root(incident):
+    """Follow duplicate_of links from incident up to the incident that is not a duplicate."""
+    seen = {incident.pk}
+    while incident.duplicate_of_id is not None and incident.duplicate_of_id not in seen:
+        incident = Incident.objects.get(pk=incident.duplicate_of_id)
+        seen.add(incident.pk)
+    return incident
+
+
+def mark_duplicate(incident, parent):
+    """
+    Link incident as a duplicate of parent.
+
+    Links always point at an incident that is not a duplicate itself: a
+    parent that is one is replaced by its root, and the duplicates of
+    incident move to that root with it.
+
+    Returns:
+        The Incident the duplicate was linked to
+
+    Raises:
+        DuplicateLinkError: If the link would make an incident duplicate itself
+    """
+    root = duplicate_root(parent)
+    if root.pk == incident.pk:
+        raise DuplicateLinkError('An incident cannot be a duplicate of itself or of its own duplicates')
+
+    with transaction.atomic():
+        for child in incident.duplicates.all():
+            child.duplicate_of = root
+            child.save(update_fields=['duplicate_of', 'updated_at'])
+        if incident.duplicate_of_id != root.pk:
+            incident.duplicate_of = root
+            incident.save(update_fields=['duplicate_of', 'updated_at'])
+    return root
+
+
+def unmark_duplicate(incident):
+    """Remove the duplicate link of incident, if any."""
+    if incident.duplicate_of_id is None:
+        return
+    incident.duplicate_of = None
+    incident.save(update_fields=['duplicate_of', 'updated_at'])
+
+
+def correlate_incidents(incidents, min_score, window=None, link=False):
+    """
+    Find the best earlier duplicate parent for each incident.
+
+    Args:
+        incidents: Iterable of saved Incident instances, not yet duplicates
+        min_score: Minimum score for a candidate to be proposed
+        window: Maximum started_at distance (default: correlation_window())
+        link: Mark each incident as a duplicate of its proposed parent
+
+    Returns:
+        List of (incident, candidate dict) pairs, one per incident with a match
+    """
+    matches = []
+    for incident in incidents:
+        if incident.duplicate_of_id is not None:
+            continue
+        # The earlier incident of a pair is the parent
+        earlier = [
+            candidate for candidate in find_duplicate_candidates(incident, window, CANDIDATE_POOL, min_score)
+            if (candidate['started_at'], candidate['id']) < (incident.started_at, incident.pk)
+        ]
+        if not earlier:
+            continue
+        matches.append((incident, earlier[0]))
+        if link:
+            mark_duplicate(incident, Incident.objects.get(pk=earlier[0]['id']))
+    return matches
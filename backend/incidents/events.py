@@ -0,0 +1,177 @@
+"""
+Live incident event feed.
+
+Changes are appended to the IncidentEvent table after commit. Each ASGI worker
+runs one EventBroker that polls the table for new rows and fans them out to
+every connected Server-Sent Events client, so the database sees one cheap
+indexed range query per poll interval regardless of the number of watchers.
+"""
+import asyncio
+import json
+import logging
+from collections import deque
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from .models import IncidentEvent
+from .notifications import queue_notifications
+
+logger = logging.getLogger(__name__)
+
+# Events a reconnecting client may replay before it is told to reload instead
+MAX_REPLAY_EVENTS = 1000
+# Ids re-read behind the high-water mark to catch rows committed out of order
+POLL_OVERLAP = 50
+POLL_BATCH_SIZE = 500
+HEARTBEAT_INTERVAL = 15
+
+
+def record_event(incident_id, event_type, payload):
+    """
+    Append an event for an incident once the surrounding transaction commits.
+
+    The event is also queued for email notification (see notifications.py).
+
+    Args:
+        incident_id: Primary key of the incident
+        event_type: One of IncidentEvent.EVENT_TYPE_CHOICES
+        payload: JSON-serializable dict describing the delta
+    """
+    def append():
+        IncidentEvent.objects.create(incident_id=incident_id, event_type=event_type, payload=payload)
+        queue_notifications([(incident_id, event_type, payload)])
+
+    transaction.on_commit(append)
+
+
+def record_events(events):
+    """
+    Append several events with one INSERT once the surrounding transaction commits.
+
+    Args:
+        events: Iterable of (incident_id, event_type, payload) tuples
+    """
+    events = list(events)
+    rows = [
+        IncidentEvent(incident_id=incident_id, event_type=event_type, payload=payload)
+        for incident_id, event_type, payload in events
+    ]
+    if not rows:
+        return
+
+    def append():
+        IncidentEvent.objects.bulk_create(rows)
+        queue_notifications(events)
+
+    transaction.on_commit(append)
+
+
+def format_sse(event_id=None, event=None, data=None, comment=None):
+    """Format one Server-Sent Events message."""
+    lines = []
+    if comment is not None:
+        lines.append(f': {comment}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    if data is not None:
+        lines.append('data: ' + json.dumps(data, cls=DjangoJSONEncoder))
+    return '\n'.join(lines) + '\n\n'
+
+
+def event_message(event):
+    """Format an IncidentEvent as an SSE message."""
+    return format_sse(
+        event_id=event.id,
+        event=event.event_type,
+        data={'incident_id': event.incident_id, 'created_at': event.created_at, **event.payload},
+    )
+
+
+class EventBroker:
+    """Per-process poller fanning out new IncidentEvent rows to subscriber queues."""
+
+    def __init__(self, poll_interval=None):
+        self.poll_interval = poll_interval or getattr(settings, 'INCIDENT_EVENTS_POLL_INTERVAL', 1.0)
+        self.subscribers = set()
+        self.last_id = None
+        self.recent_ids = deque(maxlen=POLL_OVERLAP * 4)
+        self.task = None
+
+    async def start(self):
+        if self.last_id is None:
+            # Start at the current head; the overlap window is marked as already delivered
+            recent = IncidentEvent.objects.order_by('-id').values_list('id', flat=True)[:POLL_OVERLAP]
+            recent = [event_id async for event_id in recent]
+            self.recent_ids.extend(reversed(recent))
+            self.last_id = recent[0] if recent else 0
+        if self.task is None or self.task.done():
+            self.task = asyncio.ensure_future(self.run())
+
+    async def run(self):
+        while self.subscribers:
+            try:
+                await self.poll()
+            except Exception:
+                # Keep streaming through transient database errors
+                logger.exception('Incident event poll failed')
+            await asyncio.sleep(self.poll_interval)
+        self.task = None
+
+    async def poll(self):
+        queryset = IncidentEvent.objects.filter(
+            id__gt=max(0, self.last_id - POLL_OVERLAP)
+        ).order_by('id')[:POLL_BATCH_SIZE]
+        async for event in queryset:
+            if event.id in self.recent_ids:
+                continue
+            self.recent_ids.append(event.id)
+            self.last_id = max(self.last_id, event.id)
+            for incident_id, queue in list(self.subscribers):
+                if incident_id is None or incident_id == event.incident_id:
+                    queue.put_nowait(event)
+
+    async def stream(self, incident_id=None, last_event_id=None):
+        """
+        Yield SSE messages for one incident (or all incidents when None).
+
+        Missed events after last_event_id are replayed from the table first;
+        if too many were missed a ``reset`` event tells the client to reload.
+        """
+        queue = asyncio.Queue()
+        subscriber = (incident_id, queue)
+        self.subscribers.add(subscriber)
+        try:
+            await self.start()
+            high_water = self.last_id
+            replayed = set()
+            yield format_sse(comment='connected')
+
+            if last_event_id is not None:
+                missed = IncidentEvent.objects.filter(id__gt=last_event_id, id__lte=high_water)
+                if incident_id is not None:
+                    missed = missed.filter(incident_id=incident_id)
+                missed = [event async for event in missed.order_by('id')[:MAX_REPLAY_EVENTS + 1]]
+                if len(missed) > MAX_REPLAY_EVENTS:
+                    yield format_sse(event_id=high_water, event='reset', data={'reason': 'too many missed events'})
+                else:
+                    for event in missed:
+                        replayed.add(event.id)
+                        yield event_message(event)
+
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield format_sse(comment='heartbeat')
+                    continue
+                if event.id not in replayed:
+                    yield event_message(event)
+        finally:
+            self.subscribers.discard(subscriber)
+
+
+broker = EventBroker()
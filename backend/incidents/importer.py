@@ -0,0 +1,305 @@
+"""
+Bulk import of historical incidents from NDJSON or CSV.
+
+Records are read as a stream, validated against the shared-config choice
+lists and written in batches: one transaction per batch with bulk INSERTs for
+incidents, updates and documents. Field names may be the camelCase names of
+IncidentCreateSerializer or the model field names used by the export.
+"""
+import csv
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .bulk import BULK_BATCH_SIZE, insert_incidents, keep_created_at
+from .config import shared_config
+from .models import CONFIG_CHOICE_FIELDS, Incident, IncidentDocument, IncidentUpdate
+from .serializers import IncidentCreateSerializer
+
+IMPORT_FORMATS = ('ndjson', 'csv')
+
+# camelCase form field -> model field, as declared on IncidentCreateSerializer
+CAMEL_CASE_FIELDS = {
+    name: field.source
+    for name, field in IncidentCreateSerializer().fields.items()
+    if field.source != name
+}
+CAMEL_CASE_FIELDS['createdAt'] = 'created_at'
+UPDATE_CAMEL_CASE_FIELDS = {'updateType': 'update_type', 'createdAt': 'created_at'}
+
+INCIDENT_IMPORT_FIELDS = [
+    'title', 'description', 'level', 'scope', 'status',
+    'safety_compliance', 'security_privacy', 'data_quality', 'psd2_impact',
+    'started_at', 'detected_at', 'time_format', 'detection_source', 'incident_type',
+    'impacted_locations', 'impacted_parties', 'impacted_assets', 'impacted_areas',
+    'incident_commander', 'reporting_org', 'estimated_time_to_mitigation',
+    'first_detected_in', 'additional_subscribers', 'safety_compliance_document_url',
+    'l5_confirmation', 'mitigation_policy_acknowledgment', 'send_email_notifications',
+    'created_at',
+]
+REQUIRED_FIELDS = ['title', 'description', 'started_at', 'detected_at']
+DATETIME_FIELDS = {'started_at', 'detected_at', 'created_at'}
+LIST_FIELDS = {'impacted_locations', 'impacted_parties', 'impacted_assets', 'impacted_areas'}
+BOOLEAN_FIELDS = {'l5_confirmation', 'mitigation_policy_acknowledgment', 'send_email_notifications'}
+EMAIL_FIELDS = {'incident_commander'}
+
+# Model field -> shared config key of its allowed values (looked up per record, so hot reloads apply)
+CHOICE_FIELDS = CONFIG_CHOICE_FIELDS[Incident]
+LIST_CHOICE_FIELDS = {
+    'impacted_locations': 'impactedLocations',
+    'impacted_parties': 'impactedParties',
+}
+UPDATE_TYPES = frozenset(value for value, _ in IncidentUpdate._meta.get_field('update_type').choices)
+
+TRUE_VALUES = {'true', '1', 'yes', 'y'}
+FALSE_VALUES = {'false', '0', 'no', 'n', ''}
+
+
+class ImportRecordError(ValueError):
+    """Raised when a source record cannot be imported; carries per-field errors."""
+
+    def __init__(self, errors):
+        super().__init__(json.dumps(errors))
+        self.errors = errors
+
+
+def read_ndjson(stream):
+    """Yield one record dict per non-empty NDJSON line."""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            record = {'_error': f'Line {line_number}: invalid JSON ({e})'}
+        yield record
+
+
+def read_csv(stream):
+    """
+    Yield one record dict per incident from a CSV stream.
+
+    Plain CSV has one incident per row. CSV produced by export_incidents has a
+    ``record_type`` column; update and document rows are attached to the
+    incident row they follow.
+    """
+    reader = csv.DictReader(stream)
+    if 'record_type' not in (reader.fieldnames or []):
+        yield from reader
+        return
+
+    record = None
+    for row in reader:
+        record_type = row.get('record_type')
+        if record_type == 'incident':
+            if record is not None:
+                yield record
+            record = _strip_prefix(row, 'incident_')
+            record['updates'] = []
+            record['documents'] = []
+        elif record is not None and record_type == 'update':
+            record['updates'].append(_strip_prefix(row, 'update_'))
+        elif record is not None and record_type == 'document':
+            record['documents'].append(_strip_prefix(row, 'document_'))
+    if record is not None:
+        yield record
+
+
+def _strip_prefix(row, prefix):
+    return {key[len(prefix):]: value for key, value in row.items() if key.startswith(prefix) and value != ''}
+
+
+def read_records(stream, import_format):
+    """Yield source records from a text stream in the given format."""
+    if import_format == 'csv':
+        return read_csv(stream)
+    return read_ndjson(stream)
+
+
+def _parse_datetime(value, default=None):
+    if not value:
+        return default
+    parsed = parse_datetime(str(value))
+    if parsed is None:
+        raise ValueError('Enter a valid date/time.')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _parse_list(value):
+    if value in (None, ''):
+        return []
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    value = str(value).strip()
+    if value.startswith('['):
+        return [str(item) for item in json.loads(value)]
+    return [item.strip() for item in value.split(';') if item.strip()]
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError('Must be a valid boolean.')
+
+
+def _validate_email(value):
+    try:
+        validate_email(value)
+    except ValidationError as e:
+        raise ValueError(e.messages[0])
+
+
+def build_incident(record):
+    """
+    Validate a source record and build unsaved model instances.
+
+    Args:
+        record: Dict with camelCase or model field names, optionally carrying
+            ``updates`` and ``documents`` lists
+
+    Returns:
+        tuple: (Incident, list of IncidentUpdate, list of IncidentDocument);
+        children are not yet linked to the incident
+
+    Raises:
+        ImportRecordError: If the record is invalid
+    """
+    if '_error' in record:
+        raise ImportRecordError({'record': record['_error']})
+
+    data = {CAMEL_CASE_FIELDS.get(key, key): value for key, value in record.items()}
+    value_sets = shared_config().value_sets
+    errors = {}
+    values = {}
+
+    for name in INCIDENT_IMPORT_FIELDS:
+        value = data.get(name)
+        if value is None or value == '':
+            if name in REQUIRED_FIELDS:
+                errors[name] = 'This field is required.'
+            continue
+        try:
+            if name in DATETIME_FIELDS:
+                value = _parse_datetime(value)
+            elif name in LIST_FIELDS:
+                value = _parse_list(value)
+                allowed = value_sets.get(LIST_CHOICE_FIELDS[name]) if name in LIST_CHOICE_FIELDS else None
+                invalid = [item for item in value if allowed is not None and item not in allowed]
+                if invalid:
+                    raise ValueError(f'Invalid choices: {", ".join(invalid)}')
+            elif name in BOOLEAN_FIELDS:
+                value = _parse_bool(value)
+            else:
+                value = str(value)
+                if name in CHOICE_FIELDS and value not in value_sets.get(CHOICE_FIELDS[name], ()):
+                    raise ValueError(f'"{value}" is not a valid choice.')
+                max_length = Incident._meta.get_field(name).max_length
+                if max_length and len(value) > max_length:
+                    raise ValueError(f'Ensure this field has no more than {max_length} characters.')
+                if name in EMAIL_FIELDS:
+                    _validate_email(value)
+        except ValueError as e:
+            errors[name] = str(e)
+            continue
+        values[name] = value
+
+    started_at = values.get('started_at')
+    detected_at = values.get('detected_at')
+    if started_at and detected_at and detected_at < started_at:
+        errors['detected_at'] = 'Detected at time cannot be before started at time.'
+
+    updates = []
+    for index, item in enumerate(data.get('updates') or []):
+        item = {UPDATE_CAMEL_CASE_FIELDS.get(key, key): value for key, value in item.items()}
+        update_type = item.get('update_type') or 'update'
+        if not item.get('content') or not item.get('author'):
+            errors[f'updates[{index}]'] = 'content and author are required.'
+            continue
+        if len(item['author']) > IncidentUpdate._meta.get_field('author').max_length:
+            errors[f'updates[{index}]'] = 'author is too long.'
+            continue
+        if update_type not in UPDATE_TYPES:
+            errors[f'updates[{index}]'] = f'"{update_type}" is not a valid update type.'
+            continue
+        try:
+            created_at = _parse_datetime(item.get('created_at'))
+        except ValueError as e:
+            errors[f'updates[{index}]'] = str(e)
+            continue
+        updates.append(IncidentUpdate(
+            content=item['content'], author=item['author'], update_type=update_type, created_at=created_at
+        ))
+
+    documents = []
+    for index, item in enumerate(data.get('documents') or []):
+        if not item.get('title') or not item.get('url'):
+            errors[f'documents[{index}]'] = 'title and url are required.'
+            continue
+        if any(len(item[name]) > IncidentDocument._meta.get_field(name).max_length for name in ('title', 'url')):
+            errors[f'documents[{index}]'] = 'title or url is too long.'
+            continue
+        try:
+            created_at = _parse_datetime(item.get('created_at') or item.get('createdAt'))
+        except ValueError as e:
+            errors[f'documents[{index}]'] = str(e)
+            continue
+        documents.append(IncidentDocument(title=item['title'], url=item['url'], created_at=created_at))
+
+    if errors:
+        raise ImportRecordError(errors)
+
+    values.setdefault('status', 'reported')
+    return Incident(**values), updates, documents
+
+
+def import_batch(built, checkpoint=None):
+    """
+    Write a batch of built records in one transaction.
+
+    Imported incidents are indexed like new ones but record no feed events,
+    so they are not pushed to live clients and queue no email notifications.
+    The source created_at values are kept.
+
+    Args:
+        built: List of (Incident, updates, documents) tuples from build_incident
+        checkpoint: ImportCheckpoint already advanced past this batch; saved
+            in the same transaction, so a resumed import neither skips nor
+            repeats records
+
+    Returns:
+        tuple: Number of (incidents, updates, documents) written
+    """
+    incidents = [incident for incident, _, _ in built]
+    updates = []
+    documents = []
+
+    with transaction.atomic():
+        insert_incidents(incidents, notify=False)
+
+        for incident, incident_updates, incident_documents in built:
+            for child in incident_updates + incident_documents:
+                child.incident = incident
+            updates.extend(incident_updates)
+            documents.extend(incident_documents)
+
+        with keep_created_at(IncidentUpdate, updates):
+            IncidentUpdate.objects.bulk_create(updates, batch_size=BULK_BATCH_SIZE)
+        with keep_created_at(IncidentDocument, documents):
+            IncidentDocument.objects.bulk_create(documents, batch_size=BULK_BATCH_SIZE)
+
+        if checkpoint is not None:
+            checkpoint.save()
+
+    return len(incidents), len(updates), len(documents)
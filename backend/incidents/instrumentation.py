@@ -0,0 +1,253 @@
+"""
+Per-request instrumentation of the incident API.
+
+RequestMetricsMiddleware counts the SQL queries and database time of every
+request through a connection execute wrapper and measures the response size.
+InstrumentedViewMixin tags the request with its viewset action (e.g.
+``incident.list``) and times serializer ``to_representation`` calls, for
+serializers from get_serializer or passed through instrument_serializer. The
+numbers are returned in a Server-Timing header, aggregated per action for the
+Prometheus text endpoint, and checked against INCIDENT_QUERY_BUDGETS.
+
+Aggregates are per process; scrape every worker or sum across them.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the request duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Raised in strict mode when a request runs more queries than its action allows."""
+
+
+class RequestMetrics:
+    """Measurements of one request."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.label = None
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialization_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper counting and timing every query."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+
+def get_request_metrics(request):
+    return getattr(request, 'request_metrics', None)
+
+
+class MetricsRegistry:
+    """Thread-safe per-action aggregates rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = defaultdict(int)
+        self.totals = defaultdict(lambda: defaultdict(float))
+        self.durations = defaultdict(lambda: [0] * (len(DURATION_BUCKETS) + 1))
+        self.budget_exceeded = defaultdict(int)
+
+    def observe(self, label, method, status_code, metrics, duration, size, over_budget):
+        with self.lock:
+            self.requests[(label, method, str(status_code))] += 1
+            totals = self.totals[label]
+            totals['db_queries'] += metrics.queries
+            totals['db_seconds'] += metrics.db_time
+            totals['serialization_seconds'] += metrics.serialization_time
+            totals['response_bytes'] += size or 0
+            totals['duration_seconds'] += duration
+            self.durations[label][bisect_left(DURATION_BUCKETS, duration)] += 1
+            if over_budget:
+                self.budget_exceeded[label] += 1
+
+    def render(self):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        with self.lock:
+            family('incident_api_requests_total', 'counter', 'Requests by action, method and status.')
+            for (label, method, status_code), count in sorted(self.requests.items()):
+                lines.append(
+                    f'incident_api_requests_total{{action="{label}",method="{method}",status="{status_code}"}} {count}'
+                )
+
+            for key, help_text in (
+                ('db_queries', 'SQL queries executed.'),
+                ('db_seconds', 'Time spent in SQL queries.'),
+                ('serialization_seconds', 'Time spent in serializers, excluding queries they trigger.'),
+                ('response_bytes', 'Response body bytes (streaming responses excluded).'),
+            ):
+                name = f'incident_api_{key}_total'
+                family(name, 'counter', help_text)
+                for label, totals in sorted(self.totals.items()):
+                    lines.append(f'{name}{{action="{label}"}} {totals[key]:g}')
+
+            name = 'incident_api_request_duration_seconds'
+            family(name, 'histogram', 'Request duration.')
+            for label, buckets in sorted(self.durations.items()):
+                cumulative = 0
+                for bound, count in zip(DURATION_BUCKETS + ('+Inf',), buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{action="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{action="{label}"}} {self.totals[label]["duration_seconds"]:g}')
+                lines.append(f'{name}_count{{action="{label}"}} {cumulative}')
+
+            family('incident_api_query_budget_exceeded_total', 'counter', 'Requests over their query budget.')
+            for label, count in sorted(self.budget_exceeded.items()):
+                lines.append(f'incident_api_query_budget_exceeded_total{{action="{label}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+
+def check_query_budget(label, queries):
+    """
+    Compare a request's query count with its action's budget.
+
+    Returns:
+        bool: Whether the budget was exceeded
+
+    Raises:
+        QueryBudgetExceeded: If exceeded and INCIDENT_QUERY_BUDGETS_STRICT is set
+    """
+    budget = getattr(settings, 'INCIDENT_QUERY_BUDGETS', {}).get(label)
+    if budget is None or queries <= budget:
+        return False
+    message = f'{label} ran {queries} queries, budget is {budget}'
+    if getattr(settings, 'INCIDENT_QUERY_BUDGETS_STRICT', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+    return True
+
+
+def server_timing(metrics, duration):
+    return ', '.join([
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'serialize;dur={metrics.serialization_time * 1000:.1f}',
+        f'total;dur={duration * 1000:.1f}',
+    ])
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure queries, database time and response size of every request.
+
+    Under ASGI the execute wrapper is installed from the request's
+    thread-sensitive executor thread, where its sync views and async ORM
+    calls run. Queries made while a streaming response is consumed are not
+    counted.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+        with ExitStack() as stack:
+            self.install(stack, metrics)
+            response = self.get_response(request)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        request.request_metrics = metrics
+        stack = ExitStack()
+        await sync_to_async(self.install)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, metrics)
+
+    def install(self, stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def finish(self, request, response, metrics):
+        duration = time.perf_counter() - metrics.started
+        label = metrics.label or getattr(request.resolver_match, 'view_name', None) or 'unresolved'
+        size = None if response.streaming else len(response.content)
+        response['Server-Timing'] = server_timing(metrics, duration)
+
+        over_budget = check_query_budget(label, metrics.queries)
+        registry.observe(label, request.method, response.status_code, metrics, duration, size, over_budget)
+        return response
+
+
+class InstrumentedViewMixin:
+    """
+    DRF view mixin tagging the request metrics with the viewset action and
+    timing serialization.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        metrics = get_request_metrics(request)
+        if metrics is not None:
+            metrics.label = f"{getattr(self, 'basename', type(self).__name__)}.{self.action}"
+
+    def get_serializer(self, *args, **kwargs):
+        return self.instrument_serializer(super().get_serializer(*args, **kwargs))
+
+    def instrument_serializer(self, serializer):
+        """
+        Time a serializer's to_representation in the request metrics.
+
+        get_serializer does this already; actions that build their serializer
+        directly pass it through here so their serialization time is reported.
+        """
+        metrics = get_request_metrics(self.request) if self.request is not None else None
+        if metrics is not None:
+            serializer.to_representation = timed_representation(serializer.to_representation, metrics)
+        return serializer
+
+
+def timed_representation(to_representation, metrics):
+    """Wrap to_representation to add its duration, minus query time, to the metrics."""
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        db_time = metrics.db_time
+        try:
+            return to_representation(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.serialization_time += elapsed - (metrics.db_time - db_time)
+    return wrapper
+
+
+def prometheus_metrics(request):
+    """Expose the aggregated request metrics in the Prometheus text format."""
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
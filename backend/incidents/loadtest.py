@@ -0,0 +1,99 @@
+"""
+Concurrent HTTP load test for the incident read endpoints.
+
+Unlike incidents.benchmark, which times single requests in-process, this
+drives a running server (runserver, gunicorn, uvicorn, daphne) over real
+sockets with many concurrent clients, so it shows how a deployment behaves
+when hundreds of readers arrive at once, e.g. the sync views against the
+async read path of incidents.async_views. Clients are asyncio tasks in one
+thread; each request uses its own connection.
+"""
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+from .benchmark import percentile
+
+SCENARIOS = ('list', 'detail', 'updates', 'statistics', 'critical')
+
+
+def build_paths(params, scenarios=SCENARIOS):
+    """
+    Return a function mapping a request number to a request path.
+
+    Requests rotate over the scenarios and over the sampled incident ids.
+    """
+    ids = params['ids']
+    builders = {
+        'list': lambda i: '/api/v1/incidents/',
+        'detail': lambda i: f'/api/v1/incidents/{ids[i % len(ids)]}/',
+        'updates': lambda i: f'/api/v1/incidents/{ids[i % len(ids)]}/updates/',
+        'statistics': lambda i: '/api/v1/incidents/statistics/',
+        'critical': lambda i: '/api/v1/incidents/critical/',
+    }
+    selected = [builders[name] for name in scenarios]
+    return lambda i: selected[i % len(selected)](i // len(selected))
+
+
+async def fetch(host, port, path, timeout):
+    """
+    Issue one GET over a new connection.
+
+    Returns:
+        int: HTTP status code, or 0 on a connection error or timeout
+    """
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\n'
+            f'Accept: application/json\r\nConnection: close\r\n\r\n'.encode()
+        )
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), timeout)
+        return int(response.split(b' ', 2)[1])
+    except (OSError, asyncio.TimeoutError, IndexError, ValueError):
+        return 0
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def run_load(base_url, path_for, concurrency, duration, timeout=30.0):
+    """
+    Run concurrency clients against base_url for duration seconds.
+
+    Returns:
+        dict with the request count, throughput, p50/p95/p99 latency in
+        milliseconds and the number of failed (non-2xx/304) requests
+    """
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    prefix = parts.path.rstrip('/')
+    timings = []
+    errors = 0
+    counter = iter(range(10 ** 9))
+    started = time.perf_counter()
+    deadline = started + duration
+
+    async def client():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            request_started = time.perf_counter()
+            status = await fetch(host, port, prefix + path_for(next(counter)), timeout)
+            timings.append((time.perf_counter() - request_started) * 1000)
+            if not (200 <= status < 300 or status == 304):
+                errors += 1
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    if not timings:
+        return {'requests': 0, 'rps': 0.0, 'p50_ms': 0.0, 'p95_ms': 0.0, 'p99_ms': 0.0, 'errors': 0}
+    return {
+        'requests': len(timings),
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50), 1),
+        'p95_ms': round(percentile(timings, 95), 1),
+        'p99_ms': round(percentile(timings, 99), 1),
+        'errors': errors,
+    }
@@ -0,0 +1,51 @@
+"""
+Management command that rebuilds IncidentTag rows from the JSON list fields.
+
+Walks the incidents table in primary key order, one chunk per transaction,
+so it can run against a live database and be restarted with --start-id.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from incidents.models import Incident
+from incidents.tags import TAG_DIMENSIONS, rebuild_tags
+
+
+class Command(BaseCommand):
+    help = 'Backfill the incident tag index from impacted_* JSON fields in chunks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of incidents processed per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--start-id', type=int, default=0,
+            help='Resume after this incident id'
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        last_id = options['start_id']
+        processed = 0
+        started = time.monotonic()
+
+        queryset = Incident.objects.order_by('id').only('id', *TAG_DIMENSIONS)
+
+        while True:
+            chunk = list(queryset.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+
+            rebuild_tags(chunk)
+
+            processed += len(chunk)
+            last_id = chunk[-1].id
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'Processed {processed} incidents (last id {last_id}, '
+                f'{processed / elapsed if elapsed else 0:.0f} rows/s)'
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled tags for {processed} incidents'))
@@ -0,0 +1,119 @@
+"""
+Management command that benchmarks the incident API against a stored baseline.
+
+Runs the scenarios of incidents.benchmark in-process, prints p50/p95 latency
+and query counts, and compares them with a baseline JSON file. Run it on a
+database filled by generate_incidents; the post_update scenario writes
+updates (deleted afterwards) and their feed events.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from incidents.benchmark import (
+    DEFAULT_THRESHOLD, build_scenarios, cleanup, compare, load_baseline, run_scenario,
+    sample_parameters, save_baseline
+)
+from incidents.models import Incident
+
+NO_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark list, filter, search, detail, statistics and update posting requests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Measured requests per scenario (default: 50)'
+        )
+        parser.add_argument(
+            '--warmup', type=int, default=5,
+            help='Unmeasured requests per scenario before measuring (default: 5)'
+        )
+        parser.add_argument(
+            '--only',
+            help='Comma separated scenario names to run (default: all)'
+        )
+        parser.add_argument(
+            '--baseline', default='benchmark_baseline.json',
+            help='Baseline file to compare against (default: benchmark_baseline.json)'
+        )
+        parser.add_argument(
+            '--save-baseline', action='store_true',
+            help='Write this run as the new baseline'
+        )
+        parser.add_argument(
+            '--threshold', type=float, default=DEFAULT_THRESHOLD,
+            help=f'p95 change in percent reported as a regression (default: {DEFAULT_THRESHOLD:g})'
+        )
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit with an error if any scenario regressed'
+        )
+        parser.add_argument(
+            '--with-cache', action='store_true',
+            help='Keep the response cache enabled (default: measure uncached requests)'
+        )
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError('--iterations must be positive and --warmup not negative')
+
+        params = sample_parameters()
+        if params is None:
+            raise CommandError('No incidents found; run generate_incidents first')
+        scenarios = build_scenarios(params)
+        if options['only']:
+            names = [name.strip() for name in options['only'].split(',') if name.strip()]
+            unknown = set(names) - set(scenarios)
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+            scenarios = {name: scenarios[name] for name in names}
+
+        baseline = load_baseline(options['baseline'])
+        baseline_scenarios = (baseline or {}).get('scenarios', {})
+        meta = {
+            'incidents': Incident.objects.count(),
+            'iterations': options['iterations'],
+            'cache': options['with_cache'],
+        }
+        if baseline and baseline.get('meta', {}).get('incidents') != meta['incidents']:
+            self.stdout.write(self.style.WARNING(
+                f'Baseline was recorded with {baseline["meta"].get("incidents")} incidents, '
+                f'this database has {meta["incidents"]}'
+            ))
+
+        client = APIClient(SERVER_NAME='localhost')
+        results = {}
+        regressions = []
+        self.stdout.write(
+            f'{"scenario":<20} {"p50 ms":>9} {"p95 ms":>9} {"queries":>8} {"errors":>7} {"p95 vs base":>12}  verdict'
+        )
+        try:
+            with override_settings(**({} if options['with_cache'] else {'CACHES': NO_CACHE})):
+                for name, request in scenarios.items():
+                    result = run_scenario(client, request, options['iterations'], options['warmup'])
+                    results[name] = result
+                    change, verdict = compare(result, baseline_scenarios.get(name), options['threshold'])
+                    if verdict.startswith('REGRESSION'):
+                        regressions.append(name)
+                    change_text = '-' if change is None else f'{change:+.1f}%'
+                    self.stdout.write(
+                        f'{name:<20} {result["p50_ms"]:>9.2f} {result["p95_ms"]:>9.2f} '
+                        f'{result["queries"]:>8} {result["errors"]:>7} {change_text:>12}  {verdict}'
+                    )
+        finally:
+            cleanup()
+
+        if options['save_baseline']:
+            save_baseline(options['baseline'], {**baseline_scenarios, **results}, meta)
+            self.stdout.write(f'Saved baseline to {options["baseline"]}')
+
+        if regressions:
+            message = f'Regressions: {", ".join(regressions)}'
+            if options['fail_on_regression']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'{len(results)} scenarios, no regressions'))
@@ -0,0 +1,121 @@
+"""
+Management command that verifies IncidentFilter access paths use an index.
+
+Runs EXPLAIN for every supported filter combination of the incidents list
+endpoint and reports whether the planner picks an index or falls back to a
+full table scan.
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+
+from incidents.config import get_values_for_field
+from incidents.models import Incident
+from incidents.views import IncidentFilter
+
+
+def supported_filter_combinations():
+    """Filter combinations sent by IncidentsListPage.jsx and the critical/statistics views."""
+    statuses = get_values_for_field('statuses')
+    levels = get_values_for_field('levels')
+    scopes = get_values_for_field('scopes')
+    return [
+        {},
+        {'status': statuses[:2]},
+        {'status': statuses[:1], 'level': levels[-1:]},
+        {'level': levels[-1:], 'scope': scopes[-2:]},
+        {'scope': scopes[-1:]},
+        {'incident_type': get_values_for_field('types')[:2]},
+        {'detection_source': get_values_for_field('detectionSources')[-1:]},
+        {'reporting_org': ['Operations']},
+        {'incident_commander': ['commander@example.com']},
+        {'impacted_locations': get_values_for_field('impactedLocations')[:2]},
+        {'impacted_parties': get_values_for_field('impactedParties')[:1]},
+        {'impacted_assets': ['api-gateway']},
+        {'impacted_areas': ['payments']},
+    ]
+
+
+ORDERINGS = ['-created_at', '-started_at', '-detected_at']
+
+
+class Command(BaseCommand):
+    help = (
+        'Run EXPLAIN for each supported incident filter combination and check '
+        'that an index is used. Note that on very small tables the planner may '
+        'legitimately prefer a full scan.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all-orderings', action='store_true',
+            help='Also check started_at and detected_at orderings for the unfiltered list'
+        )
+        parser.add_argument(
+            '--verbose-plan', action='store_true',
+            help='Print the raw query plan for every combination'
+        )
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 20)
+
+        checks = [(params, '-created_at') for params in supported_filter_combinations()]
+        if options['all_orderings']:
+            checks += [({}, ordering) for ordering in ORDERINGS[1:]]
+
+        failures = []
+        for params, ordering in checks:
+            request = factory.get('/api/v1/incidents/', params)
+            queryset = IncidentFilter(request.GET, queryset=Incident.objects.all(), request=request).qs
+            queryset = queryset.order_by(ordering)[:page_size]
+
+            plan = self.explain(queryset)
+            uses_index, filesort = self.analyze(plan)
+
+            label = ', '.join(f'{k}={",".join(v)}' for k, v in params.items()) or '(no filters)'
+            label = f'{label} order by {ordering}'
+            if uses_index:
+                note = ' (filesort)' if filesort else ''
+                self.stdout.write(self.style.SUCCESS(f'INDEX  {label}{note}'))
+            else:
+                failures.append(label)
+                self.stdout.write(self.style.ERROR(f'SCAN   {label}'))
+
+            if options['verbose_plan']:
+                for row in plan:
+                    self.stdout.write(f'    {row}')
+
+        if failures:
+            raise CommandError(f'{len(failures)} filter combination(s) fall back to a full table scan')
+
+    def explain(self, queryset):
+        """Return the query plan rows as a list of dicts."""
+        sql, params = queryset.query.sql_with_params()
+        prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql, params)
+            columns = [col[0].lower() for col in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def analyze(self, plan):
+        """
+        Inspect a query plan for full table scans and filesorts.
+
+        Returns:
+            tuple: (uses_index, filesort)
+        """
+        if connection.vendor == 'sqlite':
+            details = [row.get('detail', '') for row in plan]
+            full_scan = any(
+                d.startswith('SCAN ') and 'INDEX' not in d for d in details
+            )
+            filesort = any('TEMP B-TREE FOR ORDER BY' in d for d in details)
+            return not full_scan, filesort
+
+        # MySQL/MariaDB tabular EXPLAIN; derived/materialized tables are named <...>
+        rows = [row for row in plan if not str(row.get('table') or '<').startswith('<')]
+        full_scan = any(row.get('type') == 'ALL' or not row.get('key') for row in rows)
+        filesort = any('filesort' in (row.get('extra') or '') for row in rows)
+        return not full_scan, filesort
@@ -0,0 +1,62 @@
+"""
+Management command that proposes, and optionally links, duplicate incidents.
+
+Each recent incident that is not a duplicate yet is compared with the
+incidents that started before it within the correlation window; the best
+match scoring at least --min-score is reported as its parent. With --link
+the pairs are marked as duplicates, which drops them from the statistics.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from incidents.correlation import correlate_incidents
+from incidents.models import Incident
+
+
+class Command(BaseCommand):
+    help = 'Find incidents that duplicate an earlier incident and optionally link them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since-hours', type=float, default=24.0,
+            help='Only check incidents started in the last N hours (default: 24)'
+        )
+        parser.add_argument(
+            '--min-score', type=float, default=0.6,
+            help='Minimum similarity score between 0 and 1 (default: 0.6)'
+        )
+        parser.add_argument(
+            '--window-hours', type=float, default=settings.INCIDENT_CORRELATION_WINDOW_HOURS,
+            help=f'Maximum started_at distance between duplicates (default: {settings.INCIDENT_CORRELATION_WINDOW_HOURS})'
+        )
+        parser.add_argument(
+            '--link', action='store_true',
+            help='Mark the proposed duplicates instead of only listing them'
+        )
+
+    def handle(self, *args, **options):
+        if options['since_hours'] <= 0 or options['window_hours'] <= 0:
+            raise CommandError('--since-hours and --window-hours must be positive')
+        if not 0 <= options['min_score'] <= 1:
+            raise CommandError('--min-score must be between 0 and 1')
+
+        incidents = Incident.objects.filter(
+            started_at__gte=timezone.now() - timedelta(hours=options['since_hours']),
+            duplicate_of__isnull=True,
+        ).order_by('started_at', 'id')
+
+        matches = correlate_incidents(
+            incidents.iterator(chunk_size=500), options['min_score'],
+            timedelta(hours=options['window_hours']), link=options['link']
+        )
+        for incident, candidate in matches:
+            self.stdout.write(
+                f'#{incident.pk} {incident.title[:60]!r} -> #{candidate["id"]} '
+                f'{candidate["title"][:60]!r} (score {candidate["score"]:.3f})'
+            )
+
+        verb = 'Linked' if options['link'] else 'Found'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(matches)} duplicate incidents'))
@@ -0,0 +1,84 @@
+"""
+Management command that exports incidents as NDJSON or CSV.
+
+Uses the same streaming generators as GET /api/v1/incidents/export/, so the
+output is written chunk by chunk with constant memory. Filters are given as
+IncidentFilter query parameters.
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+from django.test import RequestFactory
+
+from incidents.export import (
+    DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, EXPORT_RELATIONS, iter_export, parse_relations
+)
+from incidents.models import Incident
+from incidents.views import IncidentFilter
+
+
+class Command(BaseCommand):
+    help = 'Export incidents with their updates and documents as NDJSON or CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', choices=EXPORT_FORMATS, default='ndjson',
+            help='Output format (default: ndjson)'
+        )
+        parser.add_argument(
+            '--include', default=','.join(EXPORT_RELATIONS),
+            help='Comma separated related collections to include (default: updates,documents)'
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Output file path (default: stdout)'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+            help=f'Number of incidents read per query (default: {DEFAULT_CHUNK_SIZE})'
+        )
+        parser.add_argument(
+            '--filter', action='append', default=[], metavar='PARAM=VALUE',
+            help='IncidentFilter parameter, repeat for OR, e.g. --filter scope=High --filter scope=Medium'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            relations = parse_relations(options['include'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        params = QueryDict(mutable=True)
+        for item in options['filter']:
+            name, sep, value = item.partition('=')
+            if not sep:
+                raise CommandError(f'Invalid filter "{item}", expected PARAM=VALUE')
+            params.appendlist(name.strip(), value)
+
+        # IncidentFilter reads multi-value parameters from the request
+        request = RequestFactory().get('/api/v1/incidents/export/', params)
+        filterset = IncidentFilter(request.GET, queryset=Incident.objects.all(), request=request)
+        if not filterset.is_valid():
+            raise CommandError(f'Invalid filters: {filterset.errors.as_json()}')
+
+        chunks = iter_export(filterset.qs, options['format'], relations, options['chunk_size'])
+        started = time.monotonic()
+        written = 0
+
+        output = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+                written += 1
+        finally:
+            if options['output']:
+                output.close()
+
+        if options['output']:
+            elapsed = time.monotonic() - started
+            self.stderr.write(self.style.SUCCESS(
+                f'Wrote {written} lines to {options["output"]} '
+                f'({written / elapsed if elapsed else 0:.0f} lines/s)'
+            ))
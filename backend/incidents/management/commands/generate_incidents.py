@@ -0,0 +1,108 @@
+"""
+Management command that fills the database with synthetic incidents.
+
+Meant for benchmark databases, not production: rows get explicit primary keys
+after the current maximum so every table is written with bulk INSERTs (also
+on MySQL), and no feed events or notifications are recorded. Duration metrics
+and the active board are rebuilt from the generated data at the end.
+"""
+import random
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from incidents.board import rebuild_board
+from incidents.bulk import keep_created_at
+from incidents.caching import invalidate_incidents
+from incidents.correlation import rebuild_correlation_terms
+from incidents.models import Incident, IncidentStatusTransition, IncidentUpdate
+from incidents.synthetic import SCALES, build_synthetic_incident
+from incidents.tags import rebuild_tags
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic incidents with updates and status history for benchmarking.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'count',
+            help=f'Number of incidents, or one of {", ".join(SCALES)}'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=42,
+            help='Random seed, so runs are reproducible (default: 42)'
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='Spread incident start times over this many past days (default: 365)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of incidents written per transaction (default: 1000)'
+        )
+        parser.add_argument(
+            '--skip-metrics', action='store_true',
+            help='Do not rebuild the duration metrics afterwards'
+        )
+
+    def handle(self, *args, **options):
+        count = options['count'].lower()
+        try:
+            count = SCALES[count] if count in SCALES else int(count)
+        except ValueError:
+            raise CommandError(f'count must be a number or one of {", ".join(SCALES)}')
+        batch_size = options['batch_size']
+        if count < 1 or batch_size < 1 or options['days'] < 1:
+            raise CommandError('count, --batch-size and --days must be positive')
+
+        rng = random.Random(options['seed'])
+        now = timezone.now()
+        next_id = (Incident.objects.aggregate(m=Max('id'))['m'] or 0) + 1
+        started = time.monotonic()
+        written = updates_written = 0
+
+        while written < count:
+            size = min(batch_size, count - written)
+            incidents, updates, transitions = [], [], []
+            for _ in range(size):
+                incident, incident_updates, incident_transitions = build_synthetic_incident(
+                    rng, now, options['days']
+                )
+                incident.id = next_id
+                next_id += 1
+                for child in incident_updates + incident_transitions:
+                    child.incident_id = incident.id
+                incidents.append(incident)
+                updates.extend(incident_updates)
+                transitions.extend(incident_transitions)
+
+            with transaction.atomic():
+                with keep_created_at(Incident, incidents):
+                    Incident.objects.bulk_create(incidents)
+                with keep_created_at(IncidentUpdate, updates):
+                    IncidentUpdate.objects.bulk_create(updates, batch_size=1000)
+                IncidentStatusTransition.objects.bulk_create(transitions, batch_size=1000)
+                rebuild_tags(incidents)
+                rebuild_correlation_terms(incidents)
+
+            written += size
+            updates_written += len(updates)
+            elapsed = time.monotonic() - started
+            self.stdout.write(
+                f'Generated {written}/{count} incidents, {updates_written} updates '
+                f'({written / elapsed if elapsed else 0:.0f} incidents/s)'
+            )
+
+        with transaction.atomic():
+            rebuild_board()
+        invalidate_incidents()
+        if not options['skip_metrics']:
+            call_command('rebuild_incident_metrics', stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {written} incidents with {updates_written} updates'
+        ))
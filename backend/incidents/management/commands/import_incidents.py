@@ -0,0 +1,120 @@
+"""
+Management command that bulk imports historical incidents from NDJSON or CSV.
+
+The source is read as a stream and written in batches, one transaction per
+batch. The position in the source is saved to an ImportCheckpoint row in the
+same transaction as each batch, so an interrupted import resumes exactly
+where it stopped.
+"""
+import json
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from incidents.importer import IMPORT_FORMATS, ImportRecordError, build_incident, import_batch, read_records
+from incidents.models import ImportCheckpoint
+
+
+class Command(BaseCommand):
+    help = 'Import incidents with their updates and documents from an NDJSON or CSV file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Source file, or - for stdin')
+        parser.add_argument(
+            '--format', choices=IMPORT_FORMATS,
+            help='Source format (default: from the file extension, ndjson for stdin)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of incidents written per transaction (default: 500)'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint name (default: the absolute source path; disabled for stdin)'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore an existing checkpoint and import from the first record'
+        )
+        parser.add_argument(
+            '--rejects',
+            help='Write rejected records and their errors to this NDJSON file'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        checkpoint_name = options['checkpoint'] or (None if path == '-' else os.path.abspath(path))
+        checkpoint = None
+        if checkpoint_name:
+            if len(checkpoint_name) > ImportCheckpoint._meta.get_field('name').max_length:
+                raise CommandError('Checkpoint name is too long; pass a shorter --checkpoint')
+            checkpoint, _ = ImportCheckpoint.objects.get_or_create(name=checkpoint_name)
+            if options['restart']:
+                checkpoint.position = checkpoint.imported = checkpoint.rejected = 0
+                checkpoint.save()
+            elif checkpoint.position:
+                self.stdout.write(f'Resuming after record {checkpoint.position} from checkpoint {checkpoint_name}')
+        state = checkpoint or ImportCheckpoint()
+
+        try:
+            source = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        except OSError as e:
+            raise CommandError(str(e))
+        rejects = open(options['rejects'], 'a', encoding='utf-8') if options['rejects'] else None
+
+        started = time.monotonic()
+        imported_now = 0
+        batch = []
+
+        def flush(position):
+            nonlocal imported_now
+            state.position = position
+            state.imported += len(batch)
+            incidents, updates, documents = import_batch(batch, checkpoint)
+            if batch:
+                imported_now += incidents
+                self.report(state, incidents, updates, documents, imported_now, started)
+            batch.clear()
+
+        try:
+            position = state.position
+            for index, record in enumerate(read_records(source, import_format)):
+                if index < state.position:
+                    continue
+                position = index + 1
+                try:
+                    batch.append(build_incident(record))
+                except ImportRecordError as e:
+                    state.rejected += 1
+                    if rejects:
+                        rejects.write(json.dumps({'record': position, 'errors': e.errors}) + '\n')
+                    else:
+                        self.stderr.write(f'Record {position} rejected: {e}')
+                if len(batch) >= batch_size:
+                    flush(position)
+            flush(position)
+        finally:
+            if source is not sys.stdin:
+                source.close()
+            if rejects:
+                rejects.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {state.imported} incidents ({state.rejected} rejected) '
+            f'from {state.position} records'
+        ))
+
+    def report(self, state, incidents, updates, documents, imported_now, started):
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f'Imported {incidents} incidents, {updates} updates, {documents} documents '
+            f'(total {state.imported}, position {state.position}, '
+            f'{imported_now / elapsed if elapsed else 0:.0f} rows/s)'
+        )
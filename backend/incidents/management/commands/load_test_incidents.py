@@ -0,0 +1,82 @@
+"""
+Management command that load tests running servers with concurrent readers.
+
+Start the servers to compare first, for example the sync views and the async
+read path under the same ASGI server:
+
+    INCIDENT_ASYNC_READS=false uvicorn incident_manager.asgi:application --port 8001
+    uvicorn incident_manager.asgi:application --port 8002
+    python manage.py load_test_incidents http://127.0.0.1:8001 http://127.0.0.1:8002
+
+Incident ids are sampled from this process's database, which should be the
+one the servers use (fill it with generate_incidents).
+"""
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from incidents.benchmark import sample_parameters
+from incidents.loadtest import SCENARIOS, build_paths, run_load
+
+
+class Command(BaseCommand):
+    help = 'Load test incident read endpoints on one or more running servers with concurrent clients.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets', nargs='+',
+            help='Base URLs of the servers to test, e.g. http://127.0.0.1:8000'
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=200,
+            help='Number of concurrent clients (default: 200)'
+        )
+        parser.add_argument(
+            '--duration', type=float, default=15.0,
+            help='Seconds to run against each target (default: 15)'
+        )
+        parser.add_argument(
+            '--only',
+            help=f'Comma separated scenarios to mix (default: {",".join(SCENARIOS)})'
+        )
+        parser.add_argument(
+            '--timeout', type=float, default=30.0,
+            help='Per-request timeout in seconds (default: 30)'
+        )
+
+    def handle(self, *args, **options):
+        if options['concurrency'] < 1 or options['duration'] <= 0:
+            raise CommandError('--concurrency and --duration must be positive')
+
+        scenarios = SCENARIOS
+        if options['only']:
+            scenarios = [name.strip() for name in options['only'].split(',') if name.strip()]
+            unknown = set(scenarios) - set(SCENARIOS)
+            if unknown:
+                raise CommandError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+
+        params = sample_parameters()
+        if params is None:
+            raise CommandError('No incidents found; run generate_incidents first')
+        path_for = build_paths(params, scenarios)
+
+        self.stdout.write(
+            f'{options["concurrency"]} clients, {options["duration"]:g}s per target, '
+            f'scenarios: {", ".join(scenarios)}'
+        )
+        self.stdout.write(
+            f'{"target":<32} {"requests":>9} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+            f'{"p99 ms":>8} {"errors":>7} {"vs first":>9}'
+        )
+        first_rps = None
+        for target in options['targets']:
+            result = asyncio.run(run_load(
+                target, path_for, options['concurrency'], options['duration'], options['timeout']
+            ))
+            if first_rps is None:
+                first_rps = result['rps']
+            gain = f'{result["rps"] / first_rps:.2f}x' if first_rps else '-'
+            self.stdout.write(
+                f'{target:<32} {result["requests"]:>9} {result["rps"]:>8.1f} {result["p50_ms"]:>8.1f} '
+                f'{result["p95_ms"]:>8.1f} {result["p99_ms"]:>8.1f} {result["errors"]:>7} {gain:>9}'
+            )
@@ -0,0 +1,28 @@
+"""
+Management command that rebuilds the materialized active incidents board.
+
+Replaces every ActiveIncident row in one transaction, for use after writes
+that bypassed the model signals and bulk helpers (raw SQL, fixtures loaded
+with loaddata) or when the board is suspected to be out of sync.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from incidents.board import rebuild_board
+from incidents.caching import invalidate_incidents
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the active incidents board from the incidents table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of board rows inserted per query (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = rebuild_board(batch_size=options['batch_size'])
+            invalidate_incidents()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt the active board with {count} incidents'))
@@ -0,0 +1,82 @@
+"""
+Management command that delivers queued incident email notifications.
+
+Runs as a long-lived worker next to the web processes. Each cycle claims the
+due notifications, renders one digest per recipient and sends the digests
+from a thread pool; failures are retried with exponential backoff. Several
+workers may run at once, rows claimed by one are skipped by the others.
+
+For local testing point EMAIL_HOST/EMAIL_PORT at an SMTP stub, e.g.
+``python -m smtpd -n -c DebuggingServer localhost:1025`` (Python <= 3.11) or
+``python -m aiosmtpd -n -l localhost:1025``.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from incidents.notifications import build_digest, claim_digests, record_failure, record_sent, send_digest
+
+
+class Command(BaseCommand):
+    help = 'Send queued incident notifications as per-recipient digests.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Process the currently due notifications and exit'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of concurrent SMTP sends (default: 4)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Maximum number of recipients per cycle (default: 100)'
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='Seconds to sleep when nothing is due (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--workers and --batch-size must be positive')
+
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            while True:
+                close_old_connections()
+                sent, failed = self.run_cycle(pool, options['batch_size'])
+                if sent or failed:
+                    self.stdout.write(f'Sent {sent} digests, {failed} failed')
+                if options['once']:
+                    break
+                if not (sent or failed):
+                    time.sleep(options['interval'])
+
+    def run_cycle(self, pool, batch_size):
+        """
+        Send one round of digests.
+
+        Returns:
+            tuple: Number of (sent, failed) digests
+        """
+        digests = claim_digests(batch_size)
+        futures = {}
+        for recipient, rows in digests.items():
+            futures[pool.submit(send_digest, build_digest(recipient, rows))] = rows
+
+        sent = failed = 0
+        for future in as_completed(futures):
+            rows = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                record_failure(rows, e)
+                self.stderr.write(f'Sending to {rows[0].recipient} failed: {e}')
+            else:
+                sent += 1
+                record_sent(rows)
+        return sent, failed
@@ -0,0 +1,286 @@
+"""
+Materialized incident durations and daily percentile rollups.
+
+Every status transition (and every change to a duration input) re-syncs the
+incident's IncidentMetrics row and applies the difference to the
+IncidentMetricsRollup histograms. Analytics then read only the rollups:
+percentiles come from summed log-scale bucket counts, means from the summed
+totals.
+"""
+import math
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import IncidentMetrics, IncidentMetricsRollup
+
+# Metric name -> IncidentMetrics duration field
+METRIC_FIELDS = {
+    'detect': 'time_to_detect',
+    'mitigate': 'time_to_mitigate',
+    'resolve': 'time_to_resolve',
+    'postmortem': 'time_to_postmortem',
+}
+
+# Status -> IncidentMetrics timestamp stamped on the first transition into it
+STATUS_TIMESTAMP_FIELDS = {
+    'mitigating': 'mitigating_at',
+    'resolved': 'resolved_at',
+    'postmortem': 'postmortem_at',
+    'closed': 'closed_at',
+}
+
+ROLLUP_DIMENSIONS = ['reporting_org', 'level', 'scope', 'incident_type']
+
+# Incident fields whose change requires a metrics re-sync
+METRIC_SOURCE_FIELDS = {'status', 'started_at', 'detected_at', *ROLLUP_DIMENSIONS}
+
+DEFAULT_PERCENTILES = [50, 90, 99]
+
+# Log-scale histogram: bucket b holds durations in [BASE ** (b - 1), BASE ** b) seconds,
+# bucket 0 everything under one second. About 9% relative error at the midpoint.
+HISTOGRAM_BASE = 2 ** 0.25
+MAX_BUCKET = 120  # ~ 10 years
+
+
+def bucket_for(seconds):
+    """Return the histogram bucket of a duration in seconds."""
+    if seconds < 1:
+        return 0
+    return min(MAX_BUCKET, int(math.log(seconds, HISTOGRAM_BASE)) + 1)
+
+
+def bucket_value(bucket):
+    """Return the representative duration of a bucket (its geometric midpoint)."""
+    if bucket <= 0:
+        return 0.0
+    return HISTOGRAM_BASE ** (bucket - 0.5)
+
+
+def _seconds(start, end):
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+
+def apply_incident(metrics, incident, transition_to=None, transitioned_at=None):
+    """
+    Update a metrics row from the incident's current state.
+
+    Args:
+        metrics: IncidentMetrics instance (new or loaded)
+        incident: Incident instance
+        transition_to: Status the incident just moved into, if any
+        transitioned_at: Time of that transition (default: now)
+    """
+    metrics.day = timezone.localdate(incident.started_at)
+    for dimension in ROLLUP_DIMENSIONS:
+        setattr(metrics, dimension, getattr(incident, dimension))
+
+    timestamp_field = STATUS_TIMESTAMP_FIELDS.get(transition_to)
+    if timestamp_field and getattr(metrics, timestamp_field) is None:
+        setattr(metrics, timestamp_field, transitioned_at or timezone.now())
+
+    metrics.time_to_detect = _seconds(incident.started_at, incident.detected_at)
+    metrics.time_to_mitigate = _seconds(incident.detected_at, metrics.mitigating_at)
+    metrics.time_to_resolve = _seconds(incident.started_at, metrics.resolved_at)
+    metrics.time_to_postmortem = _seconds(metrics.resolved_at, metrics.closed_at)
+
+
+def contributions(metrics):
+    """Return the (rollup key, seconds) pairs a metrics row adds to the rollups."""
+    dimensions = tuple(getattr(metrics, dimension) for dimension in ROLLUP_DIMENSIONS)
+    result = []
+    for metric, field in METRIC_FIELDS.items():
+        seconds = getattr(metrics, field)
+        if seconds is not None:
+            result.append(((metric, metrics.day) + dimensions + (bucket_for(seconds),), seconds))
+    return result
+
+
+def sync_metrics(incidents, transitions=None, transitioned_at=None):
+    """
+    Materialize metrics for incidents and apply the rollup differences.
+
+    Args:
+        incidents: Saved Incident instances
+        transitions: Optional dict mapping incident id to the status it just entered
+        transitioned_at: Time of those transitions (default: now)
+    """
+    incidents = [incident for incident in incidents if incident.started_at is not None]
+    if not incidents:
+        return
+    transitions = transitions or {}
+
+    with transaction.atomic():
+        existing = IncidentMetrics.objects.select_for_update().in_bulk([incident.pk for incident in incidents])
+        deltas = defaultdict(lambda: [0, 0.0])
+        created = []
+        changed = []
+
+        for incident in incidents:
+            metrics = existing.get(incident.pk)
+            if metrics is None:
+                metrics = IncidentMetrics(incident_id=incident.pk)
+                created.append(metrics)
+            else:
+                for key, seconds in contributions(metrics):
+                    deltas[key][0] -= 1
+                    deltas[key][1] -= seconds
+                changed.append(metrics)
+
+            apply_incident(metrics, incident, transitions.get(incident.pk), transitioned_at)
+
+            for key, seconds in contributions(metrics):
+                deltas[key][0] += 1
+                deltas[key][1] += seconds
+
+        IncidentMetrics.objects.bulk_create(created)
+        if changed:
+            now = timezone.now()
+            for metrics in changed:
+                metrics.updated_at = now
+            IncidentMetrics.objects.bulk_update(
+                changed, [f.name for f in IncidentMetrics._meta.concrete_fields if not f.primary_key]
+            )
+        apply_rollup_deltas(deltas)
+
+
+def remove_metrics(incident_id):
+    """Subtract a deleted incident's contribution from the rollups."""
+    metrics = IncidentMetrics.objects.filter(incident_id=incident_id).first()
+    if metrics is None:
+        return
+    deltas = defaultdict(lambda: [0, 0.0])
+    for key, seconds in contributions(metrics):
+        deltas[key][0] -= 1
+        deltas[key][1] -= seconds
+    apply_rollup_deltas(deltas)
+
+
+def apply_rollup_deltas(deltas):
+    """
+    Add (count, seconds) deltas to rollup rows, creating missing rows.
+
+    Args:
+        deltas: dict mapping rollup key (metric, day, *dimensions, bucket) to [count, seconds]
+    """
+    key_fields = ['metric', 'day', *ROLLUP_DIMENSIONS, 'bucket']
+    for key, (count, seconds) in deltas.items():
+        if count == 0 and seconds == 0:
+            continue
+        lookup = dict(zip(key_fields, key))
+        rows = IncidentMetricsRollup.objects.filter(**lookup)
+        if rows.update(count=F('count') + count, total_seconds=F('total_seconds') + seconds):
+            continue
+        try:
+            with transaction.atomic():
+                IncidentMetricsRollup.objects.create(count=count, total_seconds=seconds, **lookup)
+        except IntegrityError:
+            # Created concurrently; add to the row that won
+            rows.update(count=F('count') + count, total_seconds=F('total_seconds') + seconds)
+
+
+def parse_choices(values, allowed, label):
+    """
+    Parse repeated or comma separated query parameter values against a fixed set.
+
+    Raises:
+        ValueError: If a value is not allowed
+    """
+    parsed = []
+    for value in values:
+        for item in (v.strip() for v in value.split(',')):
+            if not item or item in parsed:
+                continue
+            if item not in allowed:
+                raise ValueError(f"Unsupported {label}: {item}")
+            parsed.append(item)
+    return parsed
+
+
+def parse_percentiles(value):
+    """
+    Parse a comma separated list of percentiles.
+
+    Raises:
+        ValueError: If a value is not a number between 0 and 100
+    """
+    if not value:
+        return list(DEFAULT_PERCENTILES)
+    percentiles = []
+    for item in value.split(','):
+        try:
+            percentile = float(item)
+        except ValueError:
+            raise ValueError(f"Invalid percentile: {item}")
+        if not 0 <= percentile <= 100:
+            raise ValueError(f"Percentile out of range: {item}")
+        percentiles.append(percentile)
+    return percentiles
+
+
+def _percentile(histogram, total, percentile):
+    """Return the representative value of the bucket holding the given percentile."""
+    rank = max(1, math.ceil(total * percentile / 100))
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= rank:
+            return round(bucket_value(bucket), 1)
+    return None
+
+
+def compute_analytics(filters=None, metrics=None, group_by=(), percentiles=DEFAULT_PERCENTILES):
+    """
+    Summarize durations from the rollup tables with one grouped query.
+
+    Args:
+        filters: Lookups on IncidentMetricsRollup (day range and dimensions)
+        metrics: Metric names to include (default: all)
+        group_by: Dimensions from ROLLUP_DIMENSIONS to break results down by
+        percentiles: Percentiles to estimate
+
+    Returns:
+        dict mapping metric to a summary dict (count, mean, p<N>...), or to a
+        list of such dicts carrying their group values when group_by is set
+    """
+    metrics = list(metrics or METRIC_FIELDS)
+    rows = (
+        IncidentMetricsRollup.objects.filter(metric__in=metrics, **(filters or {}))
+        .order_by()
+        .values('metric', *group_by, 'bucket')
+        .annotate(count=Sum('count'), total_seconds=Sum('total_seconds'))
+    )
+
+    groups = defaultdict(lambda: {'count': 0, 'total_seconds': 0.0, 'histogram': defaultdict(int)})
+    for row in rows:
+        if not row['count']:
+            continue
+        group = groups[(row['metric'],) + tuple(row[dimension] for dimension in group_by)]
+        group['count'] += row['count']
+        group['total_seconds'] += row['total_seconds']
+        group['histogram'][row['bucket']] += row['count']
+
+    def summarize(group):
+        summary = {'count': group['count'], 'mean': None}
+        if group['count']:
+            summary['mean'] = round(group['total_seconds'] / group['count'], 1)
+        for percentile in percentiles:
+            label = f'p{percentile:g}'
+            summary[label] = _percentile(group['histogram'], group['count'], percentile) if group['count'] else None
+        return summary
+
+    result = {}
+    for metric in metrics:
+        if not group_by:
+            result[metric] = summarize(groups[(metric,)])
+            continue
+        result[metric] = [
+            {**dict(zip(group_by, key[1:])), **summarize(group)}
+            for key, group in sorted(groups.items(), key=lambda item: tuple(str(v) for v in item[0]))
+            if key[0] == metric
+        ]
+    return result
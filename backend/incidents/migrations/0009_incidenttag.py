@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TAG_DIMENSIONS = ['impacted_locations', 'impacted_parties', 'impacted_assets', 'impacted_areas']
+TAG_VALUE_MAX_LENGTH = 255
+BATCH_SIZE = 1000
+
+
+def backfill_tags(apps, schema_editor):
+    """Mirror the impacted_* list values of every existing incident into tag rows."""
+    Incident = apps.get_model('incidents', 'Incident')
+    IncidentTag = apps.get_model('incidents', 'IncidentTag')
+
+    batch = []
+    for row in Incident.objects.order_by('id').values('id', *TAG_DIMENSIONS).iterator(chunk_size=2000):
+        for dimension in TAG_DIMENSIONS:
+            raw = row[dimension] or []
+            if not isinstance(raw, (list, tuple)):
+                raw = [raw]
+            values = {str(item).strip()[:TAG_VALUE_MAX_LENGTH] for item in raw}
+            batch.extend(
+                IncidentTag(incident_id=row['id'], dimension=dimension, value=value)
+                for value in values if value
+            )
+        if len(batch) >= BATCH_SIZE:
+            IncidentTag.objects.bulk_create(batch)
+            batch = []
+    IncidentTag.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0008_incident_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentTag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('impacted_locations', 'Impacted Locations'), ('impacted_parties', 'Impacted Parties'), ('impacted_assets', 'Impacted Assets'), ('impacted_areas', 'Impacted Areas')], max_length=20)),
+                ('value', models.CharField(max_length=255)),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tags', to='incidents.incident')),
+            ],
+            options={
+                'verbose_name': 'Incident Tag',
+                'verbose_name_plural': 'Incident Tags',
+                'indexes': [models.Index(fields=['dimension', 'value', 'incident'], name='incident_tag_lookup_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='incidenttag',
+            constraint=models.UniqueConstraint(fields=('incident', 'dimension', 'value'), name='incident_tag_unique'),
+        ),
+        migrations.RunPython(backfill_tags, migrations.RunPython.noop),
+    ]
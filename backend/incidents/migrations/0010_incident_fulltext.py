@@ -0,0 +1,88 @@
+# Generated manually to add full-text search indexes
+
+from django.db import migrations
+
+
+MYSQL_FORWARD = [
+    "ALTER TABLE incidents_incident ADD FULLTEXT INDEX incident_fulltext_idx "
+    "(title, description, incident_commander, reporting_org)",
+    "ALTER TABLE incidents_incidentupdate ADD FULLTEXT INDEX incidentupdate_fulltext_idx (content)",
+]
+
+MYSQL_REVERSE = [
+    "ALTER TABLE incidents_incident DROP INDEX incident_fulltext_idx",
+    "ALTER TABLE incidents_incidentupdate DROP INDEX incidentupdate_fulltext_idx",
+]
+
+
+def fts5_statements(table, fts_table, columns):
+    """Build the FTS5 external-content table and the triggers keeping it in sync."""
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts_table} USING fts5({cols}, content='{table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); END",
+        f"CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values}); END",
+        f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')",
+    ]
+
+
+SQLITE_FORWARD = (
+    fts5_statements(
+        'incidents_incident', 'incidents_incident_fts',
+        ['title', 'description', 'incident_commander', 'reporting_org'],
+    ) +
+    fts5_statements('incidents_incidentupdate', 'incidents_incidentupdate_fts', ['content'])
+)
+
+SQLITE_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {fts_table}_{suffix}"
+    for fts_table in ('incidents_incident_fts', 'incidents_incidentupdate_fts')
+    for suffix in ('ai', 'ad', 'au')
+] + [
+    "DROP TABLE IF EXISTS incidents_incident_fts",
+    "DROP TABLE IF EXISTS incidents_incidentupdate_fts",
+]
+
+
+def run_statements(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def add_fulltext(apps, schema_editor):
+    """Create FULLTEXT indexes on MySQL or FTS5 tables on SQLite; no-op elsewhere."""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        run_statements(schema_editor, MYSQL_FORWARD)
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("PRAGMA compile_options")
+            options = {row[0] for row in cursor.fetchall()}
+        if 'ENABLE_FTS5' in options:
+            run_statements(schema_editor, SQLITE_FORWARD)
+
+
+def remove_fulltext(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'mysql':
+        run_statements(schema_editor, MYSQL_REVERSE)
+    elif vendor == 'sqlite':
+        run_statements(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0009_incidenttag'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_fulltext, remove_fulltext),
+    ]
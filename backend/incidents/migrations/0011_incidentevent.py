@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:30
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0010_incident_fulltext'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('incident_created', 'Incident Created'), ('incident_updated', 'Incident Updated'), ('status_changed', 'Status Changed'), ('update_created', 'Update Created'), ('update_edited', 'Update Edited')], max_length=20)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='events', to='incidents.incident')),
+            ],
+            options={
+                'verbose_name': 'Incident Event',
+                'verbose_name_plural': 'Incident Events',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['incident', 'id'], name='incident_event_feed_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:39
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0011_incidentevent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentMetrics',
+            fields=[
+                ('incident', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='metrics', serialize=False, to='incidents.incident')),
+                ('day', models.DateField(help_text='Day the incident started')),
+                ('reporting_org', models.CharField(max_length=100)),
+                ('level', models.CharField(blank=True, max_length=3)),
+                ('scope', models.CharField(blank=True, max_length=10)),
+                ('incident_type', models.CharField(max_length=10)),
+                ('mitigating_at', models.DateTimeField(blank=True, null=True)),
+                ('resolved_at', models.DateTimeField(blank=True, null=True)),
+                ('postmortem_at', models.DateTimeField(blank=True, null=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('time_to_detect', models.FloatField(blank=True, help_text='From start to detection', null=True)),
+                ('time_to_mitigate', models.FloatField(blank=True, help_text='From detection to mitigation start', null=True)),
+                ('time_to_resolve', models.FloatField(blank=True, help_text='From start to resolution', null=True)),
+                ('time_to_postmortem', models.FloatField(blank=True, help_text='From resolution to postmortem completion', null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Incident Metrics',
+                'verbose_name_plural': 'Incident Metrics',
+            },
+        ),
+        migrations.CreateModel(
+            name='IncidentMetricsRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('reporting_org', models.CharField(max_length=100)),
+                ('level', models.CharField(blank=True, max_length=3)),
+                ('scope', models.CharField(blank=True, max_length=10)),
+                ('incident_type', models.CharField(max_length=10)),
+                ('metric', models.CharField(choices=[('detect', 'Time to Detect'), ('mitigate', 'Time to Mitigate'), ('resolve', 'Time to Resolve'), ('postmortem', 'Time to Postmortem')], max_length=10)),
+                ('bucket', models.SmallIntegerField()),
+                ('count', models.IntegerField(default=0)),
+                ('total_seconds', models.FloatField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Incident Metrics Rollup',
+                'verbose_name_plural': 'Incident Metrics Rollups',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='incidentmetricsrollup',
+            constraint=models.UniqueConstraint(fields=('metric', 'day', 'reporting_org', 'level', 'scope', 'incident_type', 'bucket'), name='incident_rollup_unique'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+STATUS_FLOW = ['reported', 'mitigating', 'resolved', 'postmortem', 'closed']
+
+
+def backfill_transitions(apps, schema_editor):
+    """
+    Seed the transition log from the status_changed feed events.
+
+    Incidents past ``reported`` without a recorded entry into their current
+    status get one synthetic transition stamped with their updated_at.
+    """
+    Incident = apps.get_model('incidents', 'Incident')
+    IncidentEvent = apps.get_model('incidents', 'IncidentEvent')
+    IncidentStatusTransition = apps.get_model('incidents', 'IncidentStatusTransition')
+
+    rows = []
+    entered = set()
+    events = IncidentEvent.objects.filter(event_type='status_changed').order_by('id')
+    for event in events.iterator(chunk_size=2000):
+        from_status, to_status = event.payload.get('from'), event.payload.get('to')
+        if from_status not in STATUS_FLOW or to_status not in STATUS_FLOW:
+            continue
+        rows.append(IncidentStatusTransition(
+            incident_id=event.incident_id, from_status=from_status, to_status=to_status,
+            transitioned_at=event.created_at
+        ))
+        entered.add((event.incident_id, to_status))
+
+    incidents = Incident.objects.exclude(status='reported').values_list('id', 'status', 'updated_at')
+    for incident_id, status, updated_at in incidents.iterator(chunk_size=2000):
+        if status not in STATUS_FLOW or (incident_id, status) in entered:
+            continue
+        rows.append(IncidentStatusTransition(
+            incident_id=incident_id, from_status=STATUS_FLOW[STATUS_FLOW.index(status) - 1],
+            to_status=status, transitioned_at=updated_at
+        ))
+
+    IncidentStatusTransition.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('incidents', '0012_incidentmetrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentStatusTransition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('reported', 'Reported'), ('mitigating', 'Mitigating'), ('resolved', 'Resolved'), ('postmortem', 'Postmortem'), ('closed', 'Closed')], max_length=15)),
+                ('to_status', models.CharField(choices=[('reported', 'Reported'), ('mitigating', 'Mitigating'), ('resolved', 'Resolved'), ('postmortem', 'Postmortem'), ('closed', 'Closed')], max_length=15)),
+                ('transitioned_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_transitions', to='incidents.incident')),
+                ('transitioned_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='incident_transitions', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Incident Status Transition',
+                'verbose_name_plural': 'Incident Status Transitions',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['incident', 'transitioned_at'], name='incident_transition_hist_idx'), models.Index(fields=['to_status', 'transitioned_at'], name='incident_transition_age_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_transitions, migrations.RunPython.noop),
+    ]
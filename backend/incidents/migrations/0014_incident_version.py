@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0013_incidentstatustransition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incident',
+            name='version',
+            field=models.PositiveIntegerField(default=1, help_text='Row version, incremented on every update'),
+        ),
+    ]
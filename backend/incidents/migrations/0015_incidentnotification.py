@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:46
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0014_incident_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IncidentNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recipient', models.EmailField(max_length=254)),
+                ('event_type', models.CharField(choices=[('incident_created', 'Incident Created'), ('incident_updated', 'Incident Updated'), ('status_changed', 'Status Changed'), ('update_created', 'Update Created'), ('update_edited', 'Update Edited')], max_length=20)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the worker may send (or retry) this row')),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='incidents.incident')),
+            ],
+            options={
+                'verbose_name': 'Incident Notification',
+                'verbose_name_plural': 'Incident Notifications',
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='incident_notification_due_idx'), models.Index(fields=['recipient', 'status'], name='incident_notification_rcpt_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0015_incidentnotification'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incidentupdate',
+            index=models.Index(fields=['incident', 'created_at'], name='incident_update_feed_idx'),
+        ),
+    ]
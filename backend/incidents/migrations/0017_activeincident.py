@@ -0,0 +1,67 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Max, OuterRef, Subquery
+
+BOARD_FIELDS = [
+    'title', 'level', 'scope', 'status', 'incident_type', 'incident_commander',
+    'reporting_org', 'started_at', 'updated_at',
+]
+
+
+def backfill_board(apps, schema_editor):
+    """Add every incident that is not closed to the active board."""
+    Incident = apps.get_model('incidents', 'Incident')
+    IncidentStatusTransition = apps.get_model('incidents', 'IncidentStatusTransition')
+    ActiveIncident = apps.get_model('incidents', 'ActiveIncident')
+
+    entered = (
+        IncidentStatusTransition.objects.filter(incident=OuterRef('pk'), to_status=OuterRef('status'))
+        .order_by().values('incident').annotate(m=Max('transitioned_at')).values('m')
+    )
+    incidents = (
+        Incident.objects.exclude(status='closed')
+        .annotate(entered_at=Subquery(entered))
+        .values('id', 'created_at', 'entered_at', *BOARD_FIELDS)
+    )
+    rows = [
+        ActiveIncident(
+            incident_id=row['id'], status_since=row['entered_at'] or row['created_at'],
+            **{field: row[field] for field in BOARD_FIELDS}
+        )
+        for row in incidents.iterator(chunk_size=2000)
+    ]
+    ActiveIncident.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0016_incidentupdate_feed_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActiveIncident',
+            fields=[
+                ('incident', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='board_entry', serialize=False, to='incidents.incident')),
+                ('title', models.CharField(max_length=255)),
+                ('level', models.CharField(blank=True, max_length=3)),
+                ('scope', models.CharField(blank=True, max_length=10)),
+                ('status', models.CharField(max_length=15)),
+                ('incident_type', models.CharField(max_length=10)),
+                ('incident_commander', models.EmailField(max_length=254)),
+                ('reporting_org', models.CharField(max_length=100)),
+                ('started_at', models.DateTimeField()),
+                ('status_since', models.DateTimeField(help_text='When the incident entered its current status')),
+                ('updated_at', models.DateTimeField(help_text='Last change of the incident')),
+            ],
+            options={
+                'verbose_name': 'Active Incident',
+                'verbose_name_plural': 'Active Incidents',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.RunPython(backfill_board, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0017_activeincident'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='incident',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, help_text='Incident this one duplicates; duplicates are left out of statistics by default', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='incidents.incident'),
+        ),
+        migrations.CreateModel(
+            name='CorrelationTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('text', 'Title/Description Token'), ('impacted_locations', 'Impacted Locations'), ('impacted_parties', 'Impacted Parties'), ('impacted_assets', 'Impacted Assets'), ('impacted_areas', 'Impacted Areas')], max_length=20)),
+                ('term', models.CharField(max_length=255)),
+                ('started_at', models.DateTimeField(help_text="Copy of the incident's started_at")),
+                ('incident', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='correlation_terms', to='incidents.incident')),
+            ],
+            options={
+                'verbose_name': 'Correlation Term',
+                'verbose_name_plural': 'Correlation Terms',
+                'indexes': [models.Index(fields=['kind', 'term', 'started_at'], name='correlation_term_lookup_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='correlationterm',
+            constraint=models.UniqueConstraint(fields=('incident', 'kind', 'term'), name='correlation_term_unique'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('incidents', '0018_incident_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='incident',
+            index=models.Index(fields=['updated_at'], name='incident_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='incidentupdate',
+            index=models.Index(fields=['updated_at'], name='incident_update_updated_idx'),
+        ),
+    ]
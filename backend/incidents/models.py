@@ -1,13 +1,19 @@
 """
 Models for incident management system.
 """
-from django.db import models
+from django.db import DatabaseError, models, router, transaction
+from django.db.models import F
+from django.db.models.signals import post_save, pre_save
 from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
+import copy
+import functools
 import json
 from .config import (
     LEVEL_CHOICES, SCOPE_CHOICES, TYPE_CHOICES, STATUS_CHOICES,
-    IMPACT_CHOICES, TIME_FORMAT_CHOICES, DETECTION_SOURCE_CHOICES
+    IMPACT_CHOICES, TIME_FORMAT_CHOICES, DETECTION_SOURCE_CHOICES,
+    ConfigChoices
 )
 
 
@@ -77,14 +83,144 @@ class Incident(models.Model):
     # Status tracking
     status = models.CharField(max_length=15, choices=STATUS_CHOICES, default='reported')
     
+    # Optimistic concurrency
+    version = models.PositiveIntegerField(default=1, help_text="Row version, incremented on every update")
+    
+    # Duplicate tracking
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates',
+        help_text="Incident this one duplicates; duplicates are left out of statistics by default"
+    )
+    
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Incident'
         verbose_name_plural = 'Incidents'
+        # Access paths used by IncidentFilter and the list page ordering.
+        # Filter columns lead, created_at trails so filtered pages avoid a filesort.
+        indexes = [
+            models.Index(fields=['created_at'], name='incident_created_idx'),
+            models.Index(fields=['started_at'], name='incident_started_idx'),
+            models.Index(fields=['detected_at'], name='incident_detected_idx'),
+            models.Index(fields=['status', 'created_at'], name='incident_status_created_idx'),
+            models.Index(fields=['level', 'scope', 'created_at'], name='incident_level_scope_idx'),
+            models.Index(fields=['scope', 'created_at'], name='incident_scope_created_idx'),
+            models.Index(fields=['incident_type', 'created_at'], name='incident_type_created_idx'),
+            models.Index(fields=['detection_source', 'created_at'], name='incident_source_created_idx'),
+            models.Index(fields=['reporting_org', 'created_at'], name='incident_org_created_idx'),
+            models.Index(fields=['incident_commander', 'created_at'], name='incident_cmdr_created_idx'),
+            models.Index(fields=['status', 'level', 'created_at'], name='incident_status_level_idx'),
+            # Watermark scans of incremental snapshots
+            models.Index(fields=['updated_at'], name='incident_updated_idx'),
+        ]
     
     def __str__(self):
         return f"#{self.id}: {self.title} ({self.level}-{self.scope})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the loaded column values so saves can tell which fields changed."""
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_loaded_values()
+        return instance
+    
+    def snapshot_loaded_values(self):
+        """
+        Record the current (non-deferred) field values as the persisted state.
+        
+        Only the JSON list fields can be changed in place, so only they are
+        copied, and shallowly since their items are strings.
+        """
+        values = self.__dict__
+        self._loaded_values = {
+            attname: copy.copy(values[attname]) if mutable else values[attname]
+            for attname, mutable in self._snapshot_fields()
+            if attname in values
+        }
+    
+    @classmethod
+    @functools.cache
+    def _snapshot_fields(cls):
+        """Return (attname, needs a copy) for every concrete field."""
+        return [
+            (field.attname, isinstance(field, models.JSONField))
+            for field in cls._meta.concrete_fields
+        ]
+    
+    def get_changed_fields(self):
+        """
+        Get the fields whose value differs from the last loaded or saved state.
+        
+        Returns:
+            dict mapping field name to (old, new) value, or None when the
+            instance was not loaded from the database
+        """
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            return None
+        changed = {}
+        for field in self._meta.concrete_fields:
+            if field.attname in loaded:
+                new_value = getattr(self, field.attname)
+                if loaded[field.attname] != new_value:
+                    changed[field.name] = (loaded[field.attname], new_value)
+        return changed
+    
+    def save(self, *args, **kwargs):
+        """
+        Save the incident, bumping the row version on every update.
+        
+        Updates go through write_update, so the version is incremented by the
+        database instead of being written from the value loaded here.
+        """
+        if self._state.adding or kwargs.get('force_insert'):
+            super().save(*args, **kwargs)
+            return
+        if not self.write_update(kwargs.get('update_fields'), using=kwargs.get('using')):
+            raise DatabaseError('Save did not affect any rows.')
+    
+    def write_update(self, update_fields=None, using=None, **conditions):
+        """
+        Write this incident's columns with one UPDATE, setting version = version + 1.
+        
+        The new version is read back in the same transaction, so two writers
+        that loaded the same version never both end up with the same one.
+        Sends pre_save and post_save like Model.save.
+        
+        Args:
+            update_fields: Names of the fields to write, or None for every column
+            using: Database alias (default: the one the incident was loaded from)
+            **conditions: Lookups the stored row must still match, e.g. version=3
+        
+        Returns:
+            bool: Whether the row still matched the conditions and was written
+        """
+        using = using or self._state.db or router.db_for_write(Incident, instance=self)
+        if update_fields is None:
+            # Like Model.save, deferred fields are left alone
+            deferred = self.get_deferred_fields()
+            fields = [field for field in self._meta.concrete_fields if field.attname not in deferred]
+        else:
+            fields = [
+                field for field in self._meta.concrete_fields
+                if field.name in update_fields or field.attname in update_fields
+            ]
+        fields = [field for field in fields if not field.primary_key and field.name != 'version']
+        written_fields = frozenset([field.name for field in fields] + ['version'])
+        
+        pre_save.send(sender=Incident, instance=self, raw=False, using=using, update_fields=written_fields)
+        values = {field.attname: field.pre_save(self, False) for field in fields}
+        with transaction.atomic(using=using):
+            rows = Incident.objects.using(using).filter(pk=self.pk, **conditions)
+            if not rows.update(version=F('version') + 1, **values):
+                return False
+            self.version = Incident.objects.using(using).values_list('version', flat=True).get(pk=self.pk)
+        self._state.db = using
+        post_save.send(
+            sender=Incident, instance=self, created=False, update_fields=written_fields, raw=False, using=using
+        )
+        return True
+    
     @property
     def is_l5_high(self):
         """Check if this is a critical L5 High incident."""
@@ -152,6 +288,326 @@ class IncidentUpdate(models.Model):
         ordering = ['-created_at']  # Newest first
         verbose_name = 'Incident Update'
         verbose_name_plural = 'Incident Updates'
+        indexes = [
+            # Updates feed pages and ?since= tails of one incident
+            models.Index(fields=['incident', 'created_at'], name='incident_update_feed_idx'),
+            # Watermark scans of incremental snapshots
+            models.Index(fields=['updated_at'], name='incident_update_updated_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Update on {self.incident.title} by {self.author} at {self.created_at}" 
+
+
+class IncidentTag(models.Model):
+    """
+    Normalized membership row for a value of one of the incident JSON list fields.
+    
+    Kept in sync with the Incident row on save so list filters can use an
+    indexed semi-join instead of scanning JSON columns.
+    """
+    DIMENSION_CHOICES = [
+        ('impacted_locations', 'Impacted Locations'),
+        ('impacted_parties', 'Impacted Parties'),
+        ('impacted_assets', 'Impacted Assets'),
+        ('impacted_areas', 'Impacted Areas'),
+    ]
+    
+    incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name='tags')
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    value = models.CharField(max_length=255)
+    
+    class Meta:
+        verbose_name = 'Incident Tag'
+        verbose_name_plural = 'Incident Tags'
+        constraints = [
+            models.UniqueConstraint(fields=['incident', 'dimension', 'value'], name='incident_tag_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'value', 'incident'], name='incident_tag_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.dimension}={self.value} on #{self.incident_id}"
+
+
+class CorrelationTerm(models.Model):
+    """
+    Inverted index entry used to find duplicate incidents.
+    
+    Holds one row per normalized title/description token and per impacted_*
+    value of an incident, with a copy of its started_at so candidate lookups
+    are index range scans over the posting lists of a bounded time window.
+    """
+    TEXT_KIND = 'text'
+    KIND_CHOICES = [(TEXT_KIND, 'Title/Description Token')] + IncidentTag.DIMENSION_CHOICES
+    
+    incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name='correlation_terms')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    term = models.CharField(max_length=255)
+    started_at = models.DateTimeField(help_text="Copy of the incident's started_at")
+    
+    class Meta:
+        verbose_name = 'Correlation Term'
+        verbose_name_plural = 'Correlation Terms'
+        constraints = [
+            models.UniqueConstraint(fields=['incident', 'kind', 'term'], name='correlation_term_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'term', 'started_at'], name='correlation_term_lookup_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind}:{self.term} on #{self.incident_id}"
+
+
+class IncidentEvent(models.Model):
+    """
+    Append-only log of incident changes, streamed to live clients over SSE.
+    
+    The auto-increment id doubles as the SSE event id used for Last-Event-ID resume.
+    """
+    EVENT_TYPE_CHOICES = [
+        ('incident_created', 'Incident Created'),
+        ('incident_updated', 'Incident Updated'),
+        ('status_changed', 'Status Changed'),
+        ('update_created', 'Update Created'),
+        ('update_edited', 'Update Edited'),
+    ]
+    
+    incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name='events')
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPE_CHOICES)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Incident Event'
+        verbose_name_plural = 'Incident Events'
+        indexes = [
+            models.Index(fields=['incident', 'id'], name='incident_event_feed_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} on #{self.incident_id} ({self.id})"
+
+
+class IncidentMetrics(models.Model):
+    """
+    Lifecycle timestamps and durations of an incident.
+    
+    Materialized whenever the status or a duration input changes, so MTTD/MTTR
+    style analytics never have to scan incidents. The rollup dimensions are
+    copied here so the previous rollup contribution can be subtracted when
+    they change.
+    """
+    incident = models.OneToOneField(Incident, on_delete=models.CASCADE, primary_key=True, related_name='metrics')
+    
+    # Rollup dimensions as of the last sync
+    day = models.DateField(help_text="Day the incident started")
+    reporting_org = models.CharField(max_length=100)
+    level = models.CharField(max_length=3, blank=True)
+    scope = models.CharField(max_length=10, blank=True)
+    incident_type = models.CharField(max_length=10)
+    
+    # First time the incident entered each status after being reported
+    mitigating_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True)
+    postmortem_at = models.DateTimeField(null=True, blank=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    
+    # Durations in seconds
+    time_to_detect = models.FloatField(null=True, blank=True, help_text="From start to detection")
+    time_to_mitigate = models.FloatField(null=True, blank=True, help_text="From detection to mitigation start")
+    time_to_resolve = models.FloatField(null=True, blank=True, help_text="From start to resolution")
+    time_to_postmortem = models.FloatField(null=True, blank=True, help_text="From resolution to postmortem completion")
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Incident Metrics'
+        verbose_name_plural = 'Incident Metrics'
     
     def __str__(self):
-        return f"Update on {self.incident.title} by {self.author} at {self.created_at}" 
\ No newline at end of file
+        return f"Metrics of #{self.incident_id}"
+
+
+class IncidentMetricsRollup(models.Model):
+    """
+    Daily duration histogram per reporting org, level, scope and incident type.
+    
+    Each row counts the incidents of one day and dimension combination whose
+    duration for ``metric`` falls into one log-scale ``bucket``, so percentiles
+    over any date range are a single grouped SUM.
+    """
+    METRIC_CHOICES = [
+        ('detect', 'Time to Detect'),
+        ('mitigate', 'Time to Mitigate'),
+        ('resolve', 'Time to Resolve'),
+        ('postmortem', 'Time to Postmortem'),
+    ]
+    
+    day = models.DateField()
+    reporting_org = models.CharField(max_length=100)
+    level = models.CharField(max_length=3, blank=True)
+    scope = models.CharField(max_length=10, blank=True)
+    incident_type = models.CharField(max_length=10)
+    metric = models.CharField(max_length=10, choices=METRIC_CHOICES)
+    bucket = models.SmallIntegerField()
+    count = models.IntegerField(default=0)
+    total_seconds = models.FloatField(default=0)
+    
+    class Meta:
+        verbose_name = 'Incident Metrics Rollup'
+        verbose_name_plural = 'Incident Metrics Rollups'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['metric', 'day', 'reporting_org', 'level', 'scope', 'incident_type', 'bucket'],
+                name='incident_rollup_unique'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.metric} {self.day} {self.reporting_org}/{self.level}/{self.scope}/{self.incident_type}: {self.count}"
+
+
+class IncidentStatusTransition(models.Model):
+    """
+    Append-only log of incident status changes.
+    
+    Rows are only ever inserted. Because the status flow is linear, an incident
+    enters each status at most once, so "currently in status X since before T"
+    is a range scan on (to_status, transitioned_at) joined to the incident.
+    """
+    incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name='status_transitions')
+    from_status = models.CharField(max_length=15, choices=STATUS_CHOICES)
+    to_status = models.CharField(max_length=15, choices=STATUS_CHOICES)
+    transitioned_at = models.DateTimeField(default=timezone.now)
+    transitioned_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='incident_transitions')
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Incident Status Transition'
+        verbose_name_plural = 'Incident Status Transitions'
+        indexes = [
+            models.Index(fields=['incident', 'transitioned_at'], name='incident_transition_hist_idx'),
+            models.Index(fields=['to_status', 'transitioned_at'], name='incident_transition_age_idx'),
+        ]
+    
+    def __str__(self):
+        return f"#{self.incident_id}: {self.from_status} -> {self.to_status} at {self.transitioned_at}"
+
+
+class IncidentNotification(models.Model):
+    """
+    Outbox of email notifications waiting to be delivered.
+    
+    One row per incident event and recipient, queued when the change commits.
+    The send_incident_notifications worker coalesces each recipient's pending
+    rows into a digest, so requests never wait on SMTP.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+    
+    incident = models.ForeignKey(Incident, on_delete=models.CASCADE, related_name='notifications')
+    recipient = models.EmailField()
+    event_type = models.CharField(max_length=20, choices=IncidentEvent.EVENT_TYPE_CHOICES)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now, help_text="Earliest time the worker may send (or retry) this row")
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['id']
+        verbose_name = 'Incident Notification'
+        verbose_name_plural = 'Incident Notifications'
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='incident_notification_due_idx'),
+            models.Index(fields=['recipient', 'status'], name='incident_notification_rcpt_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.event_type} on #{self.incident_id} to {self.recipient} ({self.status})"
+
+
+class ActiveIncident(models.Model):
+    """
+    Denormalized row of an incident that is not closed, for the active board.
+    
+    Upserted on every incident save and status transition and deleted when
+    the incident closes, so the board reads one small table whose size
+    depends on the open incidents only, not on the incident history.
+    """
+    incident = models.OneToOneField(Incident, on_delete=models.CASCADE, primary_key=True, related_name='board_entry')
+    title = models.CharField(max_length=255)
+    level = models.CharField(max_length=3, blank=True)
+    scope = models.CharField(max_length=10, blank=True)
+    status = models.CharField(max_length=15)
+    incident_type = models.CharField(max_length=10)
+    incident_commander = models.EmailField()
+    reporting_org = models.CharField(max_length=100)
+    started_at = models.DateTimeField()
+    status_since = models.DateTimeField(help_text="When the incident entered its current status")
+    updated_at = models.DateTimeField(help_text="Last change of the incident")
+    
+    class Meta:
+        ordering = ['-started_at']
+        verbose_name = 'Active Incident'
+        verbose_name_plural = 'Active Incidents'
+    
+    def __str__(self):
+        return f"#{self.incident_id} {self.status} {self.level}: {self.title}"
+
+
+
+class ImportCheckpoint(models.Model):
+    """
+    Progress of a resumable import_incidents run.
+    
+    Saved in the transaction that writes each batch, so the stored position
+    always matches the records that were committed.
+    """
+    name = models.CharField(max_length=255, unique=True, help_text="Absolute source path or --checkpoint name")
+    position = models.PositiveIntegerField(default=0, help_text="Number of source records processed")
+    imported = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = 'Import Checkpoint'
+        verbose_name_plural = 'Import Checkpoints'
+    
+    def __str__(self):
+        return f"{self.name} at record {self.position}"
+
+
+# Model field -> shared config key of its choices, read from the current config snapshot
+CONFIG_CHOICE_FIELDS = {
+    Incident: {
+        'level': 'levels',
+        'scope': 'scopes',
+        'incident_type': 'types',
+        'status': 'statuses',
+        'safety_compliance': 'impactOptions',
+        'security_privacy': 'impactOptions',
+        'data_quality': 'impactOptions',
+        'psd2_impact': 'impactOptions',
+        'time_format': 'timeFormats',
+        'detection_source': 'detectionSources',
+    },
+    IncidentStatusTransition: {
+        'from_status': 'statuses',
+        'to_status': 'statuses',
+    },
+}
+
+
+for model, fields in CONFIG_CHOICE_FIELDS.items():
+    for field_name, config_key in fields.items():
+        model._meta.get_field(field_name).choices = ConfigChoices(config_key)
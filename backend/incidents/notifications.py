@@ -0,0 +1,222 @@
+"""
+Email notification outbox.
+
+Incident events are queued as IncidentNotification rows (one per recipient)
+once the change commits; requests never talk to SMTP. The
+send_incident_notifications worker claims due rows, coalesces each
+recipient's pending rows into one digest and sends the digests from a thread
+pool, retrying failures with exponential backoff.
+"""
+import logging
+import random
+import re
+from collections import OrderedDict, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.mail import EmailMessage
+from django.core.validators import validate_email
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Incident, IncidentNotification
+
+logger = logging.getLogger(__name__)
+
+# Events that notify subscribers; edits to existing updates are not mailed
+NOTIFY_EVENT_TYPES = {'incident_created', 'status_changed', 'incident_updated', 'update_created'}
+
+MAX_ATTEMPTS = 8
+RETRY_BASE_DELAY = 30  # seconds, doubled on every failed attempt
+RETRY_MAX_DELAY = 3600
+# How long a claimed row stays reserved for the worker that claimed it
+CLAIM_LEASE = 300
+CONTENT_PREVIEW_LENGTH = 300
+
+SUBSCRIBER_SEPARATORS = re.compile(r'[\s,;]+')
+
+
+def parse_subscribers(value):
+    """Return the valid email addresses in a free-text subscriber list."""
+    addresses = []
+    for item in SUBSCRIBER_SEPARATORS.split(value or ''):
+        try:
+            validate_email(item)
+        except ValidationError:
+            continue
+        if item.lower() not in (address.lower() for address in addresses):
+            addresses.append(item)
+    return addresses
+
+
+def digest_window():
+    """Seconds a new notification waits so rapid-fire changes share one digest."""
+    return getattr(settings, 'INCIDENT_NOTIFICATIONS_DIGEST_WINDOW', 60)
+
+
+def queue_notifications(events):
+    """
+    Queue notifications for incident events, one row per recipient.
+
+    Recipients are the incident commander and the additional subscribers of
+    incidents with send_email_notifications set. Called after commit by
+    record_event/record_events; a failure is logged instead of raised so it
+    never fails the request that made the change.
+
+    Args:
+        events: Iterable of (incident_id, event_type, payload) tuples
+    """
+    events = [event for event in events if event[1] in NOTIFY_EVENT_TYPES]
+    if not events:
+        return
+    try:
+        recipients = {
+            pk: [commander, *parse_subscribers(subscribers)]
+            for pk, commander, subscribers in Incident.objects.filter(
+                pk__in={incident_id for incident_id, _, _ in events}, send_email_notifications=True
+            ).values_list('pk', 'incident_commander', 'additional_subscribers')
+        }
+        send_after = timezone.now() + timedelta(seconds=digest_window())
+        IncidentNotification.objects.bulk_create([
+            IncidentNotification(
+                incident_id=incident_id, recipient=recipient, event_type=event_type,
+                payload=payload, next_attempt_at=send_after
+            )
+            for incident_id, event_type, payload in events
+            for recipient in dict.fromkeys(recipients.get(incident_id, []))
+            if recipient
+        ])
+    except Exception:
+        logger.exception('Could not queue incident notifications')
+
+
+def retry_delay(attempts):
+    """Return the backoff before the next attempt, with jitter."""
+    delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** max(0, attempts - 1))
+    return timedelta(seconds=random.uniform(delay / 2, delay))
+
+
+def claim_digests(max_recipients=100):
+    """
+    Reserve the pending notifications of recipients with at least one due row.
+
+    The recipient's rows that were never attempted are claimed along with the
+    due ones, so notifications queued during the digest window go out
+    together; rows waiting out a retry backoff or leased elsewhere are not.
+    Claimed rows get their attempt counted and are leased for CLAIM_LEASE
+    seconds; if the worker dies before recording the outcome they become due
+    again afterwards. Rows locked by another worker are skipped.
+
+    Returns:
+        dict mapping recipient to its claimed IncidentNotification rows
+    """
+    now = timezone.now()
+    recipients = list(
+        IncidentNotification.objects.filter(status='pending', next_attempt_at__lte=now)
+        .order_by()
+        .values_list('recipient', flat=True)
+        .distinct()[:max_recipients]
+    )
+    if not recipients:
+        return {}
+
+    with transaction.atomic():
+        rows = list(
+            IncidentNotification.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', recipient__in=recipients)
+            .filter(Q(attempts=0) | Q(next_attempt_at__lte=now))
+            .order_by('id')
+        )
+        IncidentNotification.objects.filter(pk__in=[row.pk for row in rows]).update(
+            attempts=F('attempts') + 1, next_attempt_at=now + timedelta(seconds=CLAIM_LEASE)
+        )
+
+    digests = defaultdict(list)
+    for row in rows:
+        row.attempts += 1
+        digests[row.recipient].append(row)
+    return digests
+
+
+def _summarize(rows):
+    """Coalesce one incident's notifications into digest lines."""
+    lines = []
+    first_status = last_status = None
+    fields = {}
+    for row in rows:
+        payload = row.payload
+        if row.event_type == 'incident_created':
+            lines.append(f"Incident reported: level {payload.get('level') or '-'}, scope {payload.get('scope') or '-'}")
+        elif row.event_type == 'status_changed':
+            first_status = first_status or payload.get('from')
+            last_status = payload.get('to')
+        elif row.event_type == 'incident_updated':
+            fields.update(payload.get('fields', {}))
+        elif row.event_type == 'update_created':
+            update = payload.get('update', {})
+            content = update.get('content', '')
+            if len(content) > CONTENT_PREVIEW_LENGTH:
+                content = content[:CONTENT_PREVIEW_LENGTH] + '...'
+            lines.append(f"New {update.get('update_type', 'update')} from {update.get('author')}: {content}")
+    if last_status:
+        lines.insert(0, f"Status: {first_status} -> {last_status}")
+    if fields:
+        lines.append('Changed: ' + ', '.join(sorted(fields)))
+    return lines
+
+
+def build_digest(recipient, rows):
+    """
+    Render a recipient's claimed notifications as one email.
+
+    Notifications are grouped per incident; status changes collapse to the
+    first and last status and field edits to the set of changed fields.
+    """
+    by_incident = OrderedDict()
+    for row in rows:
+        by_incident.setdefault(row.incident_id, []).append(row)
+    titles = dict(Incident.objects.filter(pk__in=by_incident).values_list('pk', 'title'))
+
+    sections = []
+    for incident_id, incident_rows in by_incident.items():
+        lines = _summarize(incident_rows)
+        sections.append('\n'.join([f"#{incident_id} {titles.get(incident_id, '')}"] + [f"  - {line}" for line in lines]))
+
+    if len(by_incident) == 1:
+        incident_id = next(iter(by_incident))
+        subject = f"[Incident #{incident_id}] {titles.get(incident_id, '')}"
+    else:
+        subject = f"{len(by_incident)} incidents updated"
+    return EmailMessage(
+        subject=subject,
+        body='\n\n'.join(sections) + '\n',
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient],
+    )
+
+
+def send_digest(message):
+    """Send one digest on its own connection; runs in a worker thread."""
+    message.send(fail_silently=False)
+
+
+def record_sent(rows):
+    IncidentNotification.objects.filter(pk__in=[row.pk for row in rows]).update(
+        status='sent', sent_at=timezone.now(), last_error=''
+    )
+
+
+def record_failure(rows, error):
+    """Schedule a retry with backoff, or give up after MAX_ATTEMPTS."""
+    error = str(error)[:1000]
+    attempts = max(row.attempts for row in rows)
+    given_up = [row.pk for row in rows if row.attempts >= MAX_ATTEMPTS]
+    retried = [row.pk for row in rows if row.attempts < MAX_ATTEMPTS]
+    if given_up:
+        IncidentNotification.objects.filter(pk__in=given_up).update(status='failed', last_error=error)
+    if retried:
+        IncidentNotification.objects.filter(pk__in=retried).update(
+            next_attempt_at=timezone.now() + retry_delay(attempts), last_error=error
+        )
@@ -0,0 +1,251 @@
+"""
+Pagination classes for the incidents API.
+
+The default mode is DRF page-number pagination. Clients can opt in to keyset
+(cursor) pagination with ``?pagination=cursor`` or by following a ``cursor``
+link; it skips the COUNT(*) and OFFSET scans and stays stable while new
+incidents are inserted at the head of the list. Both modes also paginate
+through the async ORM (apaginate_queryset) for the async read views.
+"""
+import hashlib
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset pagination on (ordering field, id).
+
+    The cursor carries the ordering value and primary key of the boundary row,
+    so each page is an index range scan starting right after it. Rows inserted
+    before the boundary never shift the following pages.
+    """
+    page_size = None  # Falls back to settings PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_cache_timeout = 30
+    default_ordering = '-created_at'
+    ordering_fields = None  # Falls back to the view's ordering_fields
+    tie_breaker = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        self.count = self.get_count(queryset) if self.count_requested(request) else None
+        return self.set_page(list(page_queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async variant of paginate_queryset."""
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        self.count = await self.aget_count(queryset) if self.count_requested(request) else None
+        return self.set_page([obj async for obj in page_queryset])
+
+    def get_page_queryset(self, queryset, request, view):
+        """Return the (unevaluated) query of the requested page plus one lookahead row."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.field, descending = self.get_ordering(queryset, view)
+
+        cursor = self.decode_cursor(request)
+        self.cursor = cursor
+        reverse = cursor['r'] if cursor else False
+
+        # Walking backwards flips the scan direction, results are re-reversed in set_page
+        scan_descending = descending != reverse
+        prefix = '-' if scan_descending else ''
+        queryset = queryset.order_by(f'{prefix}{self.field}', f'{prefix}{self.tie_breaker}')
+
+        if cursor:
+            lookup = 'lt' if scan_descending else 'gt'
+            value = self.model._meta.get_field(self.field).to_python(cursor['v'])
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{lookup}': value}) |
+                Q(**{self.field: value, f'{self.tie_breaker}__{lookup}': cursor['id']})
+            )
+
+        return queryset[:self.page_size + 1]
+
+    def set_page(self, results):
+        cursor = self.cursor
+        reverse = cursor['r'] if cursor else False
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = cursor is not None
+
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+        ])
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_page_size(self, request):
+        page_size = self.page_size or api_settings.PAGE_SIZE
+        if self.page_size_query_param:
+            try:
+                requested = int(request.query_params[self.page_size_query_param])
+                if requested > 0:
+                    page_size = min(requested, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return page_size
+
+    def get_ordering(self, queryset, view):
+        """
+        Resolve the keyset field from the queryset ordering.
+
+        Returns:
+            tuple: (field name, descending)
+        """
+        allowed = set(self.ordering_fields or getattr(view, 'ordering_fields', None) or [])
+        ordering = [o for o in queryset.query.order_by if isinstance(o, str)]
+        first = ordering[0] if ordering else self.default_ordering
+        field = first.lstrip('-')
+        if field not in allowed:
+            first = self.default_ordering
+            field = first.lstrip('-')
+        return field, first.startswith('-')
+
+    def count_requested(self, request):
+        return request.query_params.get(self.count_query_param, '').lower() in ('1', 'true', 'yes')
+
+    def get_count_key(self, queryset):
+        sql, params = queryset.order_by().query.sql_with_params()
+        digest = hashlib.md5(f'{sql}|{params!r}'.encode()).hexdigest()
+        return f'incidents:keyset-count:{digest}'
+
+    def get_count(self, queryset):
+        """Return the filtered row count, cached briefly per distinct query."""
+        key = self.get_count_key(queryset)
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, self.count_cache_timeout)
+        return count
+
+    async def aget_count(self, queryset):
+        """Async variant of get_count."""
+        key = self.get_count_key(queryset)
+        count = await cache.aget(key)
+        if count is None:
+            count = await queryset.order_by().acount()
+            await cache.aset(key, count, self.count_cache_timeout)
+        return count
+
+    def encode_cursor(self, instance, reverse):
+        value = getattr(instance, self.field)
+        if hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        payload = {'v': value, 'id': getattr(instance, self.tie_breaker), 'r': reverse}
+        token = urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(urlsafe_b64decode(token.encode()).decode())
+            return {'v': payload['v'], 'id': int(payload['id']), 'r': bool(payload.get('r'))}
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound('Invalid cursor')
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+
+class IncidentPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset mode.
+
+    ``?pagination=cursor`` (or any request carrying a ``cursor``) is served by
+    KeysetPagination; everything else keeps the existing page/count response.
+    """
+    mode_query_param = 'pagination'
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_requested(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """Async variant of paginate_queryset: one COUNT and one page query through the async ORM."""
+        self.keyset = None
+        if self.keyset_requested(request):
+            self.keyset = self.keyset_class()
+            return await self.keyset.apaginate_queryset(queryset, request, view)
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        paginator = self.django_paginator_class(queryset, page_size)
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list]
+
+        if paginator.num_pages > 1 and self.template is not None:
+            self.display_page_controls = True
+        return list(self.page)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def keyset_requested(self, request):
+        params = request.query_params
+        return params.get(self.mode_query_param) == 'cursor' or self.keyset_class.cursor_query_param in params
+
+
+class UpdateFeedPagination(KeysetPagination):
+    """
+    Keyset pagination for an incident's updates feed.
+
+    Pages newest first by default; the view switches to oldest first on
+    created_at or id when the client asks for updates after a ``since`` point.
+    """
+    page_size = 50
+    max_page_size = 200
+    ordering_fields = ('created_at', 'id')
@@ -0,0 +1,338 @@
+"""
+Full-text search over incidents and their updates.
+
+MySQL uses FULLTEXT indexes (MATCH ... AGAINST in boolean mode), SQLite uses
+FTS5 external-content tables created by migration 0010. Any other backend, or
+a SQLite build without FTS5, falls back to a slower icontains scan. Scores
+from the incident fields and the best matching update are summed per incident.
+Filters on the incident queryset are applied inside the ranking query, so the
+top results are the best matches among the filtered incidents.
+"""
+import html
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Incident, IncidentUpdate
+
+INCIDENT_SEARCH_FIELDS = ['title', 'description', 'incident_commander', 'reporting_org']
+SNIPPET_FIELDS = ['title', 'description']
+SNIPPET_WIDTH = 160
+MAX_TERMS = 8
+
+INCIDENT_FTS_TABLE = 'incidents_incident_fts'
+UPDATE_FTS_TABLE = 'incidents_incidentupdate_fts'
+
+
+def parse_terms(query):
+    """
+    Split a search string into lower-cased word terms.
+
+    Args:
+        query: Raw search string from the client
+
+    Returns:
+        List of unique terms in query order, at most MAX_TERMS long
+    """
+    terms = []
+    for term in re.findall(r'\w+', query.lower()):
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_TERMS]
+
+
+class SearchBackend:
+    """Fallback backend using icontains lookups; ranks by number of matching terms."""
+
+    def search(self, terms, limit, queryset=None):
+        """
+        Rank incidents matching any of the terms.
+
+        Args:
+            terms: Search terms from parse_terms
+            limit: Maximum number of hits
+            queryset: Incident queryset the hits must belong to, or None for all
+
+        Returns:
+            List of (incident_id, score) tuples, best match first
+        """
+        incidents = Incident.objects.all() if queryset is None else queryset.order_by()
+        updates = IncidentUpdate.objects.all()
+        if queryset is not None and queryset.query.has_filters():
+            updates = updates.filter(incident__in=incidents.values('pk'))
+        scores = {}
+        for term in terms:
+            q_objects = Q()
+            for field in INCIDENT_SEARCH_FIELDS:
+                q_objects |= Q(**{f'{field}__icontains': term})
+            for incident_id in incidents.filter(q_objects).values_list('id', flat=True):
+                scores[incident_id] = scores.get(incident_id, 0) + 1.0
+            update_hits = updates.filter(content__icontains=term)
+            for incident_id in update_hits.values_list('incident_id', flat=True).distinct():
+                scores[incident_id] = scores.get(incident_id, 0) + 0.5
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return ranked[:limit]
+
+    def matching_updates(self, terms, incident_ids):
+        """
+        Return matching updates for the given incidents.
+
+        Returns:
+            dict mapping incident_id to a list of (update_id, content), newest first
+        """
+        q_objects = Q()
+        for term in terms:
+            q_objects |= Q(content__icontains=term)
+        rows = (
+            IncidentUpdate.objects.filter(q_objects, incident_id__in=incident_ids)
+            .order_by('-created_at').values_list('incident_id', 'id', 'content')
+        )
+        return self._group_updates(rows)
+
+    @staticmethod
+    def restrict(queryset, column):
+        """
+        Build the SQL condition limiting column to the ids of a filtered queryset.
+
+        Returns:
+            tuple: (condition, params), an empty condition when nothing is filtered
+        """
+        if queryset is None or not queryset.query.has_filters():
+            return '', []
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        return f'{column} IN ({sql})', list(params)
+
+    @staticmethod
+    def _group_updates(rows):
+        grouped = {}
+        for incident_id, update_id, content in rows:
+            grouped.setdefault(incident_id, []).append((update_id, content))
+        return grouped
+
+    def _fetch(self, sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+
+class MySQLSearchBackend(SearchBackend):
+    """FULLTEXT backend; terms are prefix-matched in boolean mode with OR semantics."""
+
+    incident_match = 'MATCH(title, description, incident_commander, reporting_org) AGAINST (%s IN BOOLEAN MODE)'
+    update_match = 'MATCH(content) AGAINST (%s IN BOOLEAN MODE)'
+
+    def boolean_query(self, terms):
+        return ' '.join(f'{term}*' for term in terms)
+
+    def search(self, terms, limit, queryset=None):
+        query = self.boolean_query(terms)
+        condition, condition_params = self.restrict(queryset, 'hits.id')
+        sql = f"""
+            SELECT hits.id, SUM(hits.score) AS score FROM (
+                SELECT id, {self.incident_match} AS score
+                FROM {Incident._meta.db_table} WHERE {self.incident_match}
+                UNION ALL
+                SELECT incident_id AS id, MAX({self.update_match}) AS score
+                FROM {IncidentUpdate._meta.db_table} WHERE {self.update_match}
+                GROUP BY incident_id
+            ) hits
+            {f'WHERE {condition}' if condition else ''}
+            GROUP BY hits.id ORDER BY score DESC, hits.id DESC LIMIT %s
+        """
+        return [(row[0], float(row[1])) for row in self._fetch(sql, [query] * 4 + condition_params + [limit])]
+
+    def matching_updates(self, terms, incident_ids):
+        if not incident_ids:
+            return {}
+        placeholders = ', '.join(['%s'] * len(incident_ids))
+        sql = f"""
+            SELECT incident_id, id, content FROM {IncidentUpdate._meta.db_table}
+            WHERE incident_id IN ({placeholders}) AND {self.update_match}
+            ORDER BY created_at DESC
+        """
+        return self._group_updates(self._fetch(sql, list(incident_ids) + [self.boolean_query(terms)]))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 backend ranked by bm25 (the default rank); terms are prefix-matched with OR semantics."""
+
+    # FTS table -> (content table, indexed columns)
+    fts_tables = {
+        INCIDENT_FTS_TABLE: (Incident._meta.db_table, INCIDENT_SEARCH_FIELDS),
+        UPDATE_FTS_TABLE: (IncidentUpdate._meta.db_table, ['content']),
+    }
+    triggers_checked = False
+
+    def __init__(self):
+        if not SQLiteSearchBackend.triggers_checked:
+            self.ensure_triggers()
+            SQLiteSearchBackend.triggers_checked = True
+
+    def ensure_triggers(self):
+        """
+        Recreate the FTS sync triggers if they are missing.
+
+        SQLite drops triggers when a migration rebuilds the content table, so
+        they are restored here and the index is rebuilt from the table.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            existing = {row[0] for row in cursor.fetchall()}
+            for fts_table, (table, columns) in self.fts_tables.items():
+                statements = sqlite_trigger_statements(table, fts_table, columns)
+                if all(name in existing for name in statements):
+                    continue
+                for name, statement in statements.items():
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+                    cursor.execute(statement)
+                cursor.execute(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')")
+
+    def match_query(self, terms):
+        return ' OR '.join(f'"{term}"*' for term in terms)
+
+    def search(self, terms, limit, queryset=None):
+        query = self.match_query(terms)
+        condition, condition_params = self.restrict(queryset, 'hits.id')
+        sql = f"""
+            SELECT hits.id, SUM(hits.score) AS score FROM (
+                SELECT rowid AS id, -{INCIDENT_FTS_TABLE}.rank AS score
+                FROM {INCIDENT_FTS_TABLE} WHERE {INCIDENT_FTS_TABLE} MATCH %s
+                UNION ALL
+                SELECT u.incident_id AS id, MAX(-{UPDATE_FTS_TABLE}.rank) AS score
+                FROM {UPDATE_FTS_TABLE}
+                JOIN {IncidentUpdate._meta.db_table} u ON u.id = {UPDATE_FTS_TABLE}.rowid
+                WHERE {UPDATE_FTS_TABLE} MATCH %s
+                GROUP BY u.incident_id
+            ) hits
+            {f'WHERE {condition}' if condition else ''}
+            GROUP BY hits.id ORDER BY score DESC, hits.id DESC LIMIT %s
+        """
+        return [(row[0], float(row[1])) for row in self._fetch(sql, [query, query] + condition_params + [limit])]
+
+    def matching_updates(self, terms, incident_ids):
+        if not incident_ids:
+            return {}
+        placeholders = ', '.join(['%s'] * len(incident_ids))
+        sql = f"""
+            SELECT u.incident_id, u.id, u.content
+            FROM {UPDATE_FTS_TABLE}
+            JOIN {IncidentUpdate._meta.db_table} u ON u.id = {UPDATE_FTS_TABLE}.rowid
+            WHERE {UPDATE_FTS_TABLE} MATCH %s AND u.incident_id IN ({placeholders})
+            ORDER BY u.created_at DESC
+        """
+        return self._group_updates(self._fetch(sql, [self.match_query(terms)] + list(incident_ids)))
+
+
+def sqlite_trigger_statements(table, fts_table, columns):
+    """Return the triggers keeping an FTS5 external-content table in sync, by name."""
+    cols = ', '.join(columns)
+    new_values = ', '.join(f'new.{c}' for c in columns)
+    old_values = ', '.join(f'old.{c}' for c in columns)
+    delete_old = f"INSERT INTO {fts_table}({fts_table}, rowid, {cols}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts_table}(rowid, {cols}) VALUES (new.id, {new_values});"
+    return {
+        f'{fts_table}_ai': f"CREATE TRIGGER {fts_table}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f'{fts_table}_ad': f"CREATE TRIGGER {fts_table}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f'{fts_table}_au': f"CREATE TRIGGER {fts_table}_au AFTER UPDATE ON {table} BEGIN {delete_old} {insert_new} END",
+    }
+
+
+# Database alias -> resolved backend, so the schema is inspected once per process
+_backends = {}
+
+
+def get_search_backend():
+    """Return the search backend for the default database connection."""
+    backend = _backends.get(connection.alias)
+    if backend is None:
+        if connection.vendor == 'mysql':
+            backend = MySQLSearchBackend()
+        elif connection.vendor == 'sqlite' and INCIDENT_FTS_TABLE in connection.introspection.table_names():
+            backend = SQLiteSearchBackend()
+        else:
+            backend = SearchBackend()
+        _backends[connection.alias] = backend
+    return backend
+
+
+def highlight(text, terms, width=SNIPPET_WIDTH):
+    """
+    Build an HTML-escaped snippet of text with matching terms wrapped in <mark>.
+
+    Args:
+        text: Source text
+        terms: Search terms (prefix matched, case-insensitive)
+        width: Approximate snippet length in characters
+
+    Returns:
+        Snippet string, or None when no term occurs in the text
+    """
+    if not text or not terms:
+        return None
+    pattern = re.compile(r'\b(' + '|'.join(re.escape(t) for t in terms) + r')\w*', re.IGNORECASE)
+    first = pattern.search(text)
+    if not first:
+        return None
+
+    start = max(0, first.start() - width // 4)
+    end = min(len(text), start + width)
+    window = text[start:end]
+
+    parts = []
+    position = 0
+    for match in pattern.finditer(window):
+        parts.append(html.escape(window[position:match.start()]))
+        parts.append(f'<mark>{html.escape(match.group(0))}</mark>')
+        position = match.end()
+    parts.append(html.escape(window[position:]))
+
+    snippet = ''.join(parts)
+    if start > 0:
+        snippet = '…' + snippet
+    if end < len(text):
+        snippet = snippet + '…'
+    return snippet
+
+
+def search_incidents(query, queryset, limit=20, updates_per_incident=3):
+    """
+    Run a ranked full-text search restricted to a (filtered) incident queryset.
+
+    Args:
+        query: Raw search string
+        queryset: Incident queryset the results must belong to
+        limit: Maximum number of results
+        updates_per_incident: Maximum update snippets returned per incident
+
+    Returns:
+        List of (incident, score, highlights) tuples, best match first
+    """
+    terms = parse_terms(query)
+    if not terms:
+        return []
+
+    backend = get_search_backend()
+    hits = backend.search(terms, limit, queryset)
+    scores = dict(hits)
+
+    incidents = queryset.order_by().in_bulk([incident_id for incident_id, _ in hits])
+    ranked = [incidents[incident_id] for incident_id, _ in hits if incident_id in incidents]
+
+    updates = backend.matching_updates(terms, [incident.id for incident in ranked])
+
+    results = []
+    for incident in ranked:
+        highlights = {}
+        for field in SNIPPET_FIELDS:
+            snippet = highlight(getattr(incident, field), terms)
+            if snippet:
+                highlights[field] = snippet
+        update_snippets = [
+            {'id': update_id, 'snippet': highlight(content, terms)}
+            for update_id, content in updates.get(incident.id, [])[:updates_per_incident]
+        ]
+        if update_snippets:
+            highlights['updates'] = update_snippets
+        results.append((incident, scores[incident.id], highlights))
+    return results
@@ -2,10 +2,74 @@
 Django REST Framework serializers for incident models.
 """
 from rest_framework import serializers
-from .models import Incident, IncidentDocument, IncidentUpdate
+from .models import Incident, IncidentDocument, IncidentStatusTransition, IncidentUpdate
+from .concurrency import save_incident
+from .transitions import InvalidTransition, check_transition, transition_incident
 from django.utils.dateparse import parse_datetime
 from django.utils import timezone
 
+# Maximum number of updates embedded in an incident detail payload;
+# the full feed is available from the incident updates endpoint.
+DETAIL_UPDATES_LIMIT = 50
+
+
+class SparseFieldsetMixin:
+    """
+    Trim serializer output to the ``?fields=`` / ``?exclude=`` query parameters.
+    
+    Only applied to GET requests so write validation always sees every field.
+    ``column_dependencies`` lists the model columns read by computed fields, so
+    views can restrict the SQL column list with ``only()``.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+    column_dependencies = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.sparse = False
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        
+        only_fields = self._split_param(request, self.fields_query_param)
+        exclude_fields = self._split_param(request, self.exclude_query_param)
+        if not only_fields and not exclude_fields:
+            return
+        
+        self.sparse = True
+        for name in list(self.fields):
+            if (only_fields and name not in only_fields) or name in exclude_fields:
+                self.fields.pop(name)
+    
+    @staticmethod
+    def _split_param(request, param):
+        values = set()
+        for value in request.query_params.getlist(param):
+            values.update(v.strip() for v in value.split(',') if v.strip())
+        return values
+    
+    def get_model_columns(self):
+        """
+        Return the model columns needed to render the remaining fields.
+        
+        Returns:
+            List of field names for ``QuerySet.only()``, or None when no
+            sparse fieldset was requested and all columns should be loaded
+        """
+        if not self.sparse:
+            return None
+        
+        model = self.Meta.model
+        concrete = {f.name for f in model._meta.concrete_fields}
+        columns = set()
+        for name, field in self.fields.items():
+            source = field.source.split('.')[0]
+            if source in concrete:
+                columns.add(source)
+            columns.update(self.column_dependencies.get(name, ()))
+        return sorted(columns)
+
 
 class IncidentDocumentSerializer(serializers.ModelSerializer):
     """Serializer for IncidentDocument model."""
@@ -16,7 +80,7 @@ class IncidentDocumentSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
-class IncidentUpdateSerializer(serializers.ModelSerializer):
+class IncidentUpdateSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for IncidentUpdate model."""
     
     class Meta:
@@ -30,11 +94,28 @@ class IncidentUpdateSerializer(serializers.ModelSerializer):
         return IncidentUpdate.objects.create(**validated_data)
 
 
-class IncidentSerializer(serializers.ModelSerializer):
+class IncidentStatusTransitionSerializer(serializers.ModelSerializer):
+    """Serializer for IncidentStatusTransition model."""
+    
+    class Meta:
+        model = IncidentStatusTransition
+        fields = ['id', 'from_status', 'to_status', 'transitioned_at', 'transitioned_by']
+        read_only_fields = fields
+
+
+class IncidentSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for Incident model."""
     
+    column_dependencies = {
+        'is_l5_high': ['level', 'scope'],
+        'requires_mitigation_policy': ['level', 'scope'],
+        'impacted_locations_display': ['impacted_locations'],
+        'impacted_parties_display': ['impacted_parties'],
+    }
+    
     documents = IncidentDocumentSerializer(many=True, read_only=True)
-    updates = IncidentUpdateSerializer(many=True, read_only=True)
+    updates = serializers.SerializerMethodField()
+    updates_count = serializers.SerializerMethodField()
     impacted_locations = serializers.JSONField(required=False, allow_null=True)
     impacted_parties = serializers.JSONField(required=False, allow_null=True)
     
@@ -55,17 +136,39 @@ class IncidentSerializer(serializers.ModelSerializer):
             'first_detected_in', 'impacted_assets', 'impacted_areas',
             'additional_subscribers', 'safety_compliance_document_url', 'l5_confirmation',
             'mitigation_policy_acknowledgment', 'send_email_notifications',
-            'status', 'created_at', 'updated_at', 'created_by',
+            'status', 'version', 'duplicate_of', 'created_at', 'updated_at', 'created_by',
             
             # Read-only computed fields
-            'documents', 'updates', 'is_l5_high', 'requires_mitigation_policy',
+            'documents', 'updates', 'updates_count', 'is_l5_high', 'requires_mitigation_policy',
             'impacted_locations_display', 'impacted_parties_display'
         ]
         read_only_fields = [
-            'id', 'created_at', 'updated_at', 'created_by',
+            'id', 'version', 'duplicate_of', 'created_at', 'updated_at', 'created_by',
             'is_l5_high', 'requires_mitigation_policy'
         ]
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Write responses omit the (potentially large) updates feed unless requested
+        if not self.context.get('include_updates', True):
+            self.fields.pop('updates', None)
+            self.fields.pop('updates_count', None)
+    
+    def get_updates(self, obj):
+        """Return the most recent updates, capped at the context updates_limit."""
+        updates = getattr(obj, 'recent_updates', None)
+        if updates is None:
+            limit = self.context.get('updates_limit', DETAIL_UPDATES_LIMIT)
+            updates = obj.updates.all()[:limit]
+        return IncidentUpdateSerializer(updates, many=True).data
+    
+    def get_updates_count(self, obj):
+        """Return the total number of updates, preferring a queryset annotation."""
+        count = getattr(obj, 'num_updates', None)
+        if count is None:
+            count = obj.updates.count()
+        return count
+    
     def create(self, validated_data):
         """Create incident."""
         # Create the incident
@@ -73,13 +176,41 @@ class IncidentSerializer(serializers.ModelSerializer):
         return incident
     
     def update(self, instance, validated_data):
-        """Update incident."""
+        """
+        Update incident, writing only the changed columns.
+        
+        The write is conditioned on ``context['expected_version']`` (from
+        If-Match) when given; a status change goes through the status state
+        machine.
+        """
+        new_status = validated_data.pop('status', instance.status)
+        expected_version = self.context.get('expected_version')
+        
         # Update the incident
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
-        instance.save()
+        
+        changed = instance.get_changed_fields()
+        if new_status == instance.status:
+            save_incident(instance, None if changed is None else list(changed), expected_version)
+            return instance
+        
+        if changed is None:
+            changed = [f.name for f in instance._meta.concrete_fields if not f.primary_key]
+        request = self.context.get('request')
+        user = request.user if request and request.user.is_authenticated else None
+        transition_incident(instance, new_status, user=user, extra_fields=changed, expected_version=expected_version)
         return instance
     
+    def validate_status(self, value):
+        """Only allow moving to the next status of the incident flow."""
+        if self.instance is not None and value != self.instance.status:
+            try:
+                check_transition(self.instance.status, value)
+            except InvalidTransition as e:
+                raise serializers.ValidationError(str(e))
+        return value
+    
     def validate_started_at(self, value):
         """Validate started_at datetime."""
         if not value:
@@ -123,9 +254,11 @@ class IncidentSerializer(serializers.ModelSerializer):
         return data
 
 
-class IncidentListSerializer(serializers.ModelSerializer):
+class IncidentListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Simplified serializer for incident list views."""
     
+    column_dependencies = IncidentSerializer.column_dependencies
+    
     impacted_locations_display = serializers.ReadOnlyField(source='get_impacted_locations_display')
     impacted_parties_display = serializers.ReadOnlyField(source='get_impacted_parties_display')
     is_l5_high = serializers.ReadOnlyField()
@@ -134,7 +267,7 @@ class IncidentListSerializer(serializers.ModelSerializer):
         model = Incident
         fields = [
             'id', 'title', 'description', 'level', 'scope', 'incident_type', 'status',
-            'incident_commander', 'started_at', 'created_at', 'updated_at',
+            'duplicate_of', 'incident_commander', 'started_at', 'created_at', 'updated_at',
             'impacted_locations_display', 'impacted_parties_display',
             'is_l5_high'
         ]
@@ -0,0 +1,157 @@
+"""
+Signal handlers keeping derived incident data in sync.
+"""
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .board import BOARD_SOURCE_FIELDS, sync_board
+from .caching import invalidate_incidents
+from .config import registry as config_registry
+from .correlation import CORRELATION_SOURCE_FIELDS, sync_correlation_terms
+from .events import record_event
+from .metrics import METRIC_SOURCE_FIELDS, remove_metrics, sync_metrics
+from .models import Incident, IncidentDocument, IncidentUpdate
+from .serializers import IncidentListSerializer, IncidentUpdateSerializer
+from .tags import TAG_DIMENSIONS, sync_incident_tags
+
+
+@receiver(post_save, sender=Incident)
+def sync_tags_on_save(sender, instance, created, update_fields=None, raw=False, **kwargs):
+    """Mirror the JSON list fields into IncidentTag rows."""
+    if raw:
+        return
+    if update_fields is not None and not set(update_fields) & set(TAG_DIMENSIONS):
+        return
+    sync_incident_tags(instance, created=created)
+
+
+@receiver(post_save, sender=Incident)
+def sync_correlation_terms_on_save(sender, instance, created, raw=False, **kwargs):
+    """Index the title, description and impacted_* values for duplicate detection."""
+    if raw:
+        return
+    
+    # Runs before record_incident_events re-snapshots the loaded values
+    changed = instance.get_changed_fields()
+    if not created and changed is not None and not set(changed) & CORRELATION_SOURCE_FIELDS:
+        return
+    sync_correlation_terms(instance, created=created)
+
+
+@receiver(post_save, sender=Incident)
+def sync_metrics_on_save(sender, instance, created, raw=False, **kwargs):
+    """Materialize lifecycle durations when the status or a duration input changes."""
+    if raw:
+        return
+    
+    # Runs before record_incident_events re-snapshots the loaded values
+    changed = instance.get_changed_fields()
+    if created or changed is None:
+        sync_metrics([instance])
+        return
+    if not set(changed) & METRIC_SOURCE_FIELDS:
+        return
+    status_change = changed.get('status')
+    transitions = {instance.pk: status_change[1]} if status_change else None
+    sync_metrics([instance], transitions=transitions, transitioned_at=instance.updated_at)
+
+
+@receiver(post_save, sender=Incident)
+def sync_board_on_save(sender, instance, created, raw=False, **kwargs):
+    """Upsert the incident's active board row, or remove it once closed."""
+    if raw:
+        return
+    
+    # Runs before record_incident_events re-snapshots the loaded values
+    changed = instance.get_changed_fields()
+    if not created and changed is not None and not set(changed) & BOARD_SOURCE_FIELDS:
+        return
+    status_change = (changed or {}).get('status')
+    transitions = {instance.pk: status_change[1]} if status_change else None
+    sync_board([instance], transitions=transitions)
+
+
+@receiver(pre_delete, sender=Incident)
+def remove_metrics_on_delete(sender, instance, **kwargs):
+    """Subtract a deleted incident from the duration rollups."""
+    remove_metrics(instance.pk)
+
+
+@receiver(post_save, sender=Incident)
+def record_incident_events(sender, instance, created, raw=False, **kwargs):
+    """Append live feed events for incident creation, status changes and field edits."""
+    if raw:
+        return
+    
+    if created:
+        record_event(instance.pk, 'incident_created', IncidentListSerializer(instance).data)
+    else:
+        changed = instance.get_changed_fields()
+        if changed:
+            status_change = changed.pop('status', None)
+            if status_change:
+                record_event(instance.pk, 'status_changed', {
+                    'from': status_change[0], 'to': status_change[1],
+                    'updated_at': instance.updated_at,
+                })
+            changed.pop('updated_at', None)
+            changed.pop('version', None)
+            if changed:
+                record_event(instance.pk, 'incident_updated', {
+                    'fields': {name: new for name, (old, new) in changed.items()},
+                    'updated_at': instance.updated_at,
+                })
+    
+    instance.snapshot_loaded_values()
+
+
+@receiver(post_save, sender=IncidentUpdate)
+def record_update_events(sender, instance, created, raw=False, **kwargs):
+    """Append a live feed event when an update is posted or edited."""
+    if raw:
+        return
+    event_type = 'update_created' if created else 'update_edited'
+    record_event(instance.incident_id, event_type, {'update': IncidentUpdateSerializer(instance).data})
+
+
+@receiver(post_save, sender=IncidentDocument)
+@receiver(post_delete, sender=IncidentDocument)
+def touch_incident_on_document_change(sender, instance, raw=False, **kwargs):
+    """Bump the incident's updated_at so its conditional GET validators change."""
+    if raw:
+        return
+    Incident.objects.filter(pk=instance.incident_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Incident)
+@receiver(post_delete, sender=Incident)
+def invalidate_incident_cache(sender, instance, raw=False, **kwargs):
+    """Drop cached detail and list responses showing the incident."""
+    if raw:
+        return
+    invalidate_incidents([instance.pk])
+
+
+@receiver(post_save, sender=IncidentUpdate)
+@receiver(post_delete, sender=IncidentUpdate)
+def invalidate_update_cache(sender, instance, raw=False, **kwargs):
+    """Drop cached detail responses embedding the incident's updates."""
+    if raw:
+        return
+    invalidate_incidents([instance.incident_id], lists=False)
+
+
+@receiver(post_save, sender=IncidentDocument)
+@receiver(post_delete, sender=IncidentDocument)
+def invalidate_document_cache(sender, instance, raw=False, **kwargs):
+    """Drop cached responses of the incident; lists show its touched updated_at."""
+    if raw:
+        return
+    invalidate_incidents([instance.incident_id])
+
+
+@config_registry.subscribe
+def invalidate_cache_on_config_reload(snapshot):
+    """Drop cached list-shaped responses; statistics buckets follow the config."""
+    invalidate_incidents()
@@ -0,0 +1,506 @@
+"""
+Incremental columnar snapshots of incidents, updates and documents.
+
+Analytics should not run against the production database, so
+snapshot_incidents copies the rows changed since its previous run into local
+files. Every run appends new segments to a snapshot directory, reading the
+tables in (updated_at, id) order after the watermark stored in its manifest
+(documents have no updated_at and use their id). Segments are Arrow IPC or
+Parquet files when pyarrow is installed; otherwise each column is one raw
+file written with the array module: int64 integers and microsecond
+timestamps, int8 booleans, int32 codes into a per-segment dictionary for
+low-cardinality strings, and int64 offsets into a UTF-8 blob for text.
+
+open_snapshot() memory-maps the segments, so only the pages of the columns a
+query reads are loaded, and a row copied by several runs is seen once, in
+its latest version. Rows deleted from the database stay in the snapshot.
+
+    snapshot = open_snapshot('/var/lib/incident-snapshots')
+    incidents = snapshot.table('incidents')
+    incidents.count_by('reporting_org', 'level')
+"""
+import array
+import json
+import mmap
+import os
+import shutil
+import sys
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+
+from .models import Incident, IncidentDocument, IncidentUpdate
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+SNAPSHOT_FORMATS = ('arrow', 'parquet', 'columnar')
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+DEFAULT_SEGMENT_ROWS = 100000
+CHUNK_SIZE = 5000
+
+# Column kinds
+INT = 'int'
+DATETIME = 'datetime'
+BOOL = 'bool'
+CATEGORY = 'category'
+TEXT = 'text'
+LIST = 'list'
+
+# Table name -> (model, watermark field, [(column, kind)])
+SNAPSHOT_TABLES = {
+    'incidents': (Incident, 'updated_at', [
+        ('id', INT), ('title', TEXT), ('description', TEXT),
+        ('level', CATEGORY), ('scope', CATEGORY), ('status', CATEGORY),
+        ('safety_compliance', CATEGORY), ('security_privacy', CATEGORY),
+        ('data_quality', CATEGORY), ('psd2_impact', CATEGORY),
+        ('started_at', DATETIME), ('detected_at', DATETIME), ('time_format', CATEGORY),
+        ('detection_source', CATEGORY), ('incident_type', CATEGORY),
+        ('impacted_locations', LIST), ('impacted_parties', LIST),
+        ('impacted_assets', LIST), ('impacted_areas', LIST),
+        ('incident_commander', CATEGORY), ('reporting_org', CATEGORY),
+        ('estimated_time_to_mitigation', CATEGORY), ('first_detected_in', TEXT),
+        ('l5_confirmation', BOOL), ('mitigation_policy_acknowledgment', BOOL),
+        ('duplicate_of_id', INT), ('version', INT),
+        ('created_at', DATETIME), ('updated_at', DATETIME), ('created_by_id', INT),
+    ]),
+    'updates': (IncidentUpdate, 'updated_at', [
+        ('id', INT), ('incident_id', INT), ('content', TEXT), ('author', CATEGORY),
+        ('update_type', CATEGORY), ('created_at', DATETIME), ('updated_at', DATETIME),
+        ('created_by_id', INT),
+    ]),
+    'documents': (IncidentDocument, 'id', [
+        ('id', INT), ('incident_id', INT), ('title', TEXT), ('url', TEXT), ('created_at', DATETIME),
+    ]),
+}
+
+INT_NULL = -2 ** 63
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Raw column files: kind -> [(file suffix, array typecode)]
+COLUMNAR_FILES = {
+    INT: [('i64', 'q')],
+    DATETIME: [('i64', 'q')],
+    BOOL: [('i8', 'b')],
+    CATEGORY: [('i32', 'i')],
+    TEXT: [('off', 'q'), ('utf8', 'B')],
+    LIST: [('off', 'q'), ('utf8', 'B')],
+}
+NUMPY_TYPES = {'q': 'i8', 'b': 'i1', 'i': 'i4', 'B': 'u1'}
+
+
+class SnapshotError(ValueError):
+    """Raised when a snapshot cannot be written or read."""
+
+
+def available_formats():
+    """Return the snapshot formats the installed libraries can write."""
+    return SNAPSHOT_FORMATS if pyarrow is not None else ('columnar',)
+
+
+def default_format():
+    """Return the preferred snapshot format: Arrow when pyarrow is installed."""
+    return available_formats()[0]
+
+
+def _micros(value):
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - EPOCH) // timedelta(microseconds=1)
+
+
+def _list_value(value):
+    if value is None:
+        return None
+    if not isinstance(value, (list, tuple)):
+        value = [value]
+    return [str(item) for item in value]
+
+
+def read_manifest(path):
+    """Return the manifest of the snapshot at path, or None if there is none yet."""
+    try:
+        with open(os.path.join(path, MANIFEST_NAME)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise SnapshotError(f'Unsupported snapshot version: {manifest.get("version")}')
+    return manifest
+
+
+def _save_manifest(path, manifest):
+    temporary = os.path.join(path, MANIFEST_NAME + '.tmp')
+    with open(temporary, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temporary, os.path.join(path, MANIFEST_NAME))
+
+
+def _changed_rows(model, watermark_field, fields, watermark, until):
+    """
+    Yield chunks of value tuples after the (watermark value, id) pair.
+
+    Rows are read in (watermark field, id) order with keyset chunks, so each
+    query is a range scan of the watermark index.
+    """
+    queryset = model.objects.order_by(watermark_field, 'id')
+    if until is not None:
+        queryset = queryset.filter(**{f'{watermark_field}__lte': until})
+    value_index, id_index = fields.index(watermark_field), fields.index('id')
+    while True:
+        chunk_queryset = queryset
+        if watermark is not None:
+            value, pk = watermark
+            chunk_queryset = queryset.filter(
+                Q(**{f'{watermark_field}__gt': value}) | Q(**{watermark_field: value, 'id__gt': pk})
+            )
+        chunk = list(chunk_queryset.values_list(*fields)[:CHUNK_SIZE])
+        if not chunk:
+            return
+        yield chunk
+        watermark = (chunk[-1][value_index], chunk[-1][id_index])
+
+
+def _segments(chunks, segment_rows):
+    """Regroup row chunks into lists of at most segment_rows rows."""
+    pending = []
+    for chunk in chunks:
+        pending.extend(chunk)
+        while len(pending) >= segment_rows:
+            yield pending[:segment_rows]
+            pending = pending[segment_rows:]
+    if pending:
+        yield pending
+
+
+def _write_arrow(target, fmt, columns, rows):
+    arrow_types = {
+        INT: pyarrow.int64(), DATETIME: pyarrow.timestamp('us', tz='UTC'), BOOL: pyarrow.bool_(),
+        CATEGORY: pyarrow.string(), TEXT: pyarrow.string(), LIST: pyarrow.list_(pyarrow.string()),
+    }
+    arrays = []
+    for index, (name, kind) in enumerate(columns):
+        values = [row[index] for row in rows]
+        if kind == LIST:
+            values = [_list_value(value) for value in values]
+        column = pyarrow.array(values, type=arrow_types[kind])
+        arrays.append(column.dictionary_encode() if kind == CATEGORY else column)
+    table = pyarrow.Table.from_arrays(arrays, names=[name for name, _ in columns])
+
+    if fmt == 'parquet':
+        pyarrow.parquet.write_table(table, target)
+        return
+    with pyarrow.OSFile(target, 'wb') as sink:
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _write_columnar(target, columns, rows):
+    os.makedirs(target)
+    dictionaries = {}
+    for index, (name, kind) in enumerate(columns):
+        values = (row[index] for row in rows)
+        if kind == INT:
+            files = [array.array('q', (INT_NULL if v is None else v for v in values))]
+        elif kind == DATETIME:
+            files = [array.array('q', (INT_NULL if v is None else _micros(v) for v in values))]
+        elif kind == BOOL:
+            files = [array.array('b', (-1 if v is None else int(v) for v in values))]
+        elif kind == CATEGORY:
+            dictionary = {}
+            files = [array.array('i', (-1 if v is None else dictionary.setdefault(v, len(dictionary)) for v in values))]
+            dictionaries[name] = list(dictionary)
+        else:
+            offsets = array.array('q', [0])
+            blob = bytearray()
+            for value in values:
+                if kind == LIST:
+                    value = json.dumps(_list_value(value))
+                blob += (value or '').encode()
+                offsets.append(len(blob))
+            files = [offsets, blob]
+
+        for (suffix, _), data in zip(COLUMNAR_FILES[kind], files):
+            with open(os.path.join(target, f'{name}.{suffix}'), 'wb') as f:
+                f.write(data)
+
+    with open(os.path.join(target, 'meta.json'), 'w') as f:
+        json.dump({'rows': len(rows), 'byteorder': sys.byteorder, 'dictionaries': dictionaries}, f)
+
+
+def _segment_name(fmt, number):
+    return f'{number:06d}' if fmt == 'columnar' else f'{number:06d}.{fmt}'
+
+
+def _write_segment(table_path, fmt, number, columns, rows):
+    """Write one segment under a temporary name and move it into place."""
+    target = os.path.join(table_path, _segment_name(fmt, number))
+    temporary = target + '.tmp'
+    for leftover in (target, temporary):
+        if os.path.isdir(leftover):
+            shutil.rmtree(leftover)
+        elif os.path.exists(leftover):
+            os.remove(leftover)
+
+    if fmt == 'columnar':
+        _write_columnar(temporary, columns, rows)
+    else:
+        _write_arrow(temporary, fmt, columns, rows)
+    os.replace(temporary, target)
+    return os.path.basename(target)
+
+
+def write_snapshot(path, fmt=None, tables=None, segment_rows=DEFAULT_SEGMENT_ROWS, lag=timedelta(seconds=5)):
+    """
+    Append the rows changed since the last run to the snapshot at path.
+
+    Args:
+        path: Snapshot directory, created on the first run
+        fmt: One of SNAPSHOT_FORMATS (default: the format of the existing
+            snapshot, else default_format())
+        tables: Names from SNAPSHOT_TABLES to copy (default: all)
+        segment_rows: Maximum number of rows per segment
+        lag: Rows changed in the last ``lag`` are left for the next run, so
+            transactions still committing with an earlier updated_at are not
+            skipped by the watermark
+
+    Returns:
+        dict mapping table name to (rows written, segments written)
+
+    Raises:
+        SnapshotError: If the format is unavailable or does not match the
+            existing snapshot, or the snapshot was written with other columns
+    """
+    manifest = read_manifest(path)
+    if manifest is None:
+        manifest = {'version': MANIFEST_VERSION, 'format': fmt or default_format(), 'tables': {}}
+    elif fmt and fmt != manifest['format']:
+        raise SnapshotError(f'The snapshot at {path} is in {manifest["format"]} format, not {fmt}')
+    fmt = manifest['format']
+    if fmt not in available_formats():
+        raise SnapshotError(f'The {fmt} format requires pyarrow')
+
+    os.makedirs(path, exist_ok=True)
+    until = datetime.now(timezone.utc) - lag
+    results = {}
+    for name in tables or SNAPSHOT_TABLES:
+        model, watermark_field, columns = SNAPSHOT_TABLES[name]
+        state = manifest['tables'].setdefault(name, {
+            'columns': [list(column) for column in columns], 'watermark': None, 'segments': [],
+        })
+        if [tuple(column) for column in state['columns']] != columns:
+            raise SnapshotError(f'The {name} columns changed since the snapshot was started; write a new snapshot')
+
+        table_path = os.path.join(path, name)
+        os.makedirs(table_path, exist_ok=True)
+        datetime_watermark = dict(columns)[watermark_field] == DATETIME
+        watermark = state['watermark']
+        if watermark is not None and datetime_watermark:
+            watermark = (datetime.fromisoformat(watermark[0]), watermark[1])
+
+        fields = [field for field, _ in columns]
+        value_index, id_index = fields.index(watermark_field), fields.index('id')
+        chunks = _changed_rows(model, watermark_field, fields, watermark, until if datetime_watermark else None)
+        rows_written = segments_written = 0
+        for rows in _segments(chunks, segment_rows):
+            segment = _write_segment(table_path, fmt, len(state['segments']) + 1, columns, rows)
+            last_value, last_id = rows[-1][value_index], rows[-1][id_index]
+            state['segments'].append({'name': segment, 'rows': len(rows)})
+            state['watermark'] = [last_value.isoformat() if datetime_watermark else last_value, last_id]
+            # Saved per segment, so an interrupted run resumes after the last complete one
+            _save_manifest(path, manifest)
+            rows_written += len(rows)
+            segments_written += 1
+        results[name] = (rows_written, segments_written)
+
+    _save_manifest(path, manifest)
+    return results
+
+
+def _map_file(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class ColumnarSegment:
+    """A raw columnar segment whose column files are memory-mapped on first use."""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        self.num_rows = meta['rows']
+        self.byteorder = meta['byteorder']
+        self.dictionaries = meta['dictionaries']
+        self._maps = {}
+
+    def _buffer(self, name, suffix):
+        key = f'{name}.{suffix}'
+        if key not in self._maps:
+            self._maps[key] = _map_file(os.path.join(self.path, key))
+        return self._maps[key]
+
+    def _typed(self, name, suffix, typecode):
+        buffer = self._buffer(name, suffix)
+        if numpy is not None:
+            byteorder = '<' if self.byteorder == 'little' else '>'
+            return numpy.frombuffer(buffer, dtype=byteorder + NUMPY_TYPES[typecode])
+        if self.byteorder != sys.byteorder:
+            swapped = array.array(typecode, bytes(buffer))
+            swapped.byteswap()
+            return memoryview(swapped)
+        return memoryview(buffer).cast(typecode)
+
+    def array(self, name):
+        """
+        Return the stored array of a column without decoding it.
+
+        NumPy arrays (memoryviews without NumPy) over the mapped file: int64
+        values or microseconds since the epoch with INT_NULL for nulls, int8
+        booleans, int32 dictionary codes, or (offsets, UTF-8 blob) for text.
+        """
+        kind = self.columns[name]
+        (suffix, typecode), *blob = COLUMNAR_FILES[kind]
+        values = self._typed(name, suffix, typecode)
+        if blob:
+            return values, self._buffer(name, blob[0][0])
+        return values
+
+    def column(self, name):
+        """Return the decoded values of a column as a list."""
+        kind = self.columns[name]
+        stored = self.array(name)
+        if kind in (TEXT, LIST):
+            offsets, blob = stored
+            offsets = offsets.tolist()
+            texts = [bytes(blob[offsets[i]:offsets[i + 1]]).decode() for i in range(self.num_rows)]
+            return [json.loads(text) for text in texts] if kind == LIST else texts
+
+        values = stored.tolist()
+        if kind == INT:
+            return [None if value == INT_NULL else value for value in values]
+        if kind == DATETIME:
+            return [None if value == INT_NULL else EPOCH + timedelta(microseconds=value) for value in values]
+        if kind == BOOL:
+            return [None if value < 0 else bool(value) for value in values]
+        dictionary = self.dictionaries[name]
+        return [None if code < 0 else dictionary[code] for code in values]
+
+
+class ArrowSegment:
+    """An Arrow IPC or Parquet segment read through a memory map."""
+
+    def __init__(self, path, fmt):
+        if fmt == 'parquet':
+            self.table = pyarrow.parquet.read_table(path, memory_map=True)
+        else:
+            self.table = pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+        self.num_rows = self.table.num_rows
+
+    def array(self, name):
+        """Return the pyarrow ChunkedArray of a column."""
+        return self.table.column(name)
+
+    def column(self, name):
+        """Return the decoded values of a column as a list."""
+        return self.table.column(name).to_pylist()
+
+
+class SnapshotTable:
+    """
+    The rows of one snapshot table, in their latest copied version.
+
+    Segments stay memory-mapped; columns are decoded on request.
+    """
+
+    def __init__(self, path, fmt, state):
+        self.columns = dict(state['columns'])
+        self.segments = []
+        for segment in state['segments']:
+            segment_path = os.path.join(path, segment['name'])
+            if fmt == 'columnar':
+                self.segments.append(ColumnarSegment(segment_path, self.columns))
+            else:
+                self.segments.append(ArrowSegment(segment_path, fmt))
+
+        # Later segments hold newer versions of a row; None keeps every row
+        seen = set()
+        live = []
+        for segment in reversed(self.segments):
+            ids = segment.column('id')
+            keep = [index for index, pk in enumerate(ids) if pk not in seen]
+            seen.update(ids)
+            live.append(None if len(keep) == len(ids) else keep)
+        self._live = live[::-1]
+        self.num_rows = len(seen)
+
+    def column(self, name):
+        """Return the decoded values of a column for every live row."""
+        if name not in self.columns:
+            raise SnapshotError(f'Unknown column: {name}')
+        values = []
+        for segment, keep in zip(self.segments, self._live):
+            data = segment.column(name)
+            values.extend(data if keep is None else [data[index] for index in keep])
+        return values
+
+    def rows(self, *columns):
+        """Yield the live rows as dicts of the given columns (default: all)."""
+        columns = columns or tuple(self.columns)
+        for values in zip(*(self.column(name) for name in columns)):
+            yield dict(zip(columns, values))
+
+    def count_by(self, *columns):
+        """Count live rows per value of one column, or per tuple of values of several."""
+        if len(columns) == 1:
+            return Counter(self.column(columns[0]))
+        return Counter(zip(*(self.column(name) for name in columns)))
+
+
+class Snapshot:
+    """A snapshot directory opened for reading."""
+
+    def __init__(self, path):
+        manifest = read_manifest(path)
+        if manifest is None:
+            raise SnapshotError(f'No snapshot found at {path}')
+        if manifest['format'] != 'columnar' and pyarrow is None:
+            raise SnapshotError(f'Reading {manifest["format"]} snapshots requires pyarrow')
+        self.path = path
+        self.format = manifest['format']
+        self.manifest = manifest
+        self._tables = {}
+
+    @property
+    def tables(self):
+        return list(self.manifest['tables'])
+
+    def table(self, name):
+        """Return the SnapshotTable of a table name from SNAPSHOT_TABLES."""
+        if name not in self.manifest['tables']:
+            raise SnapshotError(f'The snapshot has no {name} table')
+        if name not in self._tables:
+            self._tables[name] = SnapshotTable(
+                os.path.join(self.path, name), self.format, self.manifest['tables'][name]
+            )
+        return self._tables[name]
+
+
+def open_snapshot(path):
+    """Open the snapshot at path for memory-mapped reads."""
+    return Snapshot(path)
@@ -0,0 +1,138 @@
+"""
+Aggregation engine for incident statistics.
+
+All buckets are computed from a single grouped query over the filtered
+queryset and folded in Python, so the number of SQL queries does not grow
+with the number of levels, scopes, statuses or extra dimensions.
+"""
+from collections import Counter
+
+from django.db.models import Count
+
+from .config import get_values_for_field
+
+# Response key -> (model field, shared config key) for the fixed buckets
+STATISTICS_BUCKETS = {
+    'by_level': ('level', 'levels'),
+    'by_scope': ('scope', 'scopes'),
+    'by_status': ('status', 'statuses'),
+}
+
+# Optional group-by dimensions -> shared config key (None for free-form values)
+STATISTICS_DIMENSIONS = {
+    'reporting_org': None,
+    'incident_type': 'types',
+    'detection_source': 'detectionSources',
+}
+
+
+def parse_dimensions(values):
+    """
+    Parse requested group-by dimensions from query parameter values.
+
+    Args:
+        values: List of raw values, each possibly comma separated
+
+    Returns:
+        List of dimension names in request order, without duplicates
+
+    Raises:
+        ValueError: If an unsupported dimension is requested
+    """
+    dimensions = []
+    for value in values:
+        for dimension in (v.strip() for v in value.split(',')):
+            if not dimension or dimension in dimensions:
+                continue
+            if dimension not in STATISTICS_DIMENSIONS:
+                raise ValueError(f"Unsupported group_by dimension: {dimension}")
+            dimensions.append(dimension)
+    return dimensions
+
+
+def exclude_duplicates(queryset, params):
+    """
+    Leave incidents linked as duplicates out of a queryset.
+
+    Args:
+        queryset: Incident queryset
+        params: Query parameters; ``include_duplicates=true`` keeps them
+
+    Returns:
+        Filtered queryset
+    """
+    if params.get('include_duplicates', '').lower() in ('1', 'true', 'yes'):
+        return queryset
+    return queryset.filter(duplicate_of__isnull=True)
+
+
+def _empty_buckets(config_key):
+    """Return a zero-filled bucket dict for the values of a config field."""
+    return {value: 0 for value in get_values_for_field(config_key)}
+
+
+def compute_statistics(queryset, dimensions=()):
+    """
+    Compute incident statistics in one grouped query.
+
+    Args:
+        queryset: Filtered Incident queryset
+        dimensions: Optional extra group-by dimensions from STATISTICS_DIMENSIONS
+
+    Returns:
+        dict with total_incidents, by_level, by_scope, by_status,
+        l5_high_incidents, critical_incidents and one by_<dimension>
+        entry per requested dimension
+    """
+    return summarize_statistics(statistics_rows(queryset, dimensions), dimensions)
+
+
+async def acompute_statistics(queryset, dimensions=()):
+    """Async variant of compute_statistics."""
+    rows = [row async for row in statistics_rows(queryset, dimensions)]
+    return summarize_statistics(rows, dimensions)
+
+
+def statistics_rows(queryset, dimensions):
+    """Return the grouped count query behind the statistics."""
+    group_fields = [field for field, _ in STATISTICS_BUCKETS.values()]
+    group_fields += [d for d in dimensions if d not in group_fields]
+
+    # Clear ordering so it does not leak into the GROUP BY clause
+    return queryset.order_by().values(*group_fields).annotate(count=Count('id'))
+
+
+def summarize_statistics(rows, dimensions):
+    """Fold grouped count rows into the statistics response."""
+    buckets = {key: _empty_buckets(config_key) for key, (_, config_key) in STATISTICS_BUCKETS.items()}
+    dimension_counts = {dimension: Counter() for dimension in dimensions}
+    total = l5_high = critical = 0
+
+    for row in rows:
+        count = row['count']
+        total += count
+
+        for key, (field, _) in STATISTICS_BUCKETS.items():
+            if row[field] in buckets[key]:
+                buckets[key][row[field]] += count
+
+        for dimension in dimensions:
+            dimension_counts[dimension][row[dimension]] += count
+
+        if row['level'] == 'L5' and row['scope'] in ('Medium', 'High'):
+            critical += count
+            if row['scope'] == 'High':
+                l5_high += count
+
+    stats = {'total_incidents': total}
+    stats.update(buckets)
+    stats['l5_high_incidents'] = l5_high
+    stats['critical_incidents'] = critical
+
+    for dimension in dimensions:
+        config_key = STATISTICS_DIMENSIONS[dimension]
+        by_dimension = _empty_buckets(config_key) if config_key else {}
+        by_dimension.update(dimension_counts[dimension])
+        stats[f'by_{dimension}'] = by_dimension
+
+    return stats
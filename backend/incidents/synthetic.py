@@ -0,0 +1,154 @@
+"""
+Synthetic incident data for benchmarks.
+
+Choice values come from shared-config.json with skewed weights (most
+incidents are low level and low scope, few are L5/High). Each incident gets a
+realistic lifecycle: detection shortly after the start, then transitions
+through the status flow with exponentially distributed delays that shrink
+with severity, stopping at the first transition that would lie in the
+future. Updates are spread over that lifecycle, more of them for severe
+incidents.
+"""
+from datetime import timedelta
+
+from .config import get_values_for_field
+from .models import Incident, IncidentStatusTransition, IncidentUpdate
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def config_values(name):
+    """Return the non-empty values of a shared config field, as currently loaded."""
+    return [value for value in get_values_for_field(name) if value]
+
+
+# Relative frequency of each value, in config order (missing values weigh 1)
+LEVEL_WEIGHTS = [40, 30, 20, 10]
+SCOPE_WEIGHTS = [60, 30, 10]
+TYPE_WEIGHTS = [20, 60, 15, 5]
+IMPACT_WEIGHTS = [10, 75, 15]
+
+# Mean delay (hours) of each transition for L2..L5, shortest for L5
+TRANSITION_MEAN_HOURS = {
+    'mitigating': [4, 2, 1, 0.5],
+    'resolved': [8, 6, 4, 2],
+    'postmortem': [96, 96, 72, 48],
+    'closed': [72, 72, 48, 48],
+}
+UPDATES_MEAN = [2, 3, 5, 10]
+
+SYMPTOMS = [
+    'elevated error rates', 'high latency', 'partial outage', 'degraded throughput',
+    'failed deployments', 'stale data', 'timeouts', 'replication lag', 'certificate expiry',
+]
+UPDATE_TEMPLATES = [
+    ('update', 'Investigating {symptom} on {asset}; {party} affected in {location}.'),
+    ('update', 'Error rates on {asset} are stable, continuing to monitor.'),
+    ('note', 'Paged the {area} on-call, bridge is open.'),
+    ('mitigation', 'Rolled back the latest {asset} change, {symptom} decreasing.'),
+    ('mitigation', 'Failed over {area} traffic away from {location}.'),
+    ('resolution', '{symptom} resolved on {asset}, all metrics back to baseline.'),
+]
+
+
+def _weighted(rng, values, weights):
+    return rng.choices(values, weights=(weights + [1] * len(values))[:len(values)])[0]
+
+
+def _sample(rng, values, low, high):
+    return rng.sample(values, rng.randint(low, min(high, len(values))))
+
+
+def _weights_index(level, levels):
+    return levels.index(level) if level in levels else 0
+
+
+def build_synthetic_incident(rng, now, days):
+    """
+    Build one unsaved incident with its updates and status transitions.
+
+    Args:
+        rng: random.Random instance
+        now: Reference time; nothing is generated after it
+        days: Incidents start uniformly within this many days before now
+
+    Returns:
+        tuple: (Incident, list of IncidentUpdate, list of IncidentStatusTransition);
+        children are not yet linked to the incident
+    """
+    levels = config_values('levels')
+    commanders = config_values('incidentCommanders')
+    impact_values = config_values('impactOptions')
+    level = _weighted(rng, levels, LEVEL_WEIGHTS)
+    scope = _weighted(rng, config_values('scopes'), SCOPE_WEIGHTS)
+    severity = _weights_index(level, levels)
+    locations = _sample(rng, config_values('impactedLocations'), 1, 3)
+    parties = _sample(rng, config_values('impactedParties'), 1, 3)
+    assets = _sample(rng, config_values('impactedAssetsOptions'), 0, 3)
+    areas = _sample(rng, config_values('impactedAreasOptions'), 0, 2)
+    detection_source = _weighted(rng, config_values('detectionSources'), [30, 70])
+    symptom = rng.choice(SYMPTOMS)
+    asset = assets[0] if assets else 'Application'
+
+    started_at = now - timedelta(seconds=rng.uniform(0, days * 86400))
+    detect_minutes = 5 if detection_source == 'Automated' else 30
+    detected_at = min(now, started_at + timedelta(minutes=rng.expovariate(1 / detect_minutes)))
+
+    statuses = get_values_for_field('statuses')
+    status = statuses[0]
+    transitions = []
+    at = detected_at
+    for to_status in statuses[1:]:
+        at = at + timedelta(hours=rng.expovariate(1 / TRANSITION_MEAN_HOURS[to_status][severity]))
+        if at > now:
+            break
+        transitions.append(IncidentStatusTransition(from_status=status, to_status=to_status, transitioned_at=at))
+        status = to_status
+    last_change = transitions[-1].transitioned_at if transitions else detected_at
+
+    incident = Incident(
+        title=f'{asset} {symptom} in {locations[0]}',
+        description=(
+            f'{", ".join(parties)} are seeing {symptom} caused by {asset}. '
+            f'Impacted areas: {", ".join(areas) or "unknown"}.'
+        ),
+        level=level,
+        scope=scope,
+        safety_compliance=_weighted(rng, impact_values, IMPACT_WEIGHTS),
+        security_privacy=_weighted(rng, impact_values, IMPACT_WEIGHTS),
+        data_quality=_weighted(rng, impact_values, IMPACT_WEIGHTS),
+        psd2_impact=_weighted(rng, impact_values, IMPACT_WEIGHTS),
+        started_at=started_at,
+        detected_at=detected_at,
+        time_format=rng.choice(config_values('timeFormats')),
+        detection_source=detection_source,
+        incident_type=_weighted(rng, config_values('types'), TYPE_WEIGHTS),
+        impacted_locations=locations,
+        impacted_parties=parties,
+        impacted_assets=assets,
+        impacted_areas=areas,
+        incident_commander=rng.choice(commanders),
+        reporting_org=rng.choice(config_values('reportingOrganizations')),
+        estimated_time_to_mitigation=rng.choice(config_values('timeToMitigationOptions')),
+        first_detected_in=rng.choice(config_values('detectionLocationOptions')),
+        l5_confirmation=level == 'L5',
+        mitigation_policy_acknowledgment=rng.random() < 0.5,
+        send_email_notifications=False,
+        status=status,
+        created_at=detected_at,
+    )
+
+    updates = []
+    span = max(1.0, (last_change - detected_at).total_seconds())
+    for _ in range(min(50, int(rng.expovariate(1 / UPDATES_MEAN[severity])) + 1)):
+        update_type, template = rng.choice(UPDATE_TEMPLATES)
+        updates.append(IncidentUpdate(
+            content=template.format(
+                symptom=symptom, asset=asset, party=parties[0], location=locations[0],
+                area=areas[0] if areas else 'platform',
+            ),
+            author=rng.choice(commanders),
+            update_type=update_type,
+            created_at=detected_at + timedelta(seconds=rng.uniform(0, span)),
+        ))
+    return incident, updates, transitions
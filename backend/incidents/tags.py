@@ -0,0 +1,119 @@
+"""
+Tag index for the incident JSON list fields.
+
+Each value of impacted_locations, impacted_parties, impacted_assets and
+impacted_areas is mirrored into an IncidentTag row so filters can run as
+indexed semi-joins with OR semantics across the requested values.
+"""
+from django.db import transaction
+
+from .models import IncidentTag
+
+TAG_DIMENSIONS = [dimension for dimension, _ in IncidentTag.DIMENSION_CHOICES]
+TAG_VALUE_MAX_LENGTH = IncidentTag._meta.get_field('value').max_length
+
+
+def normalize_tag_values(raw):
+    """
+    Normalize a JSON list field value into a set of tag values.
+    
+    Args:
+        raw: Stored field value, normally a list of strings
+        
+    Returns:
+        Set of non-empty, stripped and length-limited strings
+    """
+    if not raw:
+        return set()
+    if not isinstance(raw, (list, tuple)):
+        raw = [raw]
+    values = set()
+    for item in raw:
+        value = str(item).strip()[:TAG_VALUE_MAX_LENGTH]
+        if value:
+            values.add(value)
+    return values
+
+
+def tags_for_incident(incident):
+    """Return the set of (dimension, value) pairs an incident should be tagged with."""
+    return {
+        (dimension, value)
+        for dimension in TAG_DIMENSIONS
+        for value in normalize_tag_values(getattr(incident, dimension))
+    }
+
+
+def sync_incident_tags(incident, created=False):
+    """
+    Bring the tag rows of an incident in line with its JSON list fields.
+    
+    Args:
+        incident: Saved Incident instance
+        created: True when the incident was just inserted and has no tags yet
+    """
+    wanted = tags_for_incident(incident)
+    
+    with transaction.atomic():
+        if created:
+            existing = set()
+        else:
+            existing = set(
+                IncidentTag.objects.filter(incident_id=incident.pk)
+                .values_list('dimension', 'value')
+            )
+        
+        stale = existing - wanted
+        for dimension in {dimension for dimension, _ in stale}:
+            IncidentTag.objects.filter(
+                incident_id=incident.pk, dimension=dimension,
+                value__in=[value for d, value in stale if d == dimension]
+            ).delete()
+        
+        missing = wanted - existing
+        if missing:
+            IncidentTag.objects.bulk_create([
+                IncidentTag(incident_id=incident.pk, dimension=dimension, value=value)
+                for dimension, value in missing
+            ])
+
+
+def rebuild_tags(incidents):
+    """
+    Replace the tag rows for a batch of incidents.
+    
+    Used by the backfill command and by bulk write paths that bypass signals.
+    
+    Args:
+        incidents: Iterable of saved Incident instances with the list fields loaded
+    """
+    incidents = list(incidents)
+    if not incidents:
+        return
+    
+    with transaction.atomic():
+        IncidentTag.objects.filter(incident_id__in=[i.pk for i in incidents]).delete()
+        IncidentTag.objects.bulk_create([
+            IncidentTag(incident_id=incident.pk, dimension=dimension, value=value)
+            for incident in incidents
+            for dimension, value in tags_for_incident(incident)
+        ])
+
+
+def filter_by_tags(queryset, dimension, values):
+    """
+    Restrict an Incident queryset to rows tagged with any of the given values.
+    
+    Args:
+        queryset: Incident queryset
+        dimension: One of TAG_DIMENSIONS
+        values: Iterable of raw filter values (OR semantics)
+        
+    Returns:
+        Filtered queryset using an ``id IN (SELECT incident_id ...)`` semi-join
+    """
+    values = normalize_tag_values(list(values))
+    if not values:
+        return queryset
+    tagged = IncidentTag.objects.filter(dimension=dimension, value__in=values).values('incident_id')
+    return queryset.filter(id__in=tagged)
@@ -0,0 +1,817 @@
+"""
+Tests for the incidents app.
+"""
+import tempfile
+import threading
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from .bulk import BULK_BATCH_SIZE, bulk_transition_incidents, bulk_update_incidents, insert_incidents
+from .caching import INCIDENT_GENERATION_KEY, LIST_GENERATION_KEY, invalidate_incidents
+from .concurrency import VersionConflict, parse_if_match, save_incident
+from .config import ConfigSnapshot, SharedConfigMiddleware, registry as config_registry, shared_config
+from .correlation import DuplicateLinkError, find_duplicate_candidates, mark_duplicate, unmark_duplicate
+from .importer import ImportRecordError, build_incident, import_batch
+from .instrumentation import timed_representation
+from .models import (
+    ActiveIncident, ImportCheckpoint, Incident, IncidentMetrics, IncidentMetricsRollup, IncidentTag, IncidentUpdate
+)
+from .search import SQLiteSearchBackend, SearchBackend, get_search_backend, search_incidents
+from .serializers import IncidentSerializer
+from .snapshot import SnapshotError, available_formats, open_snapshot, write_snapshot
+from .board import rebuild_board
+from .transitions import next_status, transition_incident, transition_incidents
+from .views import IncidentViewSet
+
+
+def create_incident(**fields):
+    now = timezone.now()
+    values = {
+        'title': 'Checkout errors', 'description': 'Payments fail', 'level': 'L4', 'scope': 'Low',
+        'status': 'reported', 'started_at': now, 'detected_at': now,
+        'incident_commander': 'ic@example.com', 'reporting_org': 'Engineering / Backend Services',
+    }
+    values.update(fields)
+    return Incident.objects.create(**values)
+
+
+class ParseIfMatchTests(TestCase):
+    def parse(self, value):
+        return parse_if_match(RequestFactory().patch('/', HTTP_IF_MATCH=value))
+
+    def test_version_forms(self):
+        self.assertEqual(self.parse('3'), 3)
+        self.assertEqual(self.parse('"3"'), 3)
+        self.assertEqual(self.parse('W/"3"'), 3)
+
+    def test_detail_etag(self):
+        self.assertEqual(self.parse('W/"3.0cc175b9c0f1b6a831c399e269772661"'), 3)
+
+    def test_unconditional(self):
+        self.assertIsNone(self.parse('*'))
+        self.assertIsNone(parse_if_match(RequestFactory().patch('/')))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            self.parse('W/"0cc175b9c0f1b6a831c399e269772661"')
+
+
+class IncidentConcurrencyTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        self.incident = create_incident()
+        self.url = f'/api/v1/incidents/{self.incident.pk}/'
+
+    def detail_etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['ETag']
+
+    def test_detail_etag_carries_version(self):
+        etag = self.detail_etag()
+        self.assertTrue(etag.startswith(f'W/"{self.incident.version}.'))
+
+    def test_patch_with_detail_etag(self):
+        response = self.client.patch(self.url, {'title': 'Checkout down'}, format='json', HTTP_IF_MATCH=self.detail_etag())
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['version'], self.incident.version + 1)
+
+    def test_patch_with_stale_etag_returns_412(self):
+        etag = self.detail_etag()
+        self.client.patch(self.url, {'title': 'Checkout down'}, format='json', HTTP_IF_MATCH=etag)
+
+        response = self.client.patch(self.url, {'title': 'Checkout degraded'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(response.data['version'], self.incident.version + 1)
+        self.assertEqual(Incident.objects.get(pk=self.incident.pk).title, 'Checkout down')
+
+    def test_patch_with_invalid_if_match_returns_400(self):
+        response = self.client.patch(self.url, {'title': 'Checkout down'}, format='json', HTTP_IF_MATCH='"abc"')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_update_status_with_stale_version_returns_412(self):
+        Incident.objects.filter(pk=self.incident.pk).update(version=self.incident.version + 1)
+
+        response = self.client.post(
+            f'{self.url}update_status/', {'status': 'mitigating'}, format='json',
+            HTTP_IF_MATCH=f'"{self.incident.version}"'
+        )
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.assertEqual(Incident.objects.get(pk=self.incident.pk).status, 'reported')
+
+    def test_racing_status_change_returns_409(self):
+        stale = Incident.objects.get(pk=self.incident.pk)
+        Incident.objects.filter(pk=self.incident.pk).update(status='mitigating')
+
+        with mock.patch.object(IncidentViewSet, 'get_object', return_value=stale):
+            response = self.client.post(f'{self.url}update_status/', {'status': 'mitigating'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(Incident.objects.get(pk=self.incident.pk).version, self.incident.version)
+
+
+
+class KeysetPaginationTests(APITestCase):
+    url = '/api/v1/incidents/'
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user('operator'))
+
+    def create_incidents(self, count, **fields):
+        incidents = [create_incident(title=f'Incident {index}', **fields) for index in range(count)]
+        return [incident.pk for incident in incidents]
+
+    def walk(self, url, link='next'):
+        """Follow the link until it runs out; return the pages and the last response."""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([item['id'] for item in response.data['results']])
+            url = response.data[link]
+        return pages, response.data
+
+    def test_ties_on_ordering_value_page_without_gaps_or_repeats(self):
+        ids = self.create_incidents(7)
+        Incident.objects.update(created_at=timezone.now())
+        newest_first = ids[::-1]
+
+        pages, last = self.walk(f'{self.url}?pagination=cursor&page_size=3')
+        self.assertEqual(pages, [newest_first[:3], newest_first[3:6], newest_first[6:]])
+
+        pages, first = self.walk(last['previous'], link='previous')
+        self.assertEqual(pages, [newest_first[3:6], newest_first[:3]])
+        self.assertIsNone(first['previous'])
+
+    def test_ties_on_secondary_ordering_field(self):
+        low = self.create_incidents(2, level='L2')
+        high = self.create_incidents(3, level='L3')
+
+        pages, _ = self.walk(f'{self.url}?pagination=cursor&page_size=2&ordering=level')
+        self.assertEqual(pages, [low, high[:2], high[2:]])
+
+    def test_last_full_page_has_no_next_link(self):
+        ids = self.create_incidents(4)
+
+        pages, last = self.walk(f'{self.url}?pagination=cursor&page_size=2')
+        self.assertEqual(pages, [ids[:1:-1], ids[1::-1]])
+        self.assertIsNotNone(last['previous'])
+
+    def test_insert_before_boundary_does_not_shift_next_page(self):
+        ids = self.create_incidents(4)
+        first = self.client.get(f'{self.url}?pagination=cursor&page_size=2').data
+        create_incident(title='Newest')
+
+        second = self.client.get(first['next']).data
+        self.assertEqual([item['id'] for item in second['results']], ids[1::-1])
+        self.assertIsNone(second['next'])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(f'{self.url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+
+class UpdatesFeedPaginationTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        self.incident = create_incident()
+        self.url = f'/api/v1/incidents/{self.incident.pk}/updates/'
+        self.ids = [
+            IncidentUpdate.objects.create(incident=self.incident, content=f'Update {index}', author='ic').pk
+            for index in range(5)
+        ]
+        self.created_at = timezone.now()
+        IncidentUpdate.objects.update(created_at=self.created_at)
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([item['id'] for item in response.data['results']])
+            url = response.data['next']
+        return pages
+
+    def test_pages_newest_first_through_ties(self):
+        newest_first = self.ids[::-1]
+        self.assertEqual(
+            self.walk(f'{self.url}?page_size=2'), [newest_first[:2], newest_first[2:4], newest_first[4:]]
+        )
+
+    def test_since_id_pages_oldest_first(self):
+        self.assertEqual(self.walk(f'{self.url}?since={self.ids[0]}&page_size=2'), [self.ids[1:3], self.ids[3:]])
+
+    def test_since_timestamp_excludes_the_boundary_and_keeps_ties_in_id_order(self):
+        IncidentUpdate.objects.filter(pk__in=self.ids[3:]).update(created_at=self.created_at + timedelta(seconds=1))
+
+        since = self.created_at.isoformat().replace('+00:00', 'Z')
+        self.assertEqual(self.walk(f'{self.url}?since={since}&page_size=1'), [[self.ids[3]], [self.ids[4]]])
+
+    def test_invalid_since_returns_400(self):
+        response = self.client.get(f'{self.url}?since=yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        # Triggers restored by ensure_triggers roll back with each test; check them per test
+        for patcher in (mock.patch.dict('incidents.search._backends', clear=True),
+                        mock.patch.object(SQLiteSearchBackend, 'triggers_checked', False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.both = create_incident(title='Database failover stuck', description='Replica lag')
+        IncidentUpdate.objects.create(incident=self.both, content='Failover retried', author='ic')
+        self.title_only = create_incident(title='Failover drill', description='Planned', status='closed')
+        self.update_only = create_incident(title='Checkout errors', description='Payments fail')
+        IncidentUpdate.objects.create(incident=self.update_only, content='Caused by the failover', author='ic')
+        self.unrelated = create_incident(title='Slow dashboards', description='Reports time out')
+
+    def ranked_ids(self, backend, queryset=None, limit=10):
+        return [incident_id for incident_id, _ in backend.search(['failover'], limit, queryset)]
+
+    def test_incident_and_update_matches_are_summed(self):
+        for backend in (get_search_backend(), SearchBackend()):
+            ranked = self.ranked_ids(backend)
+            self.assertEqual(ranked[0], self.both.pk, type(backend).__name__)
+            self.assertEqual(set(ranked), {self.both.pk, self.title_only.pk, self.update_only.pk}, type(backend).__name__)
+
+    def test_filters_apply_before_the_limit(self):
+        queryset = Incident.objects.filter(status='closed')
+        for backend in (get_search_backend(), SearchBackend()):
+            self.assertEqual(self.ranked_ids(backend, queryset, limit=1), [self.title_only.pk], type(backend).__name__)
+
+    def test_restrict(self):
+        self.assertEqual(SearchBackend.restrict(None, 'hits.id'), ('', []))
+        self.assertEqual(SearchBackend.restrict(Incident.objects.all(), 'hits.id'), ('', []))
+
+        condition, params = SearchBackend.restrict(Incident.objects.filter(status='closed'), 'hits.id')
+        self.assertTrue(condition.startswith('hits.id IN (SELECT'))
+        self.assertEqual(params, ['closed'])
+
+    def test_results_carry_scores_and_highlights(self):
+        results = search_incidents('failover', Incident.objects.exclude(status='closed'))
+
+        self.assertEqual([incident.pk for incident, _, _ in results], [self.both.pk, self.update_only.pk])
+        incident, score, highlights = results[0]
+        self.assertGreater(score, results[1][1])
+        self.assertEqual(highlights['title'], 'Database <mark>failover</mark> stuck')
+        self.assertEqual([update['snippet'] for update in highlights['updates']], ['<mark>Failover</mark> retried'])
+
+
+class VersionBumpTests(TestCase):
+    def setUp(self):
+        self.incident = create_incident()
+        self.version = self.incident.version
+
+    def test_unconditional_saves_of_stale_instances(self):
+        first = Incident.objects.get(pk=self.incident.pk)
+        second = Incident.objects.get(pk=self.incident.pk)
+
+        first.title = 'Checkout down'
+        save_incident(first, ['title'])
+        second.description = 'Card payments fail'
+        second.save()
+
+        self.assertEqual(first.version, self.version + 1)
+        self.assertEqual(second.version, self.version + 2)
+        self.assertEqual(Incident.objects.get(pk=self.incident.pk).version, self.version + 2)
+
+    def test_stale_version_after_unconditional_write_conflicts(self):
+        first = Incident.objects.get(pk=self.incident.pk)
+        second = Incident.objects.get(pk=self.incident.pk)
+        first.title = 'Checkout down'
+        save_incident(first, ['title'])
+        second.title = 'Checkout degraded'
+        save_incident(second, ['title'])
+
+        first.title = 'Checkout recovered'
+        with self.assertRaises(VersionConflict) as raised:
+            save_incident(first, ['title'], expected_version=first.version)
+        self.assertEqual(raised.exception.current_version, self.version + 2)
+
+    def test_bulk_transition_reads_back_version(self):
+        Incident.objects.filter(pk=self.incident.pk).update(version=self.version + 5)
+
+        transitioned, conflicts = transition_incidents([(self.incident, 'mitigating')])
+        self.assertEqual(conflicts, [])
+        self.assertEqual(transitioned[0].version, self.version + 6)
+
+
+class BulkWriteTests(TestCase):
+    def test_insert_without_returning_reads_back_ids(self):
+        now = timezone.now()
+        incidents = [
+            Incident(title=f'Incident {i}', description='', level='L2', scope='Low', status='reported',
+                     started_at=now, detected_at=now, impacted_areas=['API'])
+            for i in range(BULK_BATCH_SIZE * 2 + 5)
+        ]
+        with mock.patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False):
+            insert_incidents(incidents)
+
+        stored = dict(Incident.objects.values_list('pk', 'title'))
+        self.assertEqual({incident.pk: incident.title for incident in incidents}, stored)
+        self.assertEqual(IncidentTag.objects.count(), len(incidents))
+
+    def test_update_rejects_repeated_ids(self):
+        incident = create_incident()
+        other = create_incident()
+        results = bulk_update_incidents([
+            {'id': incident.pk, 'title': 'First'},
+            {'id': other.pk, 'title': 'Other'},
+            {'id': incident.pk, 'title': 'Second'},
+        ], IncidentSerializer, {})
+
+        self.assertEqual([result['status'] for result in results], ['error', 'updated', 'error'])
+        self.assertIn('more than once', results[0]['errors']['id'])
+        self.assertEqual(Incident.objects.get(pk=incident.pk).title, 'Checkout errors')
+
+    def test_update_reports_partly_applied_item(self):
+        incident = create_incident()
+
+        def conflict(targets, user=None):
+            return [], [incident for incident, _ in targets]
+
+        with mock.patch('incidents.bulk.transition_incidents', side_effect=conflict):
+            results = bulk_update_incidents(
+                [{'id': incident.pk, 'title': 'Checkout down', 'status': 'mitigating'}], IncidentSerializer, {}
+            )
+
+        stored = Incident.objects.get(pk=incident.pk)
+        self.assertEqual(results[0]['status'], 'partial')
+        self.assertEqual(results[0]['version'], stored.version)
+        self.assertEqual((stored.title, stored.status), ('Checkout down', 'reported'))
+
+
+
+class BulkEndpointTests(APITestCase):
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        self.incident = create_incident()
+        self.stale = create_incident()
+        Incident.objects.filter(pk=self.stale.pk).update(version=self.stale.version + 1)
+
+    def test_update_reports_each_failed_item(self):
+        response = self.client.post('/api/v1/incidents/bulk_update/', [
+            {'id': self.incident.pk, 'version': self.incident.version, 'title': 'Checkout down'},
+            {'id': self.stale.pk, 'version': self.stale.version, 'title': 'Lost update'},
+            {'id': self.incident.pk + 1000, 'title': 'Missing'},
+            {'title': 'No id'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (1, 3))
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['updated', 'error', 'error', 'error'])
+        self.assertEqual(results[0]['version'], self.incident.version + 1)
+        self.assertEqual(
+            results[1]['errors']['version'],
+            f'Incident was modified concurrently (current version {self.stale.version + 1})'
+        )
+        self.assertEqual(results[2]['errors']['id'], 'Incident not found')
+        self.assertEqual(results[3]['errors']['id'], 'A valid incident id is required')
+        self.assertEqual(Incident.objects.get(pk=self.stale.pk).title, 'Checkout errors')
+
+    def test_update_with_only_failures_returns_400(self):
+        response = self.client.post('/api/v1/incidents/bulk_update/', [
+            {'id': self.stale.pk, 'version': self.stale.version, 'title': 'Lost update'},
+            {'id': self.incident.pk, 'level': 'not-a-level'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['succeeded'], 0)
+        self.assertIn('level', response.data['results'][1]['errors'])
+
+    def test_status_update_reports_invalid_transition(self):
+        response = self.client.post('/api/v1/incidents/bulk_update_status/', [
+            {'id': self.incident.pk, 'status': 'mitigating'},
+            {'id': self.stale.pk, 'status': 'closed'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        results = response.data['results']
+        self.assertEqual(results[0]['incident_status'], 'mitigating')
+        self.assertEqual(results[1]['status'], 'error')
+        self.assertIn('status', results[1]['errors'])
+        self.assertEqual(Incident.objects.get(pk=self.stale.pk).status, 'reported')
+
+
+
+class MetricsRollupTests(TestCase):
+    def rollups(self):
+        return sorted(
+            IncidentMetricsRollup.objects.filter(count__gt=0)
+            .values_list('day', 'reporting_org', 'level', 'scope', 'incident_type', 'metric', 'bucket', 'count')
+        )
+
+    def advance(self, incident, steps):
+        for _ in range(steps):
+            incident = Incident.objects.get(pk=incident.pk)
+            transition_incident(incident, next_status(incident.status))
+
+    def assert_matches_rebuild(self):
+        incremental = self.rollups()
+        totals = dict(IncidentMetricsRollup.objects.filter(count__gt=0).values('metric').annotate(
+            seconds=Sum('total_seconds')).values_list('metric', 'seconds'))
+        metrics = sorted(IncidentMetrics.objects.values_list(
+            'incident_id', 'time_to_detect', 'time_to_mitigate', 'time_to_resolve'
+        ))
+
+        call_command('rebuild_incident_metrics', stdout=StringIO())
+        self.assertEqual(self.rollups(), incremental)
+        rebuilt_totals = dict(IncidentMetricsRollup.objects.values('metric').annotate(
+            seconds=Sum('total_seconds')).values_list('metric', 'seconds'))
+        self.assertEqual(rebuilt_totals.keys(), totals.keys())
+        for metric, seconds in totals.items():
+            self.assertAlmostEqual(rebuilt_totals[metric], seconds, places=3)
+        self.assertEqual(sorted(IncidentMetrics.objects.values_list(
+            'incident_id', 'time_to_detect', 'time_to_mitigate', 'time_to_resolve'
+        )), metrics)
+
+    def test_transitions_edits_and_deletes_match_rebuild(self):
+        started = timezone.now() - timedelta(hours=3)
+        incidents = [
+            create_incident(started_at=started, detected_at=started + timedelta(minutes=minutes), level=level)
+            for minutes, level in ((5, 'L2'), (40, 'L3'), (90, 'L4'))
+        ]
+        self.advance(incidents[0], 3)
+        self.advance(incidents[1], 1)
+        self.advance(incidents[2], 2)
+
+        moved = Incident.objects.get(pk=incidents[0].pk)
+        moved.level = 'L3'
+        moved.reporting_org = 'Engineering / Platform'
+        moved.save()
+        Incident.objects.get(pk=incidents[2].pk).delete()
+
+        self.assertTrue(self.rollups())
+        self.assert_matches_rebuild()
+
+    def test_bulk_paths_match_rebuild(self):
+        incidents = [create_incident(title=f'Incident {index}') for index in range(3)]
+        transition_incidents([(incident, 'mitigating') for incident in incidents])
+        results = bulk_update_incidents([
+            {'id': incidents[0].pk, 'level': 'L2', 'status': 'resolved'},
+            {'id': incidents[1].pk, 'scope': 'High'},
+        ], IncidentSerializer, {})
+        self.assertEqual([result['status'] for result in results], ['updated', 'updated'])
+
+        self.assert_matches_rebuild()
+
+
+
+class ResponseCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        self.incident = create_incident()
+        self.url = f'/api/v1/incidents/{self.incident.pk}/'
+
+    def titles(self):
+        return [item['title'] for item in self.client.get('/api/v1/incidents/').data['results']]
+
+    def test_write_replaces_generation_after_commit(self):
+        self.assertEqual(self.titles(), ['Checkout errors'])
+        self.assertEqual(self.client.get(self.url).data['title'], 'Checkout errors')
+        # Bypasses the signals, so the cached responses are still served
+        Incident.objects.filter(pk=self.incident.pk).update(title='Checkout down')
+        self.assertEqual(self.titles(), ['Checkout errors'])
+        self.assertEqual(self.client.get(self.url).data['title'], 'Checkout errors')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.url, {'description': 'Card payments fail'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.titles(), ['Checkout down'])
+        self.assertEqual(self.client.get(self.url).data['description'], 'Card payments fail')
+
+    def test_generations_change_only_on_commit(self):
+        keys = [INCIDENT_GENERATION_KEY.format(self.incident.pk), LIST_GENERATION_KEY]
+        self.client.get(self.url)
+        self.client.get('/api/v1/incidents/')
+        before = cache.get_many(keys)
+        self.assertEqual(len(before), 2)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            invalidate_incidents([self.incident.pk], lists=False)
+        self.assertEqual(cache.get_many(keys), before)
+
+        callbacks[0]()
+        after = cache.get_many(keys)
+        self.assertNotEqual(after[keys[0]], before[keys[0]])
+        self.assertEqual(after[keys[1]], before[keys[1]])
+
+
+
+class DuplicateTests(APITestCase):
+    def setUp(self):
+        self.started = timezone.now() - timedelta(hours=2)
+        self.incident = self.create(impacted_areas=['API', 'Web'])
+
+    def create(self, title='Checkout payments failing', description='Card declined', started=None, **fields):
+        started = started or self.started
+        return create_incident(
+            title=title, description=description, started_at=started, detected_at=started, **fields
+        )
+
+    def candidates(self, incident=None, **kwargs):
+        return {
+            candidate['id']: candidate
+            for candidate in find_duplicate_candidates(incident or self.incident, timedelta(hours=6), **kwargs)
+        }
+
+    def test_scores_text_and_tag_overlap(self):
+        same = self.create(impacted_areas=['Web', 'API'])
+        partial = self.create(title='Checkout payments slow', description='Timeouts', impacted_areas=['API'])
+        self.create(title='Dashboards lagging', description='Reports time out', impacted_areas=['Reporting'])
+        self.create(started=self.started - timedelta(days=2), impacted_areas=['API', 'Web'])
+
+        candidates = self.candidates()
+        self.assertEqual(list(candidates), [same.pk, partial.pk])
+        self.assertEqual(candidates[same.pk]['score'], 1.0)
+        self.assertEqual(candidates[partial.pk]['shared_tokens'], 2)
+        self.assertEqual(candidates[partial.pk]['text_similarity'], round(2 / 7, 3))
+        self.assertEqual(candidates[partial.pk]['tag_similarity'], 0.5)
+        self.assertEqual(candidates[partial.pk]['score'], round(0.6 * 2 / 7 + 0.4 * 0.5, 3))
+
+        self.assertEqual(list(self.candidates(min_score=0.5)), [same.pk])
+
+    def test_edit_reindexes_terms(self):
+        other = self.create(title='Search index stale', description='Results missing')
+        self.assertNotIn(other.pk, self.candidates())
+
+        other.title = 'Checkout payments failing'
+        other.save()
+        self.assertIn(other.pk, self.candidates())
+
+    def test_mark_relinks_to_root_and_moves_duplicates(self):
+        first = self.create()
+        second = self.create()
+        mark_duplicate(first, self.incident)
+        self.assertNotIn(first.pk, self.candidates())
+
+        self.assertEqual(mark_duplicate(second, first), self.incident)
+        self.assertEqual(Incident.objects.get(pk=second.pk).duplicate_of_id, self.incident.pk)
+
+        root = self.create()
+        mark_duplicate(self.incident, root)
+        linked = dict(Incident.objects.filter(pk__in=[self.incident.pk, first.pk, second.pk])
+                      .values_list('pk', 'duplicate_of'))
+        self.assertEqual(linked, {self.incident.pk: root.pk, first.pk: root.pk, second.pk: root.pk})
+
+        with self.assertRaises(DuplicateLinkError):
+            mark_duplicate(root, Incident.objects.get(pk=first.pk))
+
+        unmark_duplicate(Incident.objects.get(pk=first.pk))
+        self.assertIsNone(Incident.objects.get(pk=first.pk).duplicate_of_id)
+        self.assertIn(first.pk, self.candidates(Incident.objects.get(pk=root.pk)))
+
+    def test_mark_endpoint_validates_parent(self):
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        url = f'/api/v1/incidents/{self.incident.pk}/mark_duplicate/'
+
+        response = self.client.post(url, {'duplicate_of': self.incident.pk + 1000}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(url, {'duplicate_of': self.incident.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        parent = self.create()
+        response = self.client.post(url, {'duplicate_of': parent.pk}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(f'/api/v1/incidents/{parent.pk}/duplicate_candidates/?window_hours=6')
+        self.assertNotIn(self.incident.pk, [candidate['id'] for candidate in response.data['candidates']])
+
+
+class ExportStreamTests(TestCase):
+    def setUp(self):
+        for index in range(3):
+            create_incident(title=f'Incident {index}')
+
+    async def test_asgi_export_streams_asynchronously(self):
+        response = await self.async_client.get('/api/v1/incidents/export/?export_format=csv')
+        self.assertTrue(response.is_async)
+        body = b''.join([part async for part in response.streaming_content])
+
+        expected = await sync_to_async(
+            lambda: b''.join(self.client.get('/api/v1/incidents/export/?export_format=csv').streaming_content)
+        )()
+        self.assertEqual(body, expected)
+        self.assertEqual(body.count(b'\nincident,'), 3)
+
+
+class ImportTests(TestCase):
+    def record(self, **fields):
+        record = {
+            'title': 'Imported outage', 'description': 'Historical', 'level': 'L2', 'scope': 'Low',
+            'status': 'resolved', 'started_at': '2024-01-01T00:00:00Z', 'detected_at': '2024-01-01T00:05:00Z',
+            'impacted_areas': ['Application'],
+        }
+        record.update(fields)
+        return record
+
+    def test_rejects_invalid_commander_email(self):
+        with self.assertRaises(ImportRecordError) as raised:
+            build_incident(self.record(incident_commander='not-an-email'))
+        self.assertIn('incident_commander', raised.exception.errors)
+
+    def test_batch_keeps_source_created_at(self):
+        built = [build_incident(self.record(
+            created_at='2024-01-02T00:00:00Z',
+            updates=[{'content': 'Found it', 'author': 'ic', 'created_at': '2024-01-03T00:00:00Z'},
+                     {'content': 'Fixed it', 'author': 'ic'}],
+        ))]
+        import_batch(built)
+
+        incident = Incident.objects.get(pk=built[0][0].pk)
+        self.assertEqual(incident.created_at.isoformat(), '2024-01-02T00:00:00+00:00')
+        self.assertEqual(
+            sorted(update.created_at.year for update in incident.updates.all()), [2024, timezone.now().year]
+        )
+        self.assertTrue(Incident._meta.get_field('created_at').auto_now_add)
+
+    def test_checkpoint_saved_with_batch(self):
+        checkpoint = ImportCheckpoint.objects.create(name='history.ndjson')
+        checkpoint.position, checkpoint.imported = 2, 1
+
+        with mock.patch('incidents.importer.IncidentDocument.objects.bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                import_batch([build_incident(self.record())], checkpoint)
+        self.assertEqual(ImportCheckpoint.objects.get(pk=checkpoint.pk).position, 0)
+        self.assertFalse(Incident.objects.exists())
+
+        import_batch([build_incident(self.record())], checkpoint)
+        self.assertEqual(ImportCheckpoint.objects.get(pk=checkpoint.pk).position, 2)
+        self.assertEqual(Incident.objects.count(), 1)
+
+
+class ActiveBoardTests(APITestCase):
+    def setUp(self):
+        self.incident = create_incident()
+
+    def test_save_without_board_fields_skips_board(self):
+        self.incident.description = 'Card payments fail'
+        with mock.patch('incidents.signals.sync_board') as sync:
+            self.incident.save()
+        sync.assert_not_called()
+
+        self.incident.title = 'Checkout down'
+        with mock.patch('incidents.signals.sync_board') as sync:
+            self.incident.save()
+        sync.assert_called_once()
+
+    def test_bulk_update_without_board_fields_skips_board(self):
+        with mock.patch('incidents.bulk.sync_board') as sync:
+            bulk_update_incidents([{'id': self.incident.pk, 'description': 'Card payments fail'}], IncidentSerializer, {})
+        sync.assert_not_called()
+        self.assertEqual(ActiveIncident.objects.get(pk=self.incident.pk).title, 'Checkout errors')
+
+    def advance(self, incident, until):
+        incident = Incident.objects.get(pk=incident.pk)
+        while incident.status != until:
+            transition_incident(incident, next_status(incident.status))
+            incident = Incident.objects.get(pk=incident.pk)
+        return incident
+
+    def test_transition_moves_row_and_close_removes_it(self):
+        entry = ActiveIncident.objects.get(pk=self.incident.pk)
+        self.advance(self.incident, 'mitigating')
+        moved = ActiveIncident.objects.get(pk=self.incident.pk)
+        self.assertEqual(moved.status, 'mitigating')
+        self.assertGreater(moved.status_since, entry.status_since)
+
+        self.advance(self.incident, 'closed')
+        self.assertFalse(ActiveIncident.objects.filter(pk=self.incident.pk).exists())
+
+    def test_bulk_close_removes_rows(self):
+        other = create_incident(title='Search down')
+        for incident in (self.incident, other):
+            self.advance(incident, 'postmortem')
+
+        results = bulk_transition_incidents([{'id': self.incident.pk, 'status': 'closed'}])
+        self.assertEqual(results[0]['incident_status'], 'closed')
+        self.assertEqual(list(ActiveIncident.objects.values_list('pk', flat=True)), [other.pk])
+
+    def test_board_endpoint_matches_rebuild(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user('operator'))
+        mitigating = create_incident(title='Search down')
+        self.advance(mitigating, 'mitigating')
+        self.advance(create_incident(title='Old outage'), 'closed')
+
+        board = self.client.get('/api/v1/incidents/board/').data
+        self.assertEqual(board['total'], 2)
+        self.assertEqual(board['by_status']['mitigating'], 1)
+        self.assertEqual({item['id'] for item in board['incidents']}, {self.incident.pk, mitigating.pk})
+
+        incremental = sorted(ActiveIncident.objects.values_list('pk', 'status', 'status_since'))
+        rebuild_board()
+        self.assertEqual(sorted(ActiveIncident.objects.values_list('pk', 'status', 'status_since')), incremental)
+
+
+class SerializationTimingTests(APITestCase):
+    def setUp(self):
+        self.incident = create_incident(status='mitigating')
+
+    def assert_timed(self, url):
+        with mock.patch('incidents.instrumentation.timed_representation', wraps=timed_representation) as timed:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        timed.assert_called()
+
+    def test_actions_building_their_serializer_are_timed(self):
+        self.assert_timed('/api/v1/incidents/search/?q=checkout')
+        self.assert_timed('/api/v1/incidents/stalled/?hours=0')
+        self.assert_timed(f'/api/v1/incidents/{self.incident.pk}/updates/')
+        self.assert_timed(f'/api/v1/incidents/{self.incident.pk}/transitions/')
+
+
+class SharedConfigTests(TestCase):
+    async def test_async_middleware_checks_config_off_the_event_loop(self):
+        threads = []
+
+        async def get_response(request):
+            return 'response'
+
+        middleware = SharedConfigMiddleware(get_response)
+        with mock.patch.object(config_registry, 'check_due', return_value=True), \
+                mock.patch.object(config_registry, 'snapshot', side_effect=lambda: threads.append(threading.get_ident())):
+            self.assertEqual(await middleware(RequestFactory().get('/')), 'response')
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+
+    def test_field_choices_follow_snapshot(self):
+        field = Incident._meta.get_field('level')
+        choices = field.choices
+        raw = dict(shared_config().raw)
+        raw['incident'] = {**raw['incident'], 'levels': [{'value': 'L9', 'label': 'Level 9'}]}
+
+        with mock.patch.object(config_registry, 'current', ConfigSnapshot(raw, None)):
+            self.assertEqual(list(field.choices), [('L9', 'Level 9')])
+            self.assertEqual(Incident(level='L9').get_level_display(), 'Level 9')
+        self.assertIs(field.choices, choices)
+        self.assertNotIn(('L9', 'Level 9'), list(field.choices))
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = directory.name
+        self.incidents = [create_incident(title=f'Incident {index}') for index in range(3)]
+
+    def write(self, fmt, **kwargs):
+        kwargs.setdefault('lag', timedelta(0))
+        return write_snapshot(f'{self.root}/{fmt}', fmt, tables=['incidents'], **kwargs)['incidents']
+
+    def test_incremental_runs_copy_changed_rows_once(self):
+        for fmt in available_formats():
+            with self.subTest(fmt=fmt):
+                self.assertEqual(self.write(fmt), (3, 1))
+                self.assertEqual(self.write(fmt), (0, 0))
+
+                changed = Incident.objects.get(pk=self.incidents[0].pk)
+                changed.title = 'Incident 0 renamed'
+                changed.save()
+                added = create_incident(title='Incident 3')
+                self.assertEqual(self.write(fmt), (2, 1))
+
+                table = open_snapshot(f'{self.root}/{fmt}').table('incidents')
+                self.assertEqual(table.num_rows, 4)
+                self.assertEqual(dict(row.values() for row in table.rows('id', 'title')), {
+                    self.incidents[0].pk: 'Incident 0 renamed', self.incidents[1].pk: 'Incident 1',
+                    self.incidents[2].pk: 'Incident 2', added.pk: 'Incident 3',
+                })
+                self.assertEqual(table.count_by('level'), {'L4': 4})
+                Incident.objects.filter(pk=added.pk).delete()
+
+    def test_rows_sharing_the_watermark_timestamp(self):
+        at = timezone.now() - timedelta(minutes=1)
+        Incident.objects.update(updated_at=at)
+        self.assertEqual(self.write('columnar', segment_rows=2), (3, 2))
+
+        late = create_incident(title='Incident 3')
+        Incident.objects.filter(pk=late.pk).update(updated_at=at)
+        self.assertEqual(self.write('columnar'), (1, 1))
+        self.assertEqual(open_snapshot(f'{self.root}/columnar').table('incidents').num_rows, 4)
+
+    def test_recent_changes_wait_for_the_lag(self):
+        Incident.objects.filter(pk=self.incidents[0].pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(self.write('columnar', lag=timedelta(minutes=5)), (1, 1))
+        self.assertEqual(self.write('columnar'), (2, 1))
+
+    def test_format_must_match_existing_snapshot(self):
+        self.write('columnar')
+        if 'arrow' in available_formats():
+            with self.assertRaises(SnapshotError):
+                write_snapshot(f'{self.root}/columnar', 'arrow', lag=timedelta(0))
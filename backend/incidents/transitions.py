@@ -0,0 +1,181 @@
+"""
+Incident status state machine.
+
+Statuses move forward one step at a time along the order of the shared
+config (reported -> mitigating -> resolved -> postmortem -> closed, see
+INCIDENT_STATE_MANAGEMENT.md). Every transition writes only the status
+columns, conditioned on the status the caller saw, and appends an
+IncidentStatusTransition row.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .board import sync_board
+from .caching import invalidate_incidents
+from .concurrency import VersionConflict
+from .config import get_values_for_field, validate_field_value
+from .events import record_events
+from .metrics import sync_metrics
+from .models import Incident, IncidentStatusTransition
+
+
+class InvalidTransition(ValueError):
+    """Raised when a status change does not follow the incident flow."""
+
+
+class TransitionConflict(Exception):
+    """Raised when the incident's status changed since it was read."""
+
+
+def next_status(status):
+    """Return the only status an incident in status may move to, or None at the end of the flow."""
+    statuses = get_values_for_field('statuses')
+    if status not in statuses:
+        return None
+    index = statuses.index(status) + 1
+    return statuses[index] if index < len(statuses) else None
+
+
+def check_transition(from_status, to_status):
+    """
+    Validate a status change against the incident flow.
+
+    Raises:
+        InvalidTransition: If to_status is not the next status after from_status
+    """
+    if not validate_field_value('statuses', to_status):
+        raise InvalidTransition('Invalid status value')
+    expected = next_status(from_status)
+    if to_status != expected:
+        if expected is None:
+            raise InvalidTransition(f'Incident is {from_status}; no further status changes are allowed')
+        raise InvalidTransition(f'Cannot move incident from {from_status} to {to_status}; next status is {expected}')
+
+
+def transition_incident(incident, to_status, user=None, extra_fields=(), expected_version=None):
+    """
+    Move one incident to its next status.
+
+    Saves with ``update_fields`` and a ``WHERE status = <current>`` condition
+    (plus ``version = <expected>`` when given), so a concurrent write makes
+    this one fail instead of overwriting it. Post-save signals record the
+    feed event and the duration metrics.
+
+    Args:
+        incident: Incident loaded from the database
+        to_status: Target status
+        user: User performing the transition, or None
+        extra_fields: Other changed fields to write in the same UPDATE
+        expected_version: Version the client last read, or None to skip the check
+
+    Raises:
+        InvalidTransition: If the transition is not allowed
+        TransitionConflict: If the stored status no longer matches
+        VersionConflict: If the stored version differs from expected_version
+    """
+    loaded = getattr(incident, '_loaded_values', {})
+    from_status = loaded.get('status', incident.status)
+    check_transition(from_status, to_status)
+
+    incident.status = to_status
+    conditions = {'status': from_status}
+    if expected_version is not None:
+        conditions['version'] = expected_version
+    with transaction.atomic():
+        written = incident.write_update(sorted({'status', 'updated_at', *extra_fields}), **conditions)
+        if written:
+            IncidentStatusTransition.objects.create(
+                incident=incident, from_status=from_status, to_status=to_status,
+                transitioned_at=incident.updated_at, transitioned_by=user
+            )
+    if not written:
+        incident.status = from_status
+        current = Incident.objects.filter(pk=incident.pk).values_list('status', 'version').first()
+        if current is not None and current[0] == from_status:
+            raise VersionConflict(current[1])
+        raise TransitionConflict(f'Incident status changed concurrently (now {current and current[0]})')
+
+
+def transition_incidents(targets, user=None):
+    """
+    Move many incidents to their next status.
+
+    Incidents are grouped by (current, target) status; each group is written
+    with one UPDATE of the status columns restricted to rows still in the
+    expected status.
+
+    Args:
+        targets: List of (incident, to_status) pairs already checked with check_transition
+        user: User performing the transitions, or None
+
+    Returns:
+        tuple: (transitioned incidents, incidents whose status changed concurrently)
+    """
+    groups = defaultdict(list)
+    for incident, to_status in targets:
+        groups[(incident.status, to_status)].append(incident)
+
+    now = timezone.now()
+    transitioned = []
+    conflicts = []
+    with transaction.atomic():
+        rows = []
+        for (from_status, to_status), incidents in groups.items():
+            matched = set(
+                Incident.objects.select_for_update()
+                .filter(pk__in=[incident.pk for incident in incidents], status=from_status)
+                .values_list('pk', flat=True)
+            )
+            Incident.objects.filter(pk__in=matched).update(
+                status=to_status, updated_at=now, version=F('version') + 1
+            )
+            versions = dict(Incident.objects.filter(pk__in=matched).values_list('pk', 'version'))
+            for incident in incidents:
+                if incident.pk not in matched:
+                    conflicts.append(incident)
+                    continue
+                incident.status = to_status
+                incident.updated_at = now
+                incident.version = versions[incident.pk]
+                transitioned.append(incident)
+                rows.append(IncidentStatusTransition(
+                    incident=incident, from_status=from_status, to_status=to_status,
+                    transitioned_at=now, transitioned_by=user
+                ))
+
+        IncidentStatusTransition.objects.bulk_create(rows)
+        moved = {row.incident_id: row.to_status for row in rows}
+        sync_metrics(transitioned, transitions=moved, transitioned_at=now)
+        sync_board(transitioned, transitions=moved, transitioned_at=now)
+        invalidate_incidents([incident.pk for incident in transitioned])
+        record_events(
+            (row.incident_id, 'status_changed', {'from': row.from_status, 'to': row.to_status, 'updated_at': now})
+            for row in rows
+        )
+    for incident in transitioned:
+        incident.snapshot_loaded_values()
+    return transitioned, conflicts
+
+
+def incidents_in_status_since(status, older_than):
+    """
+    Find incidents currently in a status they entered more than older_than ago.
+
+    Args:
+        status: Status the incidents are in
+        older_than: timedelta
+
+    Returns:
+        IncidentStatusTransition queryset (the entries into that status, with
+        the incident selected), oldest first
+    """
+    cutoff = timezone.now() - older_than
+    return (
+        IncidentStatusTransition.objects
+        .filter(to_status=status, transitioned_at__lt=cutoff, incident__status=status)
+        .select_related('incident')
+        .order_by('transitioned_at')
+    )
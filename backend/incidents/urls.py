@@ -1,9 +1,11 @@
 """
 URL routing for incidents API.
 """
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import IncidentViewSet, IncidentDocumentViewSet
+from .instrumentation import prometheus_metrics
+from .views import IncidentViewSet, IncidentDocumentViewSet, incident_event_stream
 
 # Create a router and register viewsets
 router = DefaultRouter()
@@ -12,20 +14,48 @@ router.register(r'incident-documents', IncidentDocumentViewSet, basename='incide
 
 # The API URLs are now determined automatically by the router
 urlpatterns = [
+    # Server-Sent Events streams (registered before the router so 'events' is not taken as a pk)
+    path('incidents/events/', incident_event_stream, name='incident-events'),
+    path('incidents/<int:pk>/events/', incident_event_stream, name='incident-detail-events'),
+    path('metrics/', prometheus_metrics, name='api-metrics'),
     path('', include(router.urls)),
 ]
 
+if settings.INCIDENT_ASYNC_READS:
+    from .async_views import urlpatterns as async_read_urlpatterns
+    urlpatterns[-1:-1] = async_read_urlpatterns
+
 # Available endpoints:
-# GET    /api/v1/incidents/                 - List all incidents (paginated)
+# GET    /api/v1/incidents/                 - List all incidents (paginated, ?pagination=cursor for keyset pages)
 # POST   /api/v1/incidents/                 - Create new incident
 # GET    /api/v1/incidents/{id}/            - Get specific incident details
 # PUT    /api/v1/incidents/{id}/            - Update specific incident
 # PATCH  /api/v1/incidents/{id}/            - Partially update specific incident
 # DELETE /api/v1/incidents/{id}/            - Delete specific incident
 # GET    /api/v1/incidents/statistics/      - Get incident statistics
+# GET    /api/v1/incidents/analytics/      - Duration percentiles (MTTD/MTTR) from daily rollups
+# GET    /api/v1/incidents/search/?q=...   - Ranked full-text search with highlighted snippets
+# GET    /api/v1/incidents/export/          - Stream filtered incidents as NDJSON or CSV (?export_format=)
 # GET    /api/v1/incidents/critical/        - Get critical incidents (L5 Medium/High)
-# POST   /api/v1/incidents/{id}/update_status/ - Update incident status
+# GET    /api/v1/incidents/board/           - Active (not closed) incidents with per-status/level counts
+# POST   /api/v1/incidents/{id}/update_status/ - Move incident to the next status (409 on a concurrent change)
+# GET    /api/v1/incidents/{id}/transitions/ - Status transition history
+# GET    /api/v1/incidents/stalled/?status=mitigating&hours=N - Incidents in a status for more than N hours
+# GET    /api/v1/incidents/{id}/duplicate_candidates/ - Likely duplicates ranked by similarity (?window_hours=&min_score=)
+# POST   /api/v1/incidents/{id}/mark_duplicate/ - Link as a duplicate ({"duplicate_of": <id>})
+# POST   /api/v1/incidents/{id}/unmark_duplicate/ - Remove the duplicate link
+# POST   /api/v1/incidents/bulk_create/     - Create many incidents (per-item results)
+# POST   /api/v1/incidents/bulk_update/     - Partially update many incidents
+# POST   /api/v1/incidents/bulk_update_status/ - Transition the status of many incidents
 # GET    /api/v1/incidents/{id}/timeline/   - Get incident timeline
+# GET    /api/v1/incidents/{id}/updates/    - Updates feed (cursor paginated, ?since=<id|timestamp> for the tail)
+# POST   /api/v1/incidents/{id}/updates/    - Post an update
+# GET    /api/v1/incidents/events/          - SSE stream of all incident deltas (ASGI only)
+# GET    /api/v1/incidents/{id}/events/     - SSE stream of one incident's deltas (ASGI only)
+# GET    /api/v1/metrics/                   - Per-action request metrics in the Prometheus text format
+#
+# With INCIDENT_ASYNC_READS (on under ASGI) GETs of the list, detail, updates,
+# statistics, critical and board endpoints are served by incidents.async_views.
 
 # GET    /api/v1/incident-documents/        - List all incident documents
 # POST   /api/v1/incident-documents/        - Create new incident document
@@ -6,17 +6,60 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import FilterSet, CharFilter
-from django.db.models import Q
-from .models import Incident, IncidentDocument, IncidentUpdate
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Q, Count, Max, OuterRef, Prefetch, Subquery
+from django.http import Http404, StreamingHttpResponse
+from django.utils import timezone
+from datetime import timedelta
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import Incident, IncidentDocument, IncidentMetrics, IncidentUpdate
 from .serializers import (
     IncidentSerializer, IncidentListSerializer, IncidentCreateSerializer,
-    IncidentDocumentSerializer, IncidentUpdateSerializer
+    IncidentDocumentSerializer, IncidentUpdateSerializer, IncidentStatusTransitionSerializer,
+    DETAIL_UPDATES_LIMIT
 )
-from .config import VALID_STATUSES
+from .board import active_board
+from .bulk import (
+    BULK_MAX_ITEMS, bulk_create_incidents, bulk_update_incidents, bulk_transition_incidents
+)
+from .caching import cached_response, response_key
+from .concurrency import VersionConflict, parse_if_match
+from .conditional import conditional_response
+from .config import validate_field_value
+from .correlation import (
+    DEFAULT_MIN_SCORE, DuplicateLinkError, find_duplicate_candidates, mark_duplicate, unmark_duplicate
+)
+from .events import broker
+from .export import EXPORT_FORMATS, EXPORT_RELATIONS, aiter_export, iter_export, parse_relations
+from .instrumentation import InstrumentedViewMixin
+from .metrics import (
+    METRIC_FIELDS, ROLLUP_DIMENSIONS, compute_analytics, parse_choices, parse_percentiles
+)
+from .pagination import IncidentPagination, UpdateFeedPagination
+from .search import search_incidents
+from .statistics import compute_statistics, exclude_duplicates, parse_dimensions
+from .tags import filter_by_tags
+from .transitions import (
+    InvalidTransition, TransitionConflict, incidents_in_status_since, transition_incident
+)
+
+
+# Aggregates whose values change whenever a set of rows changes (conditional GET validators)
+CHANGE_VALIDATORS = {'last_modified': Max('updated_at'), 'total': Count('id')}
+
+DUPLICATE_CANDIDATES_MAX = 50
+
+
+def detail_validators(row):
+    """Split an incident validators row into (updated_at, etag parts), or (None, None) if missing."""
+    if row is None:
+        return None, None
+    return row[0], row
 
 
 class IncidentFilter(FilterSet):
-    """Custom filter for incidents supporting JSONField filtering and multiple value OR logic."""
+    """Custom filter for incidents supporting JSON list field filtering and multiple value OR logic."""
     
     impacted_locations = CharFilter(method='filter_impacted_locations')
     impacted_parties = CharFilter(method='filter_impacted_parties')
@@ -35,26 +78,20 @@ class IncidentFilter(FilterSet):
         fields = []  # Custom methods handle all filtering
     
     def filter_impacted_locations(self, queryset, name, value):
-        """Filter by impacted locations (JSONField contains)."""
+        """Filter by impacted locations (indexed tag semi-join)."""
         if not value:
             return queryset
         # Support multiple values separated by comma
         values = [v.strip() for v in value.split(',')]
-        q_objects = Q()
-        for val in values:
-            q_objects |= Q(impacted_locations__contains=[val])
-        return queryset.filter(q_objects)
+        return filter_by_tags(queryset, 'impacted_locations', values)
     
     def filter_impacted_parties(self, queryset, name, value):
-        """Filter by impacted parties (JSONField contains)."""
+        """Filter by impacted parties (indexed tag semi-join)."""
         if not value:
             return queryset
         # Support multiple values separated by comma
         values = [v.strip() for v in value.split(',')]
-        q_objects = Q()
-        for val in values:
-            q_objects |= Q(impacted_parties__contains=[val])
-        return queryset.filter(q_objects)
+        return filter_by_tags(queryset, 'impacted_parties', values)
     
     def filter_incident_type(self, queryset, name, value):
         """Filter by incident type with OR logic for multiple values."""
@@ -127,49 +164,188 @@ class IncidentFilter(FilterSet):
         return queryset.filter(q_objects)
     
     def filter_impacted_assets(self, queryset, name, value):
-        """Filter by impacted assets with OR logic for multiple values."""
+        """Filter by impacted assets with OR logic for multiple values (indexed tag semi-join)."""
         values = self.request.GET.getlist('impacted_assets')
         if not values:
             return queryset
-        q_objects = Q()
-        for val in values:
-            q_objects |= Q(impacted_assets=val)
-        return queryset.filter(q_objects)
+        return filter_by_tags(queryset, 'impacted_assets', values)
     
     def filter_impacted_areas(self, queryset, name, value):
-        """Filter by impacted areas with OR logic for multiple values."""
+        """Filter by impacted areas with OR logic for multiple values (indexed tag semi-join)."""
         values = self.request.GET.getlist('impacted_areas')
         if not values:
             return queryset
-        q_objects = Q()
-        for val in values:
-            q_objects |= Q(impacted_areas=val)
-        return queryset.filter(q_objects)
+        return filter_by_tags(queryset, 'impacted_areas', values)
 
 
-class IncidentViewSet(viewsets.ModelViewSet):
+class IncidentViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing incidents.
     
     Provides CRUD operations for incidents with filtering, searching, and ordering.
+    The list endpoint accepts ``?pagination=cursor`` for keyset pagination.
+    Read endpoints accept ``?fields=`` / ``?exclude=`` to trim the payload and
+    the SQL column list.
     Uses display_id for URL lookups (e.g., /api/incidents/INC-2024-001/).
     """
     queryset = Incident.objects.all()
     serializer_class = IncidentSerializer
+    pagination_class = IncidentPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
     filterset_class = IncidentFilter
     search_fields = ['title', 'description', 'incident_commander', 'reporting_org']
     ordering_fields = ['created_at', 'started_at', 'detected_at', 'level', 'scope']
     ordering = ['-created_at']  # Default ordering
     
+    write_actions = ('update', 'partial_update', 'update_status', 'mark_duplicate', 'unmark_duplicate')
+    serialized_actions = ('list', 'retrieve', 'critical') + write_actions
+    
+    def include_updates(self):
+        """Whether the nested updates feed is part of this response."""
+        if self.action in self.write_actions:
+            return 'updates' in self.request.query_params.get('include', '').split(',')
+        return True
+    
+    def get_updates_limit(self):
+        """Number of updates embedded in detail payloads (?updates_limit=, capped)."""
+        try:
+            limit = int(self.request.query_params.get('updates_limit', DETAIL_UPDATES_LIMIT))
+        except ValueError:
+            return DETAIL_UPDATES_LIMIT
+        return max(0, min(limit, DETAIL_UPDATES_LIMIT))
+    
+    def get_queryset(self):
+        """Return the queryset with exactly the columns and related data each action serializes."""
+        queryset = super().get_queryset()
+        if self.request is None or self.action not in self.serialized_actions:
+            return queryset
+        
+        serializer = self.get_serializer()
+        fields = serializer.fields
+        
+        columns = serializer.get_model_columns()
+        if columns is not None:
+            queryset = queryset.only(*columns, *self.get_ordering_columns())
+        
+        if self.action == 'retrieve' or self.action in self.write_actions:
+            if 'documents' in fields:
+                queryset = queryset.prefetch_related('documents')
+            if 'updates' in fields:
+                recent_updates = IncidentUpdate.objects.order_by('-created_at')[:self.get_updates_limit()]
+                queryset = queryset.prefetch_related(
+                    Prefetch('updates', queryset=recent_updates, to_attr='recent_updates')
+                )
+            if 'updates_count' in fields:
+                queryset = queryset.annotate(num_updates=Count('updates'))
+        
+        return queryset
+    
+    def get_ordering_columns(self):
+        """Columns the list ordering and keyset cursors read from each row."""
+        requested = self.request.query_params.get('ordering', '')
+        columns = {'created_at'}
+        columns.update(
+            field for field in (f.strip().lstrip('-') for f in requested.split(','))
+            if field in self.ordering_fields
+        )
+        return sorted(columns)
+    
+    def get_serializer_context(self):
+        """Pass the nested updates options to the serializer."""
+        context = super().get_serializer_context()
+        if self.request is not None:
+            context['include_updates'] = self.include_updates()
+            context['updates_limit'] = self.get_updates_limit()
+            if self.action in ('update', 'partial_update'):
+                context['expected_version'] = parse_if_match(self.request)
+        return context
+    
     def get_serializer_class(self):
         """Return appropriate serializer based on action."""
-        if self.action == 'list':
+        if self.action in ('list', 'critical'):
             return IncidentListSerializer
         elif self.action == 'create':
             return IncidentCreateSerializer
         return IncidentSerializer
     
+    def get_detail_validators(self):
+        """
+        Return (updated_at, etag parts) for the incident in the URL with one query.
+        
+        Covers the incident row plus the count and latest change of its updates;
+        document changes touch the incident's updated_at.
+        """
+        return detail_validators(self.get_detail_validators_queryset().first())
+    
+    def get_detail_validators_queryset(self):
+        updates = IncidentUpdate.objects.filter(incident=OuterRef('pk')).order_by().values('incident')
+        return (
+            Incident.objects.filter(pk=self.kwargs[self.lookup_field])
+            .annotate(
+                updates_modified=Subquery(updates.annotate(m=Max('updated_at')).values('m')),
+                updates_total=Subquery(updates.annotate(c=Count('id')).values('c')),
+            )
+            .values_list('updated_at', 'updates_modified', 'updates_total', 'version')
+        )
+    
+    def retrieve(self, request, *args, **kwargs):
+        """Get incident details, served from the response cache when possible."""
+        key = response_key(request, 'retrieve', self.kwargs[self.lookup_field])
+        return cached_response(request, key, lambda: self._retrieve(request, *args, **kwargs))
+    
+    def _retrieve(self, request, *args, **kwargs):
+        """Build incident details, answering 304 when the client copy is current."""
+        last_modified, etag_parts = self.get_detail_validators()
+        build = lambda: super(IncidentViewSet, self).retrieve(request, *args, **kwargs)
+        if etag_parts is None:
+            return build()
+        return conditional_response(
+            request, build, etag_parts, max(filter(None, etag_parts[:2])), version=etag_parts[-1]
+        )
+    
+    def list(self, request, *args, **kwargs):
+        """List incidents, served from the response cache when possible."""
+        key = response_key(request, 'list')
+        return cached_response(request, key, lambda: self._list(request, *args, **kwargs))
+    
+    def _list(self, request, *args, **kwargs):
+        """Build the incident list, answering 304 when the filtered set is unchanged."""
+        validators = self.filter_queryset(Incident.objects.all()).order_by().aggregate(**CHANGE_VALIDATORS)
+        build = lambda: super(IncidentViewSet, self).list(request, *args, **kwargs)
+        return conditional_response(
+            request, build, [validators['last_modified'], validators['total']],
+            validators['last_modified']
+        )
+    
+    def update(self, request, *args, **kwargs):
+        """
+        Update an incident, writing only the changed columns.
+        
+        With ``If-Match: "<version>"`` (or the detail ETag, which starts with
+        the version) the write only applies if the incident is still at that
+        version, otherwise 412 is returned with the current version. A status
+        change racing another one answers 409.
+        """
+        try:
+            parse_if_match(request)
+        except ValueError:
+            return Response(
+                {'error': 'If-Match must carry the incident version'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            return super().update(request, *args, **kwargs)
+        except VersionConflict as e:
+            return Response(
+                {'error': str(e), 'version': e.current_version},
+                status=status.HTTP_412_PRECONDITION_FAILED
+            )
+        except TransitionConflict as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
+    
     def perform_create(self, serializer):
         """Set the created_by field when creating an incident."""
         serializer.save(created_by=self.request.user if self.request.user.is_authenticated else None)
@@ -178,76 +354,426 @@ class IncidentViewSet(viewsets.ModelViewSet):
     def statistics(self, request):
         """
         Get incident statistics.
+        
+        Accepts an optional ``group_by`` parameter (repeated or comma separated)
+        with extra dimensions: reporting_org, incident_type, detection_source.
+        Incidents marked as duplicates are left out unless
+        ``include_duplicates=true``. Served from the response cache when possible.
         """
-        queryset = self.filter_queryset(self.get_queryset())
+        key = response_key(request, 'statistics')
+        return cached_response(request, key, lambda: self._statistics(request))
+    
+    def _statistics(self, request):
+        queryset = exclude_duplicates(self.filter_queryset(self.get_queryset()), request.query_params)
         
-        stats = {
-            'total_incidents': queryset.count(),
-            'by_level': {
-                'L2': queryset.filter(level='L2').count(),
-                'L3': queryset.filter(level='L3').count(),
-                'L4': queryset.filter(level='L4').count(),
-                'L5': queryset.filter(level='L5').count(),
-            },
-            'by_scope': {
-                'Low': queryset.filter(scope='Low').count(),
-                'Medium': queryset.filter(scope='Medium').count(),
-                'High': queryset.filter(scope='High').count(),
-            },
-            'by_status': {
-                'reported': queryset.filter(status='reported').count(),
-                'mitigating': queryset.filter(status='mitigating').count(),
-                'resolved': queryset.filter(status='resolved').count(),
-                'postmortem': queryset.filter(status='postmortem').count(),
-                'closed': queryset.filter(status='closed').count(),
-            },
-            'l5_high_incidents': queryset.filter(level='L5', scope='High').count(),
-            'critical_incidents': queryset.filter(
-                Q(level='L5', scope='High') | 
-                Q(level='L5', scope='Medium')
-            ).count(),
-        }
+        try:
+            dimensions = parse_dimensions(request.query_params.getlist('group_by'))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        stats = compute_statistics(queryset, dimensions)
         
         return Response(stats)
     
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """
+        Get the active incidents board: every incident that is not closed,
+        with counts per status, per level and per status and level.
+        
+        Read from the materialized ActiveIncident table (one query) and served
+        from the response cache between writes.
+        """
+        key = response_key(request, 'board')
+        return cached_response(request, key, lambda: Response(active_board()))
+    
+    @action(detail=False, methods=['get'])
+    def analytics(self, request):
+        """
+        Get duration percentiles (MTTD/MTTR) from the daily rollup tables.
+        
+        Query parameters (list values repeated or comma separated):
+        ``metric`` (detect, mitigate, resolve, postmortem; default all),
+        ``percentiles`` (default 50,90,99), ``group_by`` (reporting_org, level,
+        scope, incident_type), ``since``/``until`` (YYYY-MM-DD, incident start
+        day) and reporting_org/level/scope/incident_type filters.
+        Durations are in seconds.
+        """
+        params = request.query_params
+        try:
+            metrics = parse_choices(params.getlist('metric'), METRIC_FIELDS, 'metric')
+            group_by = parse_choices(params.getlist('group_by'), ROLLUP_DIMENSIONS, 'group_by dimension')
+            percentiles = parse_percentiles(params.get('percentiles'))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        filters = {}
+        for param, lookup in (('since', 'day__gte'), ('until', 'day__lte')):
+            if params.get(param):
+                try:
+                    value = parse_date(params[param])
+                except ValueError:
+                    value = None
+                if value is None:
+                    return Response(
+                        {'error': f'{param} must be a date (YYYY-MM-DD)'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+                filters[lookup] = value
+        for dimension in ROLLUP_DIMENSIONS:
+            values = [v.strip() for value in params.getlist(dimension) for v in value.split(',') if v.strip()]
+            if values:
+                filters[f'{dimension}__in'] = values
+        
+        return Response(compute_analytics(filters, metrics, group_by, percentiles))
+    
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """
+        Ranked full-text search over incidents and their updates.
+        
+        Takes the search string in ``q`` and honours all IncidentFilter
+        parameters. Each result carries its score and highlighted snippets.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'Search query parameter q is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            limit = min(int(request.query_params.get('limit', 20)), 100)
+        except ValueError:
+            limit = 20
+        
+        queryset = self.filter_queryset(self.get_queryset())
+        hits = search_incidents(query, queryset, limit=limit)
+        
+        serializer = self.instrument_serializer(IncidentListSerializer(
+            [incident for incident, _, _ in hits], many=True, context=self.get_serializer_context()
+        ))
+        results = []
+        for data, (_, score, highlights) in zip(serializer.data, hits):
+            data['score'] = score
+            data['highlights'] = highlights
+            results.append(data)
+        
+        return Response({'query': query, 'count': len(results), 'results': results})
+    
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the filtered incidents as NDJSON or CSV.
+        
+        ``export_format`` selects ndjson (default, updates and documents nested)
+        or csv (child records flattened into rows after their incident).
+        ``include`` lists the related collections to add (default: updates,documents).
+        Honours all IncidentFilter parameters; rows are streamed in id order,
+        from an async iterator when served by the ASGI handler.
+        """
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'export_format must be one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            relations = parse_relations(request.query_params.get('include', ','.join(EXPORT_RELATIONS)))
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        queryset = self.filter_queryset(Incident.objects.all())
+        content_type = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        stream = aiter_export if isinstance(request._request, ASGIRequest) else iter_export
+        response = StreamingHttpResponse(
+            stream(queryset, export_format, relations),
+            content_type=f'{content_type}; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="incidents.{export_format}"'
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
     @action(detail=False, methods=['get'])
     def critical(self, request):
         """
         Get critical incidents (L5 Medium/High).
         """
-        critical_incidents = self.get_queryset().filter(
+        key = response_key(request, 'critical')
+        return cached_response(request, key, lambda: self._critical(request))
+    
+    def _critical(self, request):
+        serializer = self.get_serializer(self.get_critical_queryset(), many=True)
+        return Response(serializer.data)
+    
+    def get_critical_queryset(self):
+        return self.get_queryset().filter(
             Q(level='L5', scope='High') | 
             Q(level='L5', scope='Medium')
         ).order_by('-created_at')
+    
+    def bulk_items(self, request):
+        """Return the list of items in a bulk request body, or an error Response."""
+        items = request.data
+        if not isinstance(items, list):
+            return None, Response(
+                {'error': 'Expected a JSON array of items'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > BULK_MAX_ITEMS:
+            return None, Response(
+                {'error': f'At most {BULK_MAX_ITEMS} items are allowed per request'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return items, None
+    
+    def bulk_response(self, results, success_status):
+        """
+        Summarize per-item results; 207 on partial failure, 400 when nothing succeeded.
         
-        serializer = IncidentListSerializer(critical_incidents, many=True)
-        return Response(serializer.data)
+        Partly applied items count as failed.
+        """
+        failed = sum(1 for result in results if result['status'] in ('error', 'partial'))
+        succeeded = len(results) - failed
+        if failed and succeeded:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif failed:
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = success_status
+        return Response(
+            {'succeeded': succeeded, 'failed': failed, 'results': results},
+            status=response_status
+        )
+    
+    @action(detail=False, methods=['post'])
+    def bulk_create(self, request):
+        """
+        Create many incidents in one transaction.
+        
+        Takes an array of incident creation payloads (same format as POST /incidents/).
+        """
+        items, error = self.bulk_items(request)
+        if error:
+            return error
+        results = bulk_create_incidents(
+            items, IncidentCreateSerializer, self.get_serializer_context(),
+            created_by=request.user if request.user.is_authenticated else None
+        )
+        return self.bulk_response(results, status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post', 'patch'])
+    def bulk_update(self, request):
+        """
+        Partially update many incidents in one transaction.
+        
+        Takes an array of objects with the incident ``id`` and the fields to change.
+        """
+        items, error = self.bulk_items(request)
+        if error:
+            return error
+        results = bulk_update_incidents(items, IncidentSerializer, self.get_serializer_context())
+        return self.bulk_response(results, status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'])
+    def bulk_update_status(self, request):
+        """
+        Transition the status of many incidents in one transaction.
+        
+        Takes an array of ``{"id": ..., "status": ...}`` objects.
+        """
+        items, error = self.bulk_items(request)
+        if error:
+            return error
+        results = bulk_transition_incidents(
+            items, user=request.user if request.user.is_authenticated else None
+        )
+        return self.bulk_response(results, status.HTTP_200_OK)
     
     @action(detail=True, methods=['post'])
     def update_status(self, request, pk=None):
         """
-        Update incident status.
+        Move an incident to its next status.
+        
+        Honours ``If-Match: "<version>"`` or the detail ETag like PATCH (412 on a stale version).
         """
         incident = self.get_object()
         new_status = request.data.get('status')
         
-        if new_status not in VALID_STATUSES:
+        try:
+            expected_version = parse_if_match(request)
+        except ValueError:
             return Response(
-                {'error': 'Invalid status value'}, 
+                {'error': 'If-Match must carry the incident version'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        incident.status = new_status
-        incident.save()
+        try:
+            transition_incident(
+                incident, new_status,
+                user=request.user if request.user.is_authenticated else None,
+                expected_version=expected_version
+            )
+        except InvalidTransition as e:
+            return Response(
+                {'error': str(e)}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except VersionConflict as e:
+            return Response(
+                {'error': str(e), 'version': e.current_version},
+                status=status.HTTP_412_PRECONDITION_FAILED
+            )
+        except TransitionConflict as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_409_CONFLICT
+            )
         
         serializer = self.get_serializer(incident)
         return Response(serializer.data)
     
+    @action(detail=True, methods=['get'])
+    def transitions(self, request, pk=None):
+        """
+        Get the status transition history of an incident, oldest first.
+        """
+        incident = self.get_object()
+        serializer = self.instrument_serializer(
+            IncidentStatusTransitionSerializer(incident.status_transitions.all(), many=True)
+        )
+        return Response(serializer.data)
+    
+    @action(detail=True, methods=['get'])
+    def duplicate_candidates(self, request, pk=None):
+        """
+        Propose incidents this one probably duplicates, best match first.
+        
+        Candidates started within ``?window_hours=`` (default
+        INCIDENT_CORRELATION_WINDOW_HOURS) of the incident and share title or
+        description tokens or impacted_* values with it. Accepts ``?limit=``
+        (at most 50) and ``?min_score=`` (0 to 1, default 0.2).
+        """
+        incident = self.get_object()
+        
+        try:
+            window_hours = float(request.query_params.get('window_hours', settings.INCIDENT_CORRELATION_WINDOW_HOURS))
+            limit = int(request.query_params.get('limit', 10))
+            min_score = float(request.query_params.get('min_score', DEFAULT_MIN_SCORE))
+        except ValueError:
+            return Response(
+                {'error': 'window_hours, limit and min_score must be numbers'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if window_hours <= 0:
+            return Response(
+                {'error': 'window_hours must be positive'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        candidates = find_duplicate_candidates(
+            incident, timedelta(hours=window_hours),
+            limit=max(1, min(limit, DUPLICATE_CANDIDATES_MAX)), min_score=min_score
+        )
+        return Response({'duplicate_of': incident.duplicate_of_id, 'candidates': candidates})
+    
+    @action(detail=True, methods=['post'])
+    def mark_duplicate(self, request, pk=None):
+        """
+        Mark the incident as a duplicate of ``{"duplicate_of": <incident id>}``.
+        
+        A parent that is itself a duplicate is replaced by the incident it
+        duplicates, and the incident's own duplicates move along with it.
+        """
+        incident = self.get_object()
+        
+        try:
+            parent = Incident.objects.get(pk=request.data.get('duplicate_of'))
+        except (Incident.DoesNotExist, TypeError, ValueError):
+            return Response(
+                {'error': 'duplicate_of must be the id of an existing incident'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            mark_duplicate(incident, parent)
+        except DuplicateLinkError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        serializer = self.get_serializer(incident)
+        return Response(serializer.data)
+    
+    @action(detail=True, methods=['post'])
+    def unmark_duplicate(self, request, pk=None):
+        """
+        Remove the duplicate link of an incident.
+        """
+        incident = self.get_object()
+        unmark_duplicate(incident)
+        serializer = self.get_serializer(incident)
+        return Response(serializer.data)
+    
+    @action(detail=False, methods=['get'])
+    def stalled(self, request):
+        """
+        Get incidents that have been in a status for more than ``hours`` hours.
+        
+        ``status`` defaults to mitigating. Each result carries ``status_since``.
+        """
+        current_status = request.query_params.get('status', 'mitigating')
+        if not validate_field_value('statuses', current_status):
+            return Response(
+                {'error': 'Invalid status value'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            hours = float(request.query_params.get('hours', 4))
+        except ValueError:
+            hours = -1
+        if hours < 0:
+            return Response(
+                {'error': 'hours must be a non-negative number'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        entries = incidents_in_status_since(current_status, timedelta(hours=hours))[:200]
+        serializer = self.instrument_serializer(IncidentListSerializer(
+            [entry.incident for entry in entries], many=True, context=self.get_serializer_context()
+        ))
+        results = []
+        for data, entry in zip(serializer.data, entries):
+            data['status_since'] = entry.transitioned_at
+            results.append(data)
+        return Response(results)
+    
     @action(detail=True, methods=['get'])
     def timeline(self, request, pk=None):
         """
         Get incident timeline information.
+        
+        The ETag changes with the incident and once a minute, since
+        time_since_started is relative to the response time.
         """
+        updated_at = Incident.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return self._timeline(request, pk)
+        minute = int(timezone.now().timestamp() // 60)
+        return conditional_response(request, lambda: self._timeline(request, pk), [updated_at, minute])
+    
+    def _timeline(self, request, pk):
         incident = self.get_object()
         
         timeline = {
@@ -266,28 +792,42 @@ class IncidentViewSet(viewsets.ModelViewSet):
             ).total_seconds()
         
         if incident.started_at:
-            from django.utils import timezone
             timeline['time_since_started'] = (
                 timezone.now() - incident.started_at
             ).total_seconds()
         
+        # Transition times and durations materialized at each status change
+        metrics = IncidentMetrics.objects.filter(incident_id=incident.pk).first()
+        for field in ('mitigating_at', 'resolved_at', 'postmortem_at', 'closed_at',
+                      'time_to_mitigate', 'time_to_resolve', 'time_to_postmortem'):
+            timeline[field] = getattr(metrics, field) if metrics else None
+        
         return Response(timeline)
     
     @action(detail=True, methods=['get', 'post'])
     def updates(self, request, pk=None):
         """
-        Get all updates for an incident or create a new update.
-        """
-        incident = self.get_object()
+        Get an incident's updates feed or create a new update.
         
+        The feed is keyset paginated, newest first (``?cursor=``,
+        ``?page_size=``). ``?since=<update id>`` or ``?since=<ISO timestamp>``
+        returns only later updates, oldest first, so clients can fetch just
+        the tail of a long feed.
+        """
         if request.method == 'GET':
-            updates = incident.updates.all()
-            serializer = IncidentUpdateSerializer(updates, many=True)
-            return Response(serializer.data)
+            validators = IncidentUpdate.objects.filter(incident_id=pk).order_by().aggregate(**CHANGE_VALIDATORS)
+            build = lambda: self._list_updates(request)
+            if not validators['total']:
+                return build()
+            return conditional_response(
+                request, build, [validators['last_modified'], validators['total']],
+                validators['last_modified']
+            )
         
         elif request.method == 'POST':
+            incident = self.get_object()
             # Create a new update
-            serializer = IncidentUpdateSerializer(data=request.data)
+            serializer = self.instrument_serializer(IncidentUpdateSerializer(data=request.data))
             if serializer.is_valid():
                 # Set the incident and created_by fields
                 serializer.save(
@@ -296,9 +836,53 @@ class IncidentViewSet(viewsets.ModelViewSet):
                 )
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    def _list_updates(self, request):
+        incident = self.get_object()
+        try:
+            queryset, serializer = self.get_updates_feed(incident)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        paginator = UpdateFeedPagination()
+        serializer.instance = paginator.paginate_queryset(queryset, request, self)
+        return paginator.get_paginated_response(serializer.data)
+    
+    def get_updates_feed(self, incident):
+        """
+        Return the (unevaluated) updates feed queryset and its list serializer.
+        
+        Raises:
+            ValueError: If ``?since=`` is neither an update id nor an ISO 8601 timestamp
+        """
+        queryset = incident.updates.all()
+        
+        since = self.request.query_params.get('since', '').strip()
+        if since:
+            if since.isdigit():
+                queryset = queryset.filter(id__gt=int(since)).order_by('id')
+            else:
+                since_at = parse_datetime(since)
+                if since_at is None:
+                    raise ValueError('since must be an update id or an ISO 8601 timestamp')
+                if timezone.is_naive(since_at):
+                    since_at = timezone.make_aware(since_at)
+                queryset = queryset.filter(created_at__gt=since_at).order_by('created_at')
+        
+        serializer = self.instrument_serializer(
+            IncidentUpdateSerializer(many=True, context=self.get_serializer_context())
+        )
+        columns = serializer.child.get_model_columns()
+        if columns is not None:
+            # The related manager sets the incident back-reference on each row
+            queryset = queryset.only('incident', *columns, 'created_at')
+        return queryset, serializer
 
 
-class IncidentDocumentViewSet(viewsets.ModelViewSet):
+class IncidentDocumentViewSet(InstrumentedViewMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing incident documents.
     """
@@ -307,4 +891,30 @@ class IncidentDocumentViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend, filters.SearchFilter]
     filterset_fields = ['incident']
     search_fields = ['title', 'url']
-    ordering = ['created_at'] 
\ No newline at end of file
+    ordering = ['created_at']
+
+
+async def incident_event_stream(request, pk=None):
+    """
+    Server-Sent Events stream of incident deltas.
+    
+    Streams events for one incident when ``pk`` is given, otherwise the global
+    incident feed. Reconnecting clients resume with the ``Last-Event-ID`` header
+    (or ``?last_event_id=``). Requires serving through the ASGI application.
+    """
+    if pk is not None and not await Incident.objects.filter(pk=pk).aexists():
+        raise Http404('Incident not found')
+    
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        last_event_id = None
+    
+    response = StreamingHttpResponse(
+        broker.stream(incident_id=pk, last_event_id=last_event_id),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
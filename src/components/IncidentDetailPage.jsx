@@ -396,11 +396,14 @@ const IncidentDetailPage = () => {
         method: 'PATCH',
         headers: {
           'Content-Type': 'application/json',
+          'If-Match': `"${incident.version}"`,
         },
         body: JSON.stringify({ status: nextStatus }),
       });
 
-      if (response.ok) {
+      if (response.status === 412) {
+        alert('This incident was changed by someone else. Reload the page to see the latest version.');
+      } else if (response.ok) {
         const updatedIncident = await response.json();
         setIncident(updatedIncident);
         
@@ -507,6 +510,7 @@ const IncidentDetailPage = () => {
         method: 'PATCH',
         headers: {
           'Content-Type': 'application/json',
+          'If-Match': `"${incident.version}"`,
         },
         body: JSON.stringify(updateData),
       });
@@ -514,7 +518,9 @@ const IncidentDetailPage = () => {
       console.log('Response status:', response.status);
       console.log('Response headers:', response.headers);
 
-      if (response.ok) {
+      if (response.status === 412) {
+        alert('This incident was changed by someone else while you were editing. Reload the page and apply your changes again.');
+      } else if (response.ok) {
         const updatedIncident = await response.json();
         console.log('Updated incident data:', updatedIncident);
         setIncident(updatedIncident);